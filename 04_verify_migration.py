@@ -0,0 +1,8 @@
+import sys
+
+from requests_transport import RequestsTransport
+from verify import main
+
+if __name__ == "__main__":
+    # One keep-alive pool shared by the ADO and GitHub clients and every worker thread
+    sys.exit(main(sys.argv[1:], lambda workers: RequestsTransport(pool_size=workers + 4)))
@@ -0,0 +1,10 @@
+import sys
+
+from ref_sync import main
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
+
+
+
+# python.exe .\05_sync_to_ado.py --github-url https://github.com/<Github_User>/<Github_Repo>.git --ado-url https://dev.azure.com/<ADO_ORG>/<ADO_PROJECT>/_git/<ADO_REPO>
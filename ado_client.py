@@ -0,0 +1,113 @@
+import base64
+import json
+import os
+import time
+import urllib.parse
+
+from github_throttle import jittered_backoff, parse_retry_after
+from metrics import Metrics
+from transport import HTTPError, TransportError
+
+# Overridable so the scripts can target ADO Server or the local benchmark stand-in
+ADO_URL = os.environ.get("ADO_URL", "https://dev.azure.com").rstrip("/")
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class AdoClient:
+    """Azure DevOps REST client that retries throttled and failed calls
+
+    Every ADO call the migration makes is a read (WIQL and workitemsbatch are POSTs
+    but change nothing), so all of them are safe to retry. ADO announces throttling
+    with Retry-After, which is honoured before falling back to jittered backoff.
+    Every attempt, retry and backoff sleep is recorded in metrics under "ado".
+    """
+
+    def __init__(self, pat, transport, max_retries=5, backoff_base=2.0, backoff_cap=60.0, metrics=None):
+        self.transport = transport
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.headers = {
+            "Authorization": f"Basic {base64.b64encode(f':{pat}'.encode()).decode()}",
+            "Content-Type": "application/json"
+        }
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+
+    def request(self, method, url, json=None):
+        body = None if json is None else _dumps(json)
+        attempt = 0
+        while True:
+            started = time.monotonic()
+            try:
+                resp = self.transport.send(method, url, self.headers, body)
+            except TransportError as e:
+                self.metrics.request("ado", method, url, None, time.monotonic() - started, len(body or b""))
+                if attempt >= self.max_retries:
+                    raise
+                delay = jittered_backoff(attempt, self.backoff_base, self.backoff_cap)
+                reason = e
+                print(f"⏳ ADO request failed ({e}), retrying in {delay:.1f}s")
+            else:
+                self.metrics.request("ado", method, url, resp.status_code, time.monotonic() - started,
+                                     len(body or b""), len(resp.content))
+                if resp.ok:
+                    return resp
+                if resp.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    raise HTTPError(resp, method)
+                delay = parse_retry_after(resp.headers.get("Retry-After"))
+                if delay is None:
+                    delay = jittered_backoff(attempt, self.backoff_base, self.backoff_cap)
+                reason = resp.status_code
+                print(f"⏳ ADO returned {resp.status_code} for {method} {url}, retrying in {delay:.1f}s")
+            self.metrics.retry("ado", method, url, reason, delay)
+            time.sleep(delay)
+            self.metrics.wait("ado", delay, "retry")
+            attempt += 1
+
+    def get(self, url):
+        return self.request("GET", url)
+
+    def post(self, url, json=None):
+        return self.request("POST", url, json=json)
+
+    def repositories(self, org, project):
+        """The enabled Git repositories of a project"""
+        url = f"{ADO_URL}/{org}/{project}/_apis/git/repositories?api-version=7.0"
+        return [repo for repo in self.get(url).json()["value"] if not repo.get("isDisabled")]
+
+    def paginate(self, url, page_size=100):
+        """Yield the "value" items of a $top/$skip list endpoint as each page arrives
+
+        Items are de-duplicated by "id"/"pullRequestId", since entities created while
+        paging shift later pages and would otherwise be yielded twice.
+        """
+        seen = set()
+        skip = 0
+        while True:
+            page = self.get(_with_query(url, {"$top": page_size, "$skip": skip})).json()["value"]
+            for item in page:
+                key = item.get("pullRequestId", item.get("id"))
+                if key is None or key not in seen:
+                    seen.add(key)
+                    yield item
+            if len(page) < page_size:
+                return
+            skip += page_size
+
+    def paginate_continuation(self, url):
+        """Yield the "value" items of a list endpoint, following x-ms-continuationtoken"""
+        token = None
+        while True:
+            resp = self.get(_with_query(url, {"continuationToken": token}) if token else url)
+            yield from resp.json().get("value", [])
+            token = resp.headers.get("x-ms-continuationtoken")
+            if not token:
+                return
+
+
+def _with_query(url, params):
+    return url + ("&" if "?" in url else "?") + urllib.parse.urlencode(params)
+
+
+def _dumps(payload):
+    return json.dumps(payload).encode("utf-8")
@@ -0,0 +1,82 @@
+from itertools import islice
+
+from pipeline import ordered_map
+
+BATCH_SIZE = 200  # Maximum number of IDs accepted by the workitemsbatch endpoint
+WIQL_MAX_RESULTS = 20000  # A WIQL query matching more work items than this fails outright
+# Span of the ID windows queried separately. A project cannot have more work items in a
+# window than the window has IDs, so every window query stays under the WIQL cap.
+WIQL_WINDOW = 10000
+QUERY_WORKERS = 4
+
+
+def chunked(ids, size=BATCH_SIZE):
+    """Split an iterable of IDs into consecutive chunks of at most size IDs"""
+    ids = iter(ids)
+    while True:
+        chunk = list(islice(ids, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def id_windows(low, high, size=WIQL_WINDOW):
+    """Consecutive inclusive (first, last) ID ranges of at most size IDs covering low..high"""
+    for first in range(low, high + 1, size):
+        yield first, min(first + size - 1, high)
+
+
+def wiql_runner(ado, wiql_url):
+    """run_wiql function for query_ids posting to the given WIQL endpoint"""
+    def run_wiql(query, top=None):
+        url = wiql_url + (f"&$top={top}" if top else "")
+        return [item["id"] for item in ado.post(url, json={"query": query}).json()["workItems"]]
+    return run_wiql
+
+
+def query_ids(run_wiql, conditions, workers=QUERY_WORKERS, window=WIQL_WINDOW):
+    """Yield the IDs of every work item matching the WIQL conditions in ascending order
+
+    run_wiql(query, top=None) runs one WIQL query and returns the IDs it matched. The
+    matching ID range is found first, then split into windows that are queried in
+    parallel; their IDs are streamed out in order as the windows complete.
+    """
+    if window >= WIQL_MAX_RESULTS:
+        raise ValueError(f"WIQL windows must span fewer than {WIQL_MAX_RESULTS} IDs")
+    select = f"SELECT [System.Id] FROM WorkItems WHERE {conditions}"
+    first = run_wiql(f"{select} ORDER BY [System.Id] ASC", top=1)
+    if not first:
+        return
+    last = run_wiql(f"{select} ORDER BY [System.Id] DESC", top=1)
+
+    def query_window(bounds):
+        return run_wiql(f"{select} AND [System.Id] >= {bounds[0]} AND [System.Id] <= {bounds[1]} "
+                        f"ORDER BY [System.Id] ASC")
+
+    for ids in ordered_map(id_windows(first[0], last[0], window), query_window, workers):
+        yield from ids
+
+
+def fetch_work_items(fetch_batch, ids, log_error, size=BATCH_SIZE):
+    """Yield work items fetched in chunks of up to size IDs per request
+
+    fetch_batch(chunk) posts one workitemsbatch request and returns its "value" list.
+    A failed chunk or an ID missing from the response is logged and skipped.
+    """
+    for chunk in chunked(ids, size):
+        try:
+            value = fetch_batch(chunk)
+        except Exception as e:
+            log_error(f"Work items {chunk[0]}-{chunk[-1]} could not be fetched: {str(e)}")
+            continue
+
+        fetched = [wi for wi in value if wi]
+        value = None
+        missing = set(chunk) - {wi["id"] for wi in fetched}
+        for wi_id in sorted(missing):
+            log_error(f"Work item {wi_id} failed: not returned by workitemsbatch")
+        # Hand the items over one at a time so each can be freed once it is migrated,
+        # instead of the whole batch living until its last item is done
+        fetched.reverse()
+        while fetched:
+            yield fetched.pop()
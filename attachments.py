@@ -0,0 +1,199 @@
+import base64
+import hashlib
+import html
+import os
+import re
+import tempfile
+import threading
+import urllib.parse
+
+from metrics import Metrics
+from pipeline import ordered_map
+from transport import HTTPError
+
+# Links to files attached to work items and to images pasted into descriptions and
+# comments. Opening them needs ADO credentials, and they break once ADO is gone.
+ATTACHMENT_URL_RE = re.compile(r"https?://[^\s\"'<>()]+?/_apis/wit/attachments/[0-9A-Fa-f-]{36}"
+                               r"(?:\?[^\s\"'<>()]*)?")
+DEFAULT_CACHE_DIR = "attachment_cache"
+DEFAULT_BRANCH = "ado-attachments"
+ATTACHMENT_WORKERS = 4
+
+
+def attachment_name(url):
+    """File name carried in the fileName parameter of an ADO attachment URL, or \"\""""
+    query = urllib.parse.parse_qs(urllib.parse.urlsplit(html.unescape(url)).query)
+    for key, values in query.items():
+        if key.lower() == "filename":
+            return os.path.basename(values[0])
+    return ""
+
+
+class BlobCache:
+    """Directory of files named by the SHA-256 of their content"""
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR):
+        self.directory = directory
+
+    def path(self, digest):
+        return os.path.join(self.directory, digest[:2], digest)
+
+    def get(self, digest):
+        """Content stored under digest, or None"""
+        try:
+            with open(self.path(digest), "rb") as blob:
+                return blob.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, content):
+        """Store content unless the same bytes are cached already; returns its digest"""
+        digest = hashlib.sha256(content).hexdigest()
+        path = self.path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Written under a temporary name first so a crash never leaves a truncated blob
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, "wb") as blob:
+                blob.write(content)
+            os.replace(temp_path, path)
+        return digest
+
+
+class GitHubBlobStore:
+    """Blobs committed to a dedicated branch of the target repository
+
+    Each upload is a contents API commit on that branch. GitHub rejects concurrent
+    commits to one branch, so uploads are serialised (downloads from ADO are not).
+    """
+
+    def __init__(self, github, repo, branch=DEFAULT_BRANCH):
+        self.github = github
+        self.repo = repo
+        self.branch = branch
+        self.html_url = None
+        self._lock = threading.Lock()
+
+    def ensure_branch(self):
+        """Look up the repository and branch the branch off the default branch if missing"""
+        info = self.github.get(f"/repos/{self.repo}").json()
+        self.html_url = info["html_url"]
+        try:
+            self.github.get(f"/repos/{self.repo}/git/ref/heads/{self.branch}")
+            return
+        except HTTPError as e:
+            if e.response.status_code != 404:
+                raise
+        head = self.github.get(f"/repos/{self.repo}/git/ref/heads/{info['default_branch']}").json()
+        self.github.post(f"/repos/{self.repo}/git/refs",
+                         json={"ref": f"refs/heads/{self.branch}", "sha": head["object"]["sha"]})
+        print(f"🌿 Created branch '{self.branch}' in {self.repo} for migrated attachments")
+
+    def upload(self, digest, name, content):
+        """Commit content under a path derived from its digest; returns the URL to link to"""
+        extension = os.path.splitext(name)[1].lower()
+        if not re.fullmatch(r"\.[a-z0-9]{1,10}", extension):
+            extension = ""
+        path = f"attachments/{digest[:2]}/{digest}{extension}"
+        with self._lock:
+            if self.html_url is None:
+                self.ensure_branch()
+            try:
+                self.github.put(f"/repos/{self.repo}/contents/{path}", json={
+                    "message": f"Add ADO attachment {name or digest}",
+                    "branch": self.branch,
+                    "content": base64.b64encode(content).decode()})
+            except HTTPError as e:
+                # The path exists already. It is derived from the content, so an earlier run
+                # whose state was lost uploaded the same bytes.
+                if e.response.status_code != 422:
+                    raise
+        return f"{self.html_url}/blob/{self.branch}/{path}?raw=true"
+
+
+class AttachmentMigrator:
+    """Copies ADO attachments to GitHub and rewrites the links pointing at them
+
+    Every ADO URL is downloaded once (state remembers the hash of its content) and every
+    distinct content is uploaded once (state remembers its GitHub URL), however many
+    work items share it. The bytes in between live in the on-disk cache, so an
+    interrupted run never downloads them again. One instance is shared by all workers.
+    """
+
+    def __init__(self, ado, store, state, cache, log_error, metrics=None, workers=ATTACHMENT_WORKERS):
+        self.ado = ado
+        self.store = store
+        self.state = state
+        self.cache = cache
+        self.log_error = log_error
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.workers = workers
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+
+    def _lock(self, key):
+        """Lock serialising the work on one URL or digest across workers"""
+        with self._locks_lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def rewrite(self, text):
+        """text with every ADO attachment link replaced by a link to its GitHub copy"""
+        urls = list(dict.fromkeys(ATTACHMENT_URL_RE.findall(text or "")))
+        if not urls:
+            return text
+        links = dict(zip(urls, ordered_map(urls, self.github_url, self.workers)))
+        return ATTACHMENT_URL_RE.sub(lambda match: links[match.group(0)] or match.group(0), text)
+
+    def attachment_list(self, wi):
+        """Markdown list of the files attached to a work item, linking their GitHub copies"""
+        files = [(relation["url"], relation.get("attributes", {}).get("name", ""))
+                 for relation in wi.get("relations") or [] if relation.get("rel") == "AttachedFile"]
+        if not files:
+            return ""
+        links = ordered_map(files, lambda file: self.github_url(*file), self.workers)
+        lines = [f"- [{name or url}]({link or url})" for (url, name), link in zip(files, links)]
+        return "\n\n**Attachments:**\n" + "\n".join(lines)
+
+    def github_url(self, url, name=""):
+        """URL of the GitHub copy of an ADO attachment; None if ADO no longer has it"""
+        with self._lock(url):
+            known = self.state.get_attachment(url)
+            if known:
+                digest, name = known
+            else:
+                content = self.download(url)
+                if content is None:
+                    return None
+                digest = self.cache.put(content)
+                name = name or attachment_name(url)
+                self.state.record_attachment(url, digest, name)
+
+        with self._lock(digest):
+            link = self.state.get_blob_url(digest)
+            if link:
+                self.metrics.count("attachments_reused")
+                return link
+            content = self.cache.get(digest)
+            if content is None:  # The cache was cleared since the download
+                content = self.download(url)
+                if content is None:
+                    return None
+            link = self.store.upload(digest, name, content)
+            self.state.record_blob(digest, link)
+            self.metrics.count("attachments_uploaded")
+            return link
+
+    def download(self, url):
+        """Content of an ADO attachment, or None if it was deleted"""
+        url = html.unescape(url)
+        if "api-version=" not in url:
+            url += ("&" if "?" in url else "?") + "api-version=7.0"
+        try:
+            content = self.ado.get(url).content
+        except HTTPError as e:
+            if e.response.status_code != 404:
+                raise
+            self.log_error(f"Attachment {url} no longer exists in ADO, keeping its link")
+            return None
+        self.metrics.count("attachments_downloaded")
+        return content
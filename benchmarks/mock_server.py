@@ -0,0 +1,350 @@
+"""Local stand-in for the Azure DevOps and GitHub REST endpoints the migration uses
+
+Serves both APIs from one port, so ADO_URL and GITHUB_API_URL can point at the same
+base URL. Work items and PRs are generated from their IDs instead of being stored, so
+100k-item projects cost no memory; what the migration creates on the "GitHub" side is
+kept so it can be counted afterwards.
+
+    python benchmarks/mock_server.py --work-items 10000 --prs 1000 --port 8765
+"""
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+WIQL_MAX_RESULTS = 20000
+CREATED_DATE = "2020-01-01T00:00:00Z"
+CHANGED_DATE = "2020-01-02T00:00:00Z"
+
+
+class MockState:
+    """Generated ADO data plus everything written to the GitHub side"""
+
+    def __init__(self, work_items=0, prs=0, comments=2, rate_limit=10**9, rate_window=3600, throttle_every=0):
+        self.work_items = work_items
+        self.prs = prs
+        self.comments = comments  # Per work item and per PR thread
+        self.rate_limit = rate_limit  # Primary budget per rate_window seconds, sent as X-RateLimit-*
+        self.rate_window = rate_window
+        self.throttle_every = throttle_every  # Answer every nth write with a secondary rate limit
+        self.lock = threading.Lock()
+        self.issues = []  # GitHub issues and PRs in creation order, numbered from 1
+        self.issue_comments = {}
+        self.imports = []  # Issue import statuses; each reports "pending" once before "imported"
+        self.requests = 0
+        self.writes = 0
+        self.throttled = 0
+        self.patches = 0
+        self.remaining = rate_limit
+        self.reset = int(time.time()) + rate_window
+
+    # === ADO ===
+    def work_item(self, wi_id):
+        return {"id": wi_id, "fields": {
+            "System.Id": wi_id,
+            "System.Title": f"Work item {wi_id}",
+            "System.Description": f"Description of work item {wi_id}",
+            "System.WorkItemType": "Bug",
+            "System.CreatedBy": {"displayName": "Ada", "uniqueName": "ada@example.com"},
+            "System.CreatedDate": CREATED_DATE,
+            "System.ChangedDate": CHANGED_DATE,
+            "System.CommentCount": self.comments,
+        }}
+
+    def work_item_comments(self, wi_id):
+        return [{"id": n, "text": f"Comment {n} on {wi_id}", "createdBy": {"displayName": "Ada"},
+                 "createdDate": CREATED_DATE} for n in range(1, self.comments + 1)]
+
+    def pull_request(self, pr_id):
+        return {"pullRequestId": pr_id, "title": f"Pull request {pr_id}", "description": f"Changes {pr_id}",
+                "status": "completed", "sourceRefName": f"refs/heads/feature/{pr_id}",
+                "targetRefName": "refs/heads/main",
+                "createdBy": {"displayName": "Ada", "uniqueName": "ada@example.com"},
+                "creationDate": "2020-01-01T00:00:00.123Z", "closedDate": CHANGED_DATE}
+
+    def pr_threads(self, pr_id):
+        return [{"id": 1, "comments": [
+            {"id": n, "author": {"displayName": "Ada"}, "content": f"Review {n} on {pr_id}",
+             "publishedDate": "2020-01-01T00:00:00.5Z", "commentType": "text"}
+            for n in range(1, self.comments + 1)]}]
+
+    def wiql(self, query, top):
+        """IDs matching the ID bounds, ChangedDate and order of a WIQL query, or None over the cap"""
+        low, high = 1, self.work_items
+        for op, value in re.findall(r"\[System\.Id\] ([<>]=?) (\d+)", query):
+            value = int(value)
+            if op == ">=":
+                low = max(low, value)
+            elif op == ">":
+                low = max(low, value + 1)
+            elif op == "<=":
+                high = min(high, value)
+            else:
+                high = min(high, value - 1)
+        changed = re.search(r"\[System\.ChangedDate\] >= '([^']+)'", query)
+        if changed and changed.group(1) > CHANGED_DATE:
+            return []
+        count = max(high - low + 1, 0)
+        if top:
+            count = min(count, top)
+        if count > WIQL_MAX_RESULTS:
+            return None
+        if "DESC" in query:
+            return list(range(high, high - count, -1))
+        return list(range(low, low + count))
+
+    # === GITHUB ===
+    def create(self, item):
+        with self.lock:
+            item["number"] = len(self.issues) + 1
+            self.issues.append(item)
+            return item
+
+    def add_comment(self, number):
+        with self.lock:
+            self.issue_comments[number] = self.issue_comments.get(number, 0) + 1
+
+    def import_issue(self, body, base_url):
+        """Create an issue with its comments from an import request; returns the import status"""
+        item = self.create(dict(body["issue"], state="open"))
+        with self.lock:
+            if body.get("comments"):
+                self.issue_comments[item["number"]] = len(body["comments"])
+            status = {"id": len(self.imports) + 1, "status": "pending", "polls": 0,
+                      "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                      "issue_url": f"{base_url}/issues/{item['number']}"}
+            status["url"] = f"{base_url}/import/issues/{status['id']}"
+            self.imports.append(status)
+            return self.import_status(status)
+
+    def import_status(self, status):
+        """What GitHub reports for an import, advancing it from pending to imported"""
+        shown = {key: value for key, value in status.items() if key != "polls"}
+        if status["polls"] == 0:
+            shown["status"] = "pending"
+            del shown["issue_url"]
+        else:
+            shown["status"] = "imported"
+        status["polls"] += 1
+        return shown
+
+    def listed(self, item):
+        return dict(item, comments=self.issue_comments.get(item["number"], 0))
+
+    def summary(self):
+        with self.lock:
+            return {"requests": self.requests, "writes": self.writes, "throttled": self.throttled,
+                    "patches": self.patches,
+                    "issues": sum(1 for item in self.issues if "pull_request" not in item),
+                    "pulls": sum(1 for item in self.issues if "pull_request" in item),
+                    "comments": sum(self.issue_comments.values()), "imports": len(self.imports)}
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real services
+    # Headers and body go out as separate writes; with Nagle's algorithm on, every
+    # response would wait out the client's delayed ACK (~40 ms) and skew the results
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    @property
+    def state(self):
+        return self.server.state
+
+    def send_json(self, status, payload, headers=None):
+        content = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+    def read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length)) if length else None
+
+    def do_GET(self):
+        self.dispatch("GET")
+
+    def do_POST(self):
+        self.dispatch("POST")
+
+    def do_PATCH(self):
+        self.dispatch("PATCH")
+
+    def dispatch(self, method):
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        body = self.read_json() if method in ("POST", "PATCH") else None
+        with self.state.lock:
+            self.state.requests += 1
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        if url.path.startswith("/repos/") or url.path == "/rate_limit":
+            self.github(method, url.path, query, body)
+        else:
+            self.ado(method, url.path, query, body)
+
+    # === ADO ROUTES ===
+    def ado(self, method, path, query, body):
+        state = self.state
+        if path.endswith("/_apis/wit/wiql"):
+            ids = state.wiql(body["query"], int(query.get("$top", 0)))
+            if ids is None:
+                return self.send_json(400, {"message": "VS402337: The number of work items returned exceeds "
+                                                       f"the size limit of {WIQL_MAX_RESULTS}."})
+            return self.send_json(200, {"workItems": [{"id": wi_id} for wi_id in ids]})
+        if path.endswith("/_apis/wit/workitemsbatch"):
+            items = [state.work_item(wi_id) for wi_id in body["ids"] if 1 <= wi_id <= state.work_items]
+            return self.send_json(200, {"count": len(items), "value": items})
+        match = re.search(r"/_apis/wit/workItems/(\d+)/comments$", path, re.I)
+        if match:
+            comments = state.work_item_comments(int(match.group(1)))
+            return self.send_json(200, {"totalCount": len(comments), "count": len(comments), "comments": comments})
+        match = re.search(r"/pullRequests/(\d+)/threads$", path, re.I)
+        if match:
+            return self.send_json(200, {"value": state.pr_threads(int(match.group(1)))})
+        if path.lower().endswith("/pullrequests"):
+            skip, top = int(query.get("$skip", 0)), int(query.get("$top", 100))
+            ids = range(skip + 1, min(skip + top, state.prs) + 1)
+            return self.send_json(200, {"count": len(ids), "value": [state.pull_request(pr_id) for pr_id in ids]})
+        if path.endswith("/_apis/git/repositories"):
+            # A single repository; its PRs are the generated ones whatever repository is asked for
+            remote = f"http://{self.headers['Host']}{path[:-len('_apis/git/repositories')]}_git/bench"
+            return self.send_json(200, {"value": [{"id": "bench", "name": "bench", "remoteUrl": remote}]})
+        self.send_json(404, {"message": f"No mock for {method} {path}"})
+
+    # === GITHUB ROUTES ===
+    def rate_headers(self):
+        state = self.state
+        return {"X-RateLimit-Limit": str(state.rate_limit), "X-RateLimit-Remaining": str(max(state.remaining, 0)),
+                "X-RateLimit-Reset": str(state.reset), "X-RateLimit-Resource": "core"}
+
+    def github(self, method, path, query, body):
+        state = self.state
+        with state.lock:
+            if time.time() >= state.reset:
+                state.remaining, state.reset = state.rate_limit, int(time.time()) + state.rate_window
+            state.remaining -= 1
+            if method != "GET":
+                state.writes += 1
+                throttled = state.throttle_every and state.writes % state.throttle_every == 0
+                state.throttled += bool(throttled)
+            else:
+                throttled = False
+        headers = self.rate_headers()
+        if path == "/rate_limit":
+            core = {"limit": state.rate_limit, "remaining": max(state.remaining, 0), "reset": state.reset}
+            return self.send_json(200, {"resources": {"core": core}, "rate": core}, headers)
+        if throttled:
+            return self.send_json(403, {"message": "You have exceeded a secondary rate limit."},
+                                  dict(headers, **{"Retry-After": "0"}))
+
+        match = re.fullmatch(r"/repos/[^/]+/[^/]+/(issues|pulls)", path)
+        if match and method == "GET":
+            items = state.issues if match.group(1) == "issues" else \
+                [item for item in state.issues if "pull_request" in item]
+            return self.send_page(path, query, items, headers)
+        if match and method == "POST":
+            if match.group(1) == "issues":
+                item = state.create(dict(body, state="open"))
+            else:
+                item = state.create({"title": body["title"], "body": body.get("body"), "state": "open",
+                                     "head": {"ref": body["head"]}, "base": {"ref": body["base"]},
+                                     "pull_request": {}})
+            return self.send_json(201, item, headers)
+        match = re.fullmatch(r"(/repos/[^/]+/[^/]+)/import/issues", path)
+        if match and method == "POST":
+            base_url = f"http://{self.headers['Host']}{match.group(1)}"
+            return self.send_json(202, state.import_issue(body, base_url), headers)
+        if match and method == "GET":
+            with state.lock:
+                statuses = [state.import_status(status) for status in state.imports
+                            if status["created_at"] >= query.get("since", "")]
+            return self.send_json(200, statuses, headers)
+        match = re.fullmatch(r"/repos/[^/]+/[^/]+/import/issues/(\d+)", path)
+        if match and method == "GET":
+            with state.lock:
+                status = state.import_status(state.imports[int(match.group(1)) - 1])
+            return self.send_json(200, status, headers)
+        match = re.fullmatch(r"/repos/[^/]+/[^/]+/issues/(\d+)/comments", path)
+        if match and method == "POST":
+            state.add_comment(int(match.group(1)))
+            return self.send_json(201, {"id": 1, "body": body["body"]}, headers)
+        match = re.fullmatch(r"/repos/[^/]+/[^/]+/(issues|pulls)/(\d+)", path)
+        if match and method == "PATCH":
+            with state.lock:
+                state.patches += 1
+            return self.send_json(200, dict(body, number=int(match.group(2))), headers)
+        self.send_json(404, {"message": "Not Found"}, headers)
+
+    def send_page(self, path, query, items, headers):
+        """One page of a GitHub list endpoint with its Link header"""
+        per_page = min(int(query.get("per_page", 30)), 100)
+        page = int(query.get("page", 1))
+        if page * per_page < len(items):
+            next_query = dict(query, page=page + 1)
+            link = "&".join(f"{key}={value}" for key, value in next_query.items())
+            headers = dict(headers, Link=f'<http://{self.headers["Host"]}{path}?{link}>; rel="next"')
+        self.send_json(200, [self.state.listed(item) for item in items[(page - 1) * per_page: page * per_page]],
+                       headers)
+
+
+class MockServer:
+    """Threaded mock ADO/GitHub server on localhost; url serves both APIs"""
+
+    def __init__(self, port=0, latency=0.0, **state_options):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), MockHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.state = MockState(**state_options)
+        self.httpd.latency = latency
+        self.state = self.httpd.state
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve mock Azure DevOps and GitHub APIs on localhost.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--work-items", type=int, default=1000, help="Work items in the mock ADO project")
+    parser.add_argument("--prs", type=int, default=100, help="Pull requests in every mock ADO repository")
+    parser.add_argument("--comments", type=int, default=2, help="Comments per work item and per PR")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--throttle-every", type=int, default=0,
+                        help="Answer every nth GitHub write with a secondary rate limit (0 never)")
+    args = parser.parse_args()
+    server = MockServer(args.port, args.latency, work_items=args.work_items, prs=args.prs,
+                        comments=args.comments, throttle_every=args.throttle_every)
+    print(f"🧪 Mock ADO/GitHub APIs on {server.url}; set ADO_URL and GITHUB_API_URL to it")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(json.dumps(server.state.summary()))
+
+
+if __name__ == "__main__":
+    main()
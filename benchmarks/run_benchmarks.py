@@ -0,0 +1,130 @@
+"""End-to-end throughput of the PR and work item migrations against the local mock APIs
+
+Every run starts a fresh mock server, points a migration script at it through ADO_URL
+and GITHUB_API_URL, and reports items/sec. Runs never touch a real organization.
+
+    python benchmarks/run_benchmarks.py --sizes 1000 10000 100000 --output results.json
+    python benchmarks/run_benchmarks.py --baseline results.json  # fails on a regression
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from mock_server import MockServer
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS = {
+    "workitems": "03_migrate_workitems.py",
+    "workitems-import": "03_migrate_workitems.py",
+    "prs": "02_prmigrate.py",
+}
+DEFAULT_SIZES = [1000, 10000, 100000]
+
+
+def script_path(script, variant):
+    if variant == "urllib":
+        return os.path.join(REPO_ROOT, "without_using_requests_lib", SCRIPTS[script])
+    return os.path.join(REPO_ROOT, SCRIPTS[script])
+
+
+def script_args(script, workers):
+    common = ["--ado-org", "bench", "--ado-project", "bench", "--github-repo", "bench/bench",
+              "--workers", str(workers), "--write-interval", "0"]
+    if script == "workitems":
+        return common + ["--limit", "0"]
+    if script == "workitems-import":
+        return common + ["--limit", "0", "--import-api", "--import-poll-interval", "0.2"]
+    return common + ["--ado-repo", "bench"]
+
+
+def run_benchmark(script, size, variant="requests", workers=8, comments=2, latency=0.0, timeout=None):
+    """Migrate size generated items with one script; returns a result row"""
+    items = {"work_items": size} if script.startswith("workitems") else {"prs": size}
+    with MockServer(latency=latency, comments=comments, **items) as server, \
+            tempfile.TemporaryDirectory() as work_dir:
+        env = dict(os.environ, ADO_URL=server.url, GITHUB_API_URL=server.url, ADO_PAT="bench",
+                   GITHUB_TOKEN="bench", PYTHONIOENCODING="utf-8")
+        metrics_file = os.path.join(work_dir, "metrics.jsonl")
+        command = [sys.executable, script_path(script, variant)] + script_args(script, workers) + [
+            "--state-file", os.path.join(work_dir, "state.db"), "--metrics-file", metrics_file]
+        started = time.monotonic()
+        # The scripts write migration_errors.log to the working directory
+        result = subprocess.run(command, cwd=work_dir, env=env, capture_output=True, text=True, timeout=timeout)
+        seconds = time.monotonic() - started
+        created = server.state.summary()
+        with open(metrics_file) as metrics:
+            summary = [json.loads(line) for line in metrics][-1]
+    migrated = created["issues"] if script.startswith("workitems") else created["pulls"]
+    return {
+        "script": script,
+        "variant": variant,
+        "size": size,
+        "workers": workers,
+        "seconds": round(seconds, 2),
+        "items_per_sec": round(migrated / seconds, 1) if seconds else None,
+        "migrated": migrated,
+        "comments": created["comments"],
+        "requests": created["requests"],
+        "writes": created["writes"],
+        "ok": result.returncode == 0 and migrated == size and created["comments"] == size * comments,
+        "services": summary.get("services", {}),
+        "stderr": result.stderr[-2000:] if result.returncode else "",
+    }
+
+
+def regressions(results, baseline, tolerance):
+    """Rows whose items/sec fell more than tolerance below the matching baseline row"""
+    expected = {(row["script"], row["variant"], row["size"]): row["items_per_sec"] for row in baseline}
+    slower = []
+    for row in results:
+        before = expected.get((row["script"], row["variant"], row["size"]))
+        if before and row["items_per_sec"] is not None and row["items_per_sec"] < before * (1 - tolerance):
+            slower.append((row, before))
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the migration scripts against local mock APIs.")
+    parser.add_argument("--scripts", nargs="+", choices=sorted(SCRIPTS), default=sorted(SCRIPTS))
+    parser.add_argument("--sizes", nargs="+", type=int, default=DEFAULT_SIZES, help="Items per run")
+    parser.add_argument("--variant", choices=["requests", "urllib"], default="requests")
+    parser.add_argument("--workers", type=int, default=8, help="--workers passed to the scripts")
+    parser.add_argument("--comments", type=int, default=2, help="Comments per work item / PR")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds the mock adds to every response")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--baseline", help="Earlier --output file; exit 1 if items/sec dropped beyond --tolerance")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed items/sec drop against the baseline")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'script':<16} {'size':>7} {'seconds':>9} {'items/s':>9} {'requests':>9} {'writes':>8}  status")
+    for script in args.scripts:
+        for size in args.sizes:
+            row = run_benchmark(script, size, args.variant, args.workers, args.comments, args.latency)
+            results.append(row)
+            status = "✅" if row["ok"] else f"❌ {row['migrated']}/{size} migrated"
+            print(f"{script:<16} {size:>7} {row['seconds']:>9} {row['items_per_sec']:>9} {row['requests']:>9} "
+                  f"{row['writes']:>8}  {status}")
+            if row["stderr"]:
+                print(row["stderr"])
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=2)
+    failed = [row for row in results if not row["ok"]]
+    slower = []
+    if args.baseline:
+        with open(args.baseline) as baseline:
+            slower = regressions(results, json.load(baseline), args.tolerance)
+        for row, before in slower:
+            print(f"📉 {row['script']} at {row['size']}: {row['items_per_sec']} items/s, baseline {before}")
+    if failed or slower:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import os
+
+from delta import parse_time
+from identity import IdentityMap, parse_identity_file
+from metrics import print_summary
+from plan import SECONDARY_WRITES_PER_HOUR
+from state_store import DEFAULT_STATE_FILE
+
+
+def add_client_arguments(parser, github_repo_required=True):
+    parser.add_argument("--ado-pat", help="Azure DevOps PAT (or set ADO_PAT env var)")
+    parser.add_argument("--ado-org", required=True, help="Azure DevOps organization")
+    parser.add_argument("--ado-project", required=True, help="Azure DevOps project")
+    parser.add_argument("--github-repo", required=github_repo_required, help="GitHub repo (e.g., user/repo)")
+    parser.add_argument("--github-token", help="GitHub token (or set GITHUB_TOKEN env var)")
+
+
+def add_run_arguments(parser, items):
+    """Concurrency, pacing, resume, delta and metrics options shared by the PR and work item CLIs"""
+    parser.add_argument("--workers", type=int, default=1,
+                        help=f"Number of {items} migrated concurrently (comments of one stay in order)")
+    parser.add_argument("--write-interval", type=float, default=1.0,
+                        help="Minimum seconds between GitHub content-creating requests")
+    parser.add_argument("--state-file", default=DEFAULT_STATE_FILE,
+                        help=f"SQLite file recording migrated {items} so an interrupted run can resume")
+    parser.add_argument("--rescan", action="store_true",
+                        help="Re-list GitHub instead of trusting the state file")
+    parser.add_argument("--delta", action="store_true",
+                        help=f"Only sync {items} changed since the last successful run, updating existing ones")
+    parser.add_argument("--since",
+                        help="ISO 8601 date/time to sync changes from instead of the stored watermark (implies --delta)")
+    parser.add_argument("--metrics-file", help="Append JSON-lines timing and throughput metrics to this file")
+    parser.add_argument("--plan", action="store_true",
+                        help="Only count the GitHub writes the run would make and estimate its duration; "
+                             "nothing is created on GitHub")
+    parser.add_argument("--writes-per-hour", type=int, default=SECONDARY_WRITES_PER_HOUR,
+                        help="GitHub's hourly cap on content-creating requests assumed by --plan (0 for none, "
+                             "e.g. on GHES)")
+
+
+def add_identity_arguments(parser):
+    parser.add_argument("--identity-map",
+                        help="File of 'ADO_USER GITHUB_LOGIN' lines used to @-mention and assign people on GitHub")
+    parser.add_argument("--identity-lookup", action="store_true",
+                        help="Search GitHub by public email for ADO users missing from --identity-map")
+
+
+def identity_map(args, state, ado, github):
+    """IdentityMap for the identity options; it maps nobody when neither was given"""
+    mapping = parse_identity_file(args.identity_map) if args.identity_map else {}
+    if not (mapping or args.identity_lookup):
+        return IdentityMap()
+    return IdentityMap(mapping, state, github if args.identity_lookup else None, ado, args.ado_org)
+
+
+def check_run_arguments(parser, args):
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.writes_per_hour < 0:
+        parser.error("--writes-per-hour must not be negative")
+    if args.since:
+        try:
+            parse_time(args.since)
+        except ValueError:
+            parser.error("--since must be an ISO 8601 date or date/time")
+        args.delta = True
+
+
+def credentials(args):
+    """(ADO PAT, GitHub token) from the arguments or the environment"""
+    ado_pat = args.ado_pat or os.environ.get("ADO_PAT")
+    if not ado_pat:
+        raise ValueError("Azure DevOps PAT must be provided via --ado-pat or ADO_PAT env var.")
+    github_token = args.github_token or os.environ.get("GITHUB_TOKEN")
+    if not github_token:
+        raise ValueError("GitHub token must be provided via --github-token or GITHUB_TOKEN env var.")
+    return ado_pat, github_token
+
+
+def finish_metrics(metrics, args):
+    """Write the end-of-run summary; it is also printed when a metrics file was asked for"""
+    summary = metrics.summary()
+    metrics.close()
+    if args.metrics_file:
+        print_summary(summary)
@@ -0,0 +1,98 @@
+import argparse
+import os
+
+from ado_client import AdoClient
+from cli import finish_metrics
+from git_refs import GitError
+from metrics import Metrics
+from repo_mirror import (DEFAULT_LFS_TRANSFERS, DEFAULT_MAX_PUSH_SIZE, DEFAULT_WORK_DIR, RepoJob,
+                         assign_directories, list_ado_repos, mirror_all, mirror_repo, parse_manifest)
+from snapshot import SNAPSHOT_WORKERS, snapshot_repo
+
+
+def load_jobs(args, metrics, make_transport):
+    """Repositories to mirror in batch mode, from the manifest or the ADO project"""
+    if args.manifest:
+        return parse_manifest(args.manifest)
+    ado_pat = args.ado_pat or os.environ.get("ADO_PAT")
+    if not ado_pat:
+        raise ValueError("Azure DevOps PAT must be provided via --ado-pat or ADO_PAT env var.")
+    ado = AdoClient(ado_pat, make_transport(1), metrics=metrics)
+    return list_ado_repos(ado, args.ado_org, args.ado_project, args.github_org)
+
+
+def migrate(args, metrics, make_transport):
+    """Mirror the single repository or the batch selected by args"""
+    if args.snapshot:
+        mirror = snapshot_repo
+        push_options = {"branches": args.branches, "workers": args.snapshot_workers, "metrics": metrics}
+    else:
+        mirror = mirror_repo
+        push_options = {"max_push_size": args.max_push_mb * 2**20, "lfs_transfers": args.lfs_transfers,
+                        "metrics": metrics}
+
+    if args.manifest or args.ado_org:
+        jobs = load_jobs(args, metrics, make_transport)
+        print(f"📦 Mirroring {len(jobs)} repositories, {args.parallel} at a time, into {args.work_dir}")
+        results = mirror_all(jobs, args.parallel, args.work_dir, mirror=mirror, **push_options)
+        failed = sorted((job for job, error in results.items() if error), key=lambda job: job.name)
+        print(f"\n✅ {len(results) - len(failed)} repositories mirrored, {len(failed)} failed")
+        for job in failed:
+            print(f"❌ {job.name}: {results[job]}")
+        return 1 if failed else 0
+
+    # Clone the Azure DevOps repo as a bare mirror next to the script's working directory
+    job = assign_directories([RepoJob(args.azure_repo_url, args.github_repo_url)], ".")[0]
+    try:
+        mirror(job, **push_options)
+    except GitError as e:
+        print(f"❌ {e}")
+        return 1
+    return 0
+
+
+def main(argv, make_transport):
+    """Command line entry point; make_transport(workers) builds the HTTP transport for ADO"""
+    parser = argparse.ArgumentParser(description="Migrate Azure DevOps repo to GitHub.")
+    parser.add_argument("azure_repo_url", nargs="?", help="Azure DevOps repository URL")
+    parser.add_argument("github_repo_url", nargs="?", help="GitHub repository URL")
+    parser.add_argument("--max-push-mb", type=int, default=DEFAULT_MAX_PUSH_SIZE // 2**20,
+                        help="Repositories larger than this are pushed in bounded steps (GitHub caps a push at 2 GiB)")
+    parser.add_argument("--lfs-transfers", type=int, default=DEFAULT_LFS_TRANSFERS,
+                        help="Concurrent Git LFS object transfers")
+    snapshot = parser.add_argument_group("snapshot mode", "Push the current content of branches without their history")
+    snapshot.add_argument("--snapshot", action="store_true",
+                          help="Push one parentless commit per branch, made from the tip's tree, instead of the history")
+    snapshot.add_argument("--branches", nargs="+", default=["*"],
+                          help="Branch name patterns to snapshot, e.g. main 'release/*' (default: every branch)")
+    snapshot.add_argument("--snapshot-workers", type=int, default=SNAPSHOT_WORKERS,
+                          help="Branch snapshots created concurrently per repository")
+    batch = parser.add_argument_group("batch mode", "Mirror many repositories concurrently, largest first")
+    batch.add_argument("--manifest", help="File with one 'AZURE_URL GITHUB_URL [SIZE_BYTES]' line per repository")
+    batch.add_argument("--ado-org", help="Mirror every repository of --ado-project in this organization")
+    batch.add_argument("--ado-project", help="Azure DevOps project to enumerate with --ado-org")
+    batch.add_argument("--github-org", help="GitHub organization the enumerated repositories are pushed to")
+    batch.add_argument("--ado-pat", help="Azure DevOps PAT for --ado-org (or set ADO_PAT env var)")
+    batch.add_argument("--parallel", type=int, default=4, help="Number of repositories mirrored at once")
+    batch.add_argument("--work-dir", default=DEFAULT_WORK_DIR,
+                       help="Mirror cache: one mirror and git log per repository, refreshed on later runs")
+    parser.add_argument("--metrics-file", help="Append JSON-lines timing and throughput metrics to this file")
+    args = parser.parse_args(argv)
+    if args.max_push_mb < 1 or args.lfs_transfers < 1:
+        parser.error("--max-push-mb and --lfs-transfers must be at least 1")
+    if args.snapshot_workers < 1:
+        parser.error("--snapshot-workers must be at least 1")
+    if args.manifest or args.ado_org:
+        if args.parallel < 1:
+            parser.error("--parallel must be at least 1")
+        if not args.manifest and not (args.ado_project and args.github_org):
+            parser.error("--ado-org needs --ado-project and --github-org")
+    elif not (args.azure_repo_url and args.github_repo_url):
+        parser.error("give AZURE_REPO_URL and GITHUB_REPO_URL, or --manifest / --ado-org for batch mode")
+
+    metrics = Metrics(args.metrics_file)
+    try:
+        return migrate(args, metrics, make_transport)
+    finally:
+        finish_metrics(metrics, args)
+
@@ -0,0 +1,41 @@
+import hashlib
+import json
+import re
+from datetime import datetime, timedelta, timezone
+
+# Watermarks are moved back by this much so items changed while a run was starting,
+# or stamped by a slightly skewed ADO clock, are picked up again next time.
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
+
+def parse_time(value):
+    """ADO / ISO 8601 timestamp (or plain date) as an aware UTC datetime"""
+    value = value.strip()
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    # ADO sends up to 7 fractional digits, one more than datetime accepts
+    value = re.sub(r"(\.\d{6})\d+", r"\1", value)
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def format_time(moment):
+    """UTC timestamp in the form WIQL and the state file use"""
+    return moment.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def next_watermark(run_started):
+    """Watermark to store after a successful run that started at run_started"""
+    return format_time(run_started - WATERMARK_OVERLAP)
+
+
+def changed_since(value, since):
+    """True when the timestamp value is at or after since (always True without since)"""
+    return since is None or parse_time(value) >= parse_time(since)
+
+
+def content_hash(payload):
+    """Stable digest of a GitHub create/update payload, to skip no-op updates"""
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
@@ -0,0 +1,140 @@
+import os
+import subprocess
+import tempfile
+
+# ADO publishes its pull request refs and GitHub rejects pushes to them as hidden refs;
+# they are never part of what a migration transfers or compares.
+EXCLUDED_REF_PREFIXES = ("refs/pull/",)
+PUSH_BATCH = 500  # Refspecs per git push, to stay under command-line length limits
+
+
+class GitError(Exception):
+    """A git (or gh) command exited with a non-zero status"""
+
+
+def run_git(args, cwd=None, log=None):
+    """Run a command without a shell; output goes to log (a file object) or the console"""
+    if log is not None:
+        log.write(f"$ {' '.join(args)}\n")
+        log.flush()
+    else:
+        print(f"Running: {' '.join(args)}")
+    result = subprocess.run(args, cwd=cwd, stdout=log, stderr=subprocess.STDOUT if log else None)
+    if result.returncode != 0:
+        raise GitError(f"{' '.join(args)} exited with status {result.returncode}")
+
+
+def git_output(args, cwd=None, env=None):
+    """Run a command without a shell and return its stdout; env adds to the environment"""
+    result = subprocess.run(args, cwd=cwd, capture_output=True, text=True,
+                            env=dict(os.environ, **env) if env else None)
+    if result.returncode != 0:
+        raise GitError(f"{' '.join(args)} exited with status {result.returncode}: {result.stderr.strip()}")
+    return result.stdout
+
+
+def is_migrated_ref(ref):
+    return ref.startswith("refs/") and not ref.startswith(EXCLUDED_REF_PREFIXES)
+
+
+def parse_refs(output):
+    """{ref: sha} from "<sha> <ref>" lines (ls-remote / for-each-ref), peeled and excluded refs dropped"""
+    refs = {}
+    for line in output.splitlines():
+        parts = line.split()
+        if len(parts) == 2 and is_migrated_ref(parts[1]) and not parts[1].endswith("^{}"):
+            refs[parts[1]] = parts[0]
+    return refs
+
+
+def local_refs(repo_path):
+    """Refs of a local (bare) repository"""
+    return parse_refs(git_output(["git", "for-each-ref", "--format=%(objectname) %(refname)"], cwd=repo_path))
+
+
+def remote_refs(url, cwd=None):
+    """Refs currently on a remote, without fetching anything"""
+    return parse_refs(git_output(["git", "ls-remote", url], cwd=cwd))
+
+
+def ref_delta(local, remote):
+    """Refspecs that make remote match local: forced updates for changed refs, deletions for stale ones"""
+    updates = [f"+{ref}:{ref}" for ref, sha in sorted(local.items()) if remote.get(ref) != sha]
+    deletions = [f":{ref}" for ref in sorted(remote) if ref not in local]
+    return updates + deletions
+
+
+def push_refspecs(repo_path, url, refspecs, log=None, batch=PUSH_BATCH):
+    """Push refspecs from repo_path to url in batches"""
+    for start in range(0, len(refspecs), batch):
+        run_git(["git", "push", "--porcelain", url] + refspecs[start:start + batch], cwd=repo_path, log=log)
+
+
+def run_with_refspecs(repo_path, args, remote, key, refspecs, log=None):
+    """Run git with the refspecs of remote read from a temporary config file
+
+    Keeps any number of refspecs off the command line, which Windows caps at 32k characters,
+    so even a sync of thousands of refs is one fetch and one push.
+    """
+    fd, config_path = tempfile.mkstemp(suffix=".config", dir=repo_path)
+    with os.fdopen(fd, "w") as config:
+        config.write(f'[remote "{remote}"]\n')
+        for spec in refspecs:
+            escaped = spec.replace("\\", "\\\\").replace('"', '\\"')
+            config.write(f'\t{key} = "{escaped}"\n')
+    try:
+        run_git(["git", "-c", f"include.path={os.path.abspath(config_path)}"] + args, cwd=repo_path, log=log)
+    finally:
+        os.remove(config_path)
+
+
+def missing_objects(repo_path, shas):
+    """The shas whose objects are not in the repository yet, checked by one git process"""
+    shas = sorted(set(shas))
+    if not shas:
+        return set()
+    result = subprocess.run(["git", "cat-file", "--batch-check"], cwd=repo_path, input="\n".join(shas) + "\n",
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise GitError(f"git cat-file --batch-check exited with status {result.returncode}")
+    return {line.split()[0] for line in result.stdout.splitlines() if line.endswith(" missing")}
+
+
+def pack_size(repo_path):
+    """Bytes of objects stored in a repository, packed and loose (git count-objects)"""
+    stats = {}
+    for line in git_output(["git", "count-objects", "-v"], cwd=repo_path).splitlines():
+        key, _, value = line.partition(": ")
+        stats[key] = value
+    return (int(stats.get("size-pack", 0)) + int(stats.get("size", 0))) * 1024
+
+
+def has_commit(repo_path, sha):
+    result = subprocess.run(["git", "cat-file", "-e", f"{sha}^{{commit}}"], cwd=repo_path, capture_output=True)
+    return result.returncode == 0
+
+
+def first_parent_commits(repo_path, ref, exclude=None):
+    """Commits on the first-parent chain of ref, oldest first, stopping at exclude if given"""
+    args = ["git", "rev-list", "--first-parent", "--reverse", ref]
+    if exclude:
+        args.append(f"^{exclude}")
+    return git_output(args, cwd=repo_path).split()
+
+
+def uses_lfs(repo_path):
+    """True when the default branch routes files through Git LFS"""
+    try:
+        attributes = git_output(["git", "cat-file", "-p", "HEAD:.gitattributes"], cwd=repo_path)
+    except GitError:
+        return False
+    return "filter=lfs" in attributes
+
+
+def lfs_installed():
+    return subprocess.run(["git", "lfs", "version"], capture_output=True).returncode == 0
+
+
+def mismatched_refs(local, remote):
+    """Refs whose target differs between two {ref: sha} maps, sorted"""
+    return sorted(ref for ref in set(local) | set(remote) if local.get(ref) != remote.get(ref))
@@ -0,0 +1,94 @@
+import json
+import os
+import time
+import urllib.parse
+
+from github_throttle import GitHubThrottle
+from metrics import Metrics
+from transport import HTTPError, TransportError
+
+# GITHUB_API_URL is the variable GitHub Actions sets; GHES and the benchmark stand-in use it too
+GITHUB_API = os.environ.get("GITHUB_API_URL", "https://api.github.com").rstrip("/")
+
+
+class GitHubClient:
+    """GitHub REST client that paces writes and retries throttled calls
+
+    Requests go through the given transport (requests or urllib); pacing and retry
+    decisions come from GitHubThrottle, so both variants behave identically.
+    Every attempt, retry and throttle sleep is recorded in metrics under "github".
+    """
+
+    def __init__(self, token, transport, write_interval=1.0, metrics=None, **throttle_options):
+        self.transport = transport
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.headers = {
+            "Authorization": f"Bearer {token}",
+            "Accept": "application/vnd.github+json"
+        }
+        self.throttle = GitHubThrottle(write_interval=write_interval, **throttle_options)
+
+    def request(self, method, url, json=None, params=None, headers=None):
+        """Send a request, retrying rate limits, failed reads and unsent writes with backoff"""
+        method = method.upper()
+        if not url.startswith("http"):
+            url = GITHUB_API + url
+        if params:
+            url += ("&" if "?" in url else "?") + urllib.parse.urlencode(params)
+        headers = dict(self.headers, **(headers or {}))
+        body = None
+        if json is not None:
+            headers["Content-Type"] = "application/json"
+            body = _dumps(json)
+
+        attempt = 0
+        while True:
+            self.metrics.wait("github", *self.throttle.wait_turn(method))
+            started = time.monotonic()
+            try:
+                resp = self.transport.send(method, url, headers, body)
+            except TransportError as e:
+                self.metrics.request("github", method, url, None, time.monotonic() - started, len(body or b""))
+                delay = self.throttle.connection_retry_delay(method, e.sent, attempt)
+                if delay is None:
+                    raise
+                self.metrics.retry("github", method, url, e, delay)
+                print(f"⏳ GitHub request failed ({e}), retrying in {delay:.1f}s")
+                attempt += 1
+                continue
+
+            self.metrics.request("github", method, url, resp.status_code, time.monotonic() - started,
+                                 len(body or b""), len(resp.content))
+            if resp.ok:
+                self.throttle.record_success(method, resp.headers)
+                return resp
+            delay = self.throttle.retry_delay(method, resp.status_code, resp.headers, resp.text, attempt)
+            if delay is None:
+                raise HTTPError(resp, method)
+            self.metrics.retry("github", method, url, resp.status_code, delay)
+            print(f"⏳ GitHub returned {resp.status_code} for {method} {url}, retrying in {delay:.1f}s")
+            attempt += 1
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def patch(self, url, **kwargs):
+        return self.request("PATCH", url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request("PUT", url, **kwargs)
+
+    def paginate(self, url, params=None):
+        """Yield every item of a list endpoint by following the Link headers"""
+        while url:
+            resp = self.get(url, params=params)
+            yield from resp.json()
+            url = resp.links.get("next", {}).get("url")
+            params = None  # The next link already carries the query string
+
+
+def _dumps(payload):
+    return json.dumps(payload).encode("utf-8")
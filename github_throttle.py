@@ -0,0 +1,149 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+# Methods GitHub counts as content-creating for its secondary rate limits. They are
+# not idempotent either, so they are only retried when GitHub cannot have applied them.
+WRITE_METHODS = {"POST", "PATCH", "PUT", "DELETE"}
+SERVER_ERRORS = {500, 502, 503, 504}
+
+
+def parse_retry_after(value):
+    """Seconds requested by a Retry-After header (delta-seconds or HTTP-date), or None"""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+def jittered_backoff(attempt, base=2.0, cap=120.0):
+    """Exponential backoff for the given attempt with up to half of it randomised"""
+    delay = min(cap, base * 2 ** attempt)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class GitHubThrottle:
+    """Write pacing, rate-limit pauses and retry decisions for GitHubClient.
+
+    Kept free of any transport so the requests and urllib variants pace identically.
+    One instance is shared by every thread of a migration so pauses apply to the
+    whole process.
+    """
+
+    def __init__(self, write_interval=1.0, max_write_interval=30.0,
+                 max_retries=6, backoff_base=2.0, backoff_cap=120.0):
+        self.min_write_interval = write_interval
+        self.max_write_interval = max_write_interval
+        self.write_interval = write_interval
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self._lock = threading.Lock()
+        self._next_write = 0.0
+        self._blocked_until = 0.0
+
+    def wait_turn(self, method):
+        """Block until this request may be sent
+
+        Returns the seconds slept and why: "rate_limit" for a pause after throttling or
+        errors, "pacing" for the spacing between writes.
+        """
+        # Reserve a slot under the lock, sleep outside of it so other threads can queue up
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._blocked_until)
+            reason = "rate_limit"
+            if method in WRITE_METHODS and self._next_write > start:
+                start = self._next_write
+                reason = "pacing"
+            if method in WRITE_METHODS:
+                self._next_write = start + self.write_interval
+        if start > now:
+            time.sleep(start - now)
+        return max(start - now, 0.0), reason
+
+    def record_success(self, method, headers):
+        """Update pacing from the headers of a successful response"""
+        if method in WRITE_METHODS:
+            # Creep back towards the configured pace after a throttled period
+            with self._lock:
+                self.write_interval = max(self.min_write_interval, self.write_interval * 0.95)
+        # Hold every thread once the primary budget is spent instead of burning a failed call
+        if headers.get("X-RateLimit-Remaining") == "0":
+            self._pause(self._until_reset(headers) + 1)
+
+    def retry_delay(self, method, status, headers, body, attempt):
+        """Seconds to wait before retrying an HTTP error response, or None to give up
+
+        A returned delay has already been applied to every thread sharing the throttle.
+        """
+        if attempt >= self.max_retries:
+            return None
+
+        if status == 429 or (status == 403 and self._is_rate_limited(headers, body)):
+            delay = parse_retry_after(headers.get("Retry-After"))
+            if delay is None and headers.get("X-RateLimit-Remaining") == "0":
+                delay = self._until_reset(headers) + random.uniform(1, 3)
+            elif delay is None and "secondary rate limit" in body.lower():
+                # No Retry-After given: GitHub asks for at least a minute
+                delay = max(60.0, self.backoff(attempt))
+            elif delay is None:
+                delay = self.backoff(attempt)
+            else:
+                delay += random.uniform(0, 1)
+            self._throttled(delay)
+            return delay
+
+        if status in SERVER_ERRORS and method not in WRITE_METHODS:
+            # A write may have been applied before the 5xx; retrying it would duplicate it
+            delay = self.backoff(attempt)
+            self._pause(delay)
+            return delay
+        return None
+
+    def connection_retry_delay(self, method, sent, attempt):
+        """Seconds to wait before retrying after a network error, or None to give up
+
+        sent is False only when the request provably never reached GitHub (connect
+        failures), which is the only case in which a write is safe to resend.
+        """
+        if attempt >= self.max_retries or (sent and method in WRITE_METHODS):
+            return None
+        delay = self.backoff(attempt)
+        self._pause(delay)
+        return delay
+
+    def backoff(self, attempt):
+        return jittered_backoff(attempt, self.backoff_base, self.backoff_cap)
+
+    def _is_rate_limited(self, headers, body):
+        return (headers.get("Retry-After") is not None
+                or headers.get("X-RateLimit-Remaining") == "0"
+                or "rate limit" in body.lower())
+
+    def _until_reset(self, headers):
+        try:
+            reset = float(headers.get("X-RateLimit-Reset"))
+        except (TypeError, ValueError):
+            return 60.0
+        return max(reset - time.time(), 0.0)
+
+    def _pause(self, delay):
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+
+    def _throttled(self, delay):
+        # Concurrent workers usually hit the same limit together; only the first response
+        # of a throttle event slows the write pace down, the rest just join the pause.
+        with self._lock:
+            now = time.monotonic()
+            if now >= self._blocked_until:
+                self.write_interval = min(self.max_write_interval, self.write_interval * 2)
+            self._blocked_until = max(self._blocked_until, now + delay)
@@ -0,0 +1,147 @@
+import json
+import re
+import threading
+import urllib.parse
+
+from ado_client import ADO_URL
+from transport import HTTPError
+
+# How ADO stores @-mentions: an anchor in work item HTML, @<GUID> in PR comment markdown
+HTML_MENTION_RE = re.compile(r'<a\b[^>]*data-vss-mention="version:[\d.]+,([0-9A-Fa-f-]{36})"[^>]*>.*?</a>',
+                             re.DOTALL)
+MARKDOWN_MENTION_RE = re.compile(r"@<([0-9A-Fa-f-]{36})>")
+# Identities live on a separate host for dev.azure.com; ADO Server serves them itself
+IDENTITY_URL = "https://vssps.dev.azure.com" if ADO_URL == "https://dev.azure.com" else ADO_URL
+
+
+def parse_identity_file(path):
+    """Read "ADO_USER GITHUB_LOGIN" lines into {ado user (lowercase): login}
+
+    ADO_USER is the uniqueName of the ADO identity, usually the sign-in email. Blank lines
+    and # comments are skipped.
+    """
+    mapping = {}
+    with open(path) as identities:
+        for line_no, line in enumerate(identities, 1):
+            fields = line.split("#", 1)[0].split()
+            if not fields:
+                continue
+            if len(fields) != 2:
+                raise ValueError(f"{path}:{line_no}: expected ADO_USER GITHUB_LOGIN")
+            mapping[fields[0].lower()] = fields[1].lstrip("@")
+    return mapping
+
+
+class IdentityMap:
+    """Memoized mapping from ADO users to GitHub logins
+
+    A user is resolved from the mapping file first, then, if lookups are enabled, by
+    searching GitHub for their email. Every answer, including "no GitHub account",
+    is kept in memory and in the state file, so each person costs at most one lookup
+    across all runs however many items and comments they appear on. Mentions are
+    stored by ADO as identity GUIDs, which are resolved once each the same way.
+    Without a mapping file or lookups every user keeps their display name.
+    """
+
+    def __init__(self, mapping=None, state=None, github=None, ado=None, org=None):
+        self.mapping = mapping or {}
+        self.state = state
+        self.github = github  # Searched by email when given
+        self.ado = ado  # Resolves mentioned identity GUIDs when given
+        self.org = org
+        self._memo = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return bool(self.mapping or self.github)
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def _memoized(self, key, resolve):
+        """Value of key from memory, the state file or resolve(), storing what resolve returns"""
+        if key in self._memo:
+            return self._memo[key]
+        with self._key_lock(key):
+            if key not in self._memo:
+                cached = self.state.get_identity(key) if self.state is not None else None
+                if cached is not None:
+                    value = json.loads(cached)
+                else:
+                    value = resolve()
+                    if self.state is not None:
+                        self.state.record_identity(key, json.dumps(value))
+                self._memo[key] = value
+        return self._memo[key]
+
+    def login(self, user):
+        """GitHub login of an ADO identity ({"displayName", "uniqueName", ...}), or None"""
+        if not self.enabled or not user:
+            return None
+        unique_name = (user.get("uniqueName") or "").lower()
+        if not unique_name:
+            return None
+        if unique_name in self.mapping:
+            return self.mapping[unique_name]
+        if self.github is None:
+            return None
+        return self._memoized(f"login:{unique_name}", lambda: self.search_login(unique_name))
+
+    def search_login(self, email):
+        """Login of the only GitHub user whose public email is email, or None"""
+        if "@" not in email:
+            return None
+        try:
+            result = self.github.get("/search/users", params={"q": f"{email} in:email"}).json()
+        except HTTPError as e:
+            print(f"⚠️ Could not look up the GitHub account of {email}: {e}")
+            return None
+        return result["items"][0]["login"] if result.get("total_count") == 1 else None
+
+    def name(self, user):
+        """Display name of an ADO identity followed by its GitHub @-mention when known"""
+        login = self.login(user)
+        return f"{user['displayName']} (@{login})" if login else user["displayName"]
+
+    def assignees(self, user):
+        """GitHub assignees list for an ADO identity field (empty when it cannot be mapped)"""
+        login = self.login(user)
+        return [login] if login else []
+
+    def identity(self, identity_id):
+        """{"displayName", "uniqueName"} of an ADO identity GUID, or None"""
+        if self.ado is None:
+            return None
+        return self._memoized(f"ado:{identity_id.lower()}", lambda: self.fetch_identity(identity_id))
+
+    def fetch_identity(self, identity_id):
+        url = (f"{IDENTITY_URL}/{self.org}/_apis/identities?"
+               + urllib.parse.urlencode({"identityIds": identity_id, "api-version": "7.0"}))
+        try:
+            found = self.ado.get(url).json().get("value") or []
+        except HTTPError as e:
+            print(f"⚠️ Could not resolve ADO identity {identity_id}: {e}")
+            return None
+        if not found or not found[0]:
+            return None
+        properties = found[0].get("properties", {})
+        unique_name = (properties.get("Account", {}).get("$value")
+                       or properties.get("Mail", {}).get("$value") or "")
+        return {"displayName": found[0].get("providerDisplayName", ""), "uniqueName": unique_name}
+
+    def rewrite_mentions(self, text):
+        """text with ADO @-mentions replaced by GitHub @-mentions (or plain @names)"""
+        if not self.enabled or not text:
+            return text
+
+        def replace(match):
+            user = self.identity(match.group(1))
+            if not user:
+                return match.group(0)
+            login = self.login(user)
+            return f"@{login}" if login else f"@{user['displayName']}"
+
+        return MARKDOWN_MENTION_RE.sub(replace, HTML_MENTION_RE.sub(replace, text))
@@ -0,0 +1,143 @@
+import threading
+import time
+
+from metrics import Metrics
+
+# The issue import API is still a preview and has to be asked for by media type
+IMPORT_ACCEPT = "application/vnd.github.golden-comet-preview+json"
+POLL_INTERVAL = 5.0  # Seconds between status checks of the imports in flight
+MAX_PENDING = 100  # Imports in flight before submitting waits for some to finish
+IMPORT_TIMEOUT = 1800  # Seconds finish() waits for the last imports before leaving them to the next run
+
+
+class IssueImporter:
+    """Creates issues together with all their comments through GitHub's issue import API
+
+    One write per issue instead of one per issue and comment. Imports complete
+    asynchronously: a background thread checks every import in flight with a single
+    list call (import/issues?since=) per interval, not one call per import, and records
+    each in state as soon as GitHub reports it imported. Submitted imports are kept in
+    state too, so a run interrupted before they finished picks them up again.
+    """
+
+    def __init__(self, github, repo, state, log, metrics=None, poll_interval=POLL_INTERVAL,
+                 max_pending=MAX_PENDING, kind="workitem"):
+        self.github = github
+        self.repo = repo
+        self.state = state
+        self.log = log
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.poll_interval = poll_interval
+        self.max_pending = max_pending
+        self.kind = kind
+        self.index = None
+        self._pending = {}  # import ID -> (ado_id, created_at, content_hash, comment_keys)
+        self._pending_ids = set()
+        self._condition = threading.Condition()
+        self._stop = threading.Event()
+        self._poller = None
+
+    def start(self, index):
+        """Resume the imports an earlier run left in flight and start polling"""
+        self.index = index
+        for ado_id, import_id, created_at, digest, comment_keys in self.state.pending_imports(self.kind):
+            self._pending[import_id] = (ado_id, created_at, digest, comment_keys)
+            self._pending_ids.add(ado_id)
+        if self._pending:
+            self.log.status(f"⏳ Resuming {len(self._pending)} issue imports still in flight")
+        self._stop.clear()
+        self._poller = threading.Thread(target=self._poll_loop, daemon=True)
+        self._poller.start()
+
+    def is_pending(self, ado_id):
+        with self._condition:
+            return int(ado_id) in self._pending_ids
+
+    def submit(self, ado_id, issue, comments, comment_keys, digest):
+        """Queue the import of one issue and its comments, waiting while too many are in flight"""
+        with self._condition:
+            while len(self._pending) >= self.max_pending:
+                self._condition.wait()
+        resp = self.github.post(f"/repos/{self.repo}/import/issues", json={"issue": issue, "comments": comments},
+                                headers={"Accept": IMPORT_ACCEPT})
+        status = resp.json()
+        self.state.record_import(self.kind, ado_id, status["id"], status["created_at"], digest, comment_keys)
+        with self._condition:
+            self._pending[status["id"]] = (int(ado_id), status["created_at"], digest, comment_keys)
+            self._pending_ids.add(int(ado_id))
+        return status["id"]
+
+    def poll(self):
+        """Check every import in flight with one list call; returns how many are still pending"""
+        with self._condition:
+            if not self._pending:
+                return 0
+            since = min(created_at for _, created_at, _, _ in self._pending.values())
+        statuses = self.github.get(f"/repos/{self.repo}/import/issues", params={"since": since},
+                                   headers={"Accept": IMPORT_ACCEPT}).json()
+        for status in statuses:
+            if status["status"] == "pending":
+                continue
+            # Taken out first so the poller thread and finish() never record one import twice
+            with self._condition:
+                pending = self._pending.pop(status["id"], None)
+            if pending is None:
+                continue
+            try:
+                if status["status"] == "imported":
+                    self._imported(status, *pending)
+                else:
+                    self._failed(status, pending[0])
+            except Exception:
+                with self._condition:
+                    self._pending[status["id"]] = pending
+                raise
+            with self._condition:
+                self._pending_ids.discard(pending[0])
+                self._condition.notify_all()
+        with self._condition:
+            return len(self._pending)
+
+    def finish(self):
+        """Wait for the imports in flight, then stop polling"""
+        deadline = time.monotonic() + IMPORT_TIMEOUT
+        try:
+            while self.poll() and time.monotonic() < deadline:
+                time.sleep(self.poll_interval)
+        finally:
+            self._stop.set()
+            if self._poller is not None:
+                self._poller.join()
+        with self._condition:
+            if self._pending:
+                self.log.error(f"{len(self._pending)} issue imports did not finish in {IMPORT_TIMEOUT}s; "
+                               "the next run picks them up")
+
+    def _poll_loop(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"⚠️ Could not check issue import status: {str(e)}")
+
+    def _imported(self, status, ado_id, created_at, digest, comment_keys):
+        issue_url = status.get("issue_url")
+        if not issue_url:  # Not every listing carries it; the single status does
+            issue_url = self.github.get(status["url"], headers={"Accept": IMPORT_ACCEPT}).json()["issue_url"]
+        number = int(issue_url.rstrip("/").rsplit("/", 1)[1])
+        self.state.record_item(self.kind, ado_id, number, digest)
+        for key in comment_keys:
+            self.state.record_comment(self.kind, ado_id, key)
+        self.state.mark_done(self.kind, ado_id)
+        self.state.drop_import(self.kind, ado_id)
+        if self.index is not None:
+            self.index.add(self.kind, ado_id, number)
+        self.metrics.count("issues_imported")
+        self.log.status(f"✅ Imported GitHub issue #{number} with {len(comment_keys)} comments")
+
+    def _failed(self, status, ado_id):
+        errors = "; ".join(str(error) for error in status.get("errors") or []) or status["status"]
+        self.log.error(f"Import of work item {ado_id} failed: {errors}")
+        self.state.drop_import(self.kind, ado_id)
+        if self.index is not None:
+            self.index.release(self.kind, ado_id)
@@ -0,0 +1,162 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers, None when empty"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class Phase:
+    """Items counted during one timed phase of a run"""
+
+    def __init__(self, name):
+        self.name = name
+        self.items = 0
+        self._lock = threading.Lock()
+
+    def add(self, count=1):
+        with self._lock:
+            self.items += count
+
+
+class Metrics:
+    """Thread-safe JSON-lines recorder of request, retry, phase and transfer timings
+
+    Every event is one JSON object per line in path (appended to, so resumed runs keep
+    their history); without a path nothing is written but the end-of-run summary is
+    still aggregated. One instance is shared by the clients and every worker thread.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a", buffering=1) if path else None
+        self._started = time.monotonic()
+        self._services = {}
+        self._phases = {}
+        self._transfers = {}
+        self._counters = {}
+
+    def emit(self, event, **fields):
+        """Write one event line (no-op without a path)"""
+        if self._file is None:
+            return
+        line = json.dumps(dict({"ts": round(time.time(), 3), "event": event}, **fields))
+        with self._lock:
+            self._file.write(line + "\n")
+
+    def _service(self, service):
+        return self._services.setdefault(service, {
+            "requests": 0, "errors": 0, "retries": 0, "bytes_sent": 0, "bytes_received": 0,
+            "request_seconds": 0.0, "wait_seconds": 0.0, "latencies": []})
+
+    def request(self, service, method, url, status, seconds, bytes_sent=0, bytes_received=0):
+        """One HTTP attempt; status is None when it failed without a response"""
+        with self._lock:
+            totals = self._service(service)
+            totals["requests"] += 1
+            totals["errors"] += status is None or status >= 400
+            totals["bytes_sent"] += bytes_sent
+            totals["bytes_received"] += bytes_received
+            totals["request_seconds"] += seconds
+            totals["latencies"].append(seconds)
+        self.emit("request", service=service, method=method, url=url.split("?", 1)[0], status=status,
+                  ms=round(seconds * 1000, 1), bytes_sent=bytes_sent, bytes_received=bytes_received)
+
+    def retry(self, service, method, url, reason, delay):
+        """A request about to be retried after delay seconds"""
+        with self._lock:
+            self._service(service)["retries"] += 1
+        self.emit("retry", service=service, method=method, url=url.split("?", 1)[0], reason=str(reason),
+                  delay=round(delay, 3))
+
+    def wait(self, service, seconds, reason):
+        """Time a thread spent sleeping on pacing, throttling or backoff"""
+        if seconds <= 0:
+            return
+        with self._lock:
+            self._service(service)["wait_seconds"] += seconds
+        self.emit("wait", service=service, seconds=round(seconds, 3), reason=reason)
+
+    def count(self, name, value=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def transfer(self, name, repo, size, seconds):
+        """A git transfer step (fetch, LFS, push) of a repository"""
+        with self._lock:
+            totals = self._transfers.setdefault(name, {"count": 0, "bytes": 0, "seconds": 0.0})
+            totals["count"] += 1
+            totals["bytes"] += size
+            totals["seconds"] += seconds
+        self.emit("transfer", name=name, repo=repo, bytes=size, seconds=round(seconds, 3))
+
+    @contextmanager
+    def phase(self, name):
+        """Time a phase of the run; items counted on the yielded Phase give its throughput"""
+        phase = Phase(name)
+        started = time.monotonic()
+        try:
+            yield phase
+        finally:
+            seconds = time.monotonic() - started
+            with self._lock:
+                totals = self._phases.setdefault(name, {"seconds": 0.0, "items": 0})
+                totals["seconds"] += seconds
+                totals["items"] += phase.items
+            self.emit("phase", phase=name, seconds=round(seconds, 3), items=phase.items,
+                      items_per_sec=round(phase.items / seconds, 2) if seconds else None)
+
+    def totals(self, service):
+        """Requests made to a service so far and the seconds they took"""
+        with self._lock:
+            totals = self._services.get(service, {})
+            return {"requests": totals.get("requests", 0), "request_seconds": totals.get("request_seconds", 0.0)}
+
+    def summary(self):
+        """End-of-run totals per service, phase and transfer, also written as a summary event"""
+        with self._lock:
+            services = {}
+            for service, totals in self._services.items():
+                latencies = totals["latencies"]
+                services[service] = dict(
+                    {key: value for key, value in totals.items() if key != "latencies"},
+                    request_seconds=round(totals["request_seconds"], 3),
+                    wait_seconds=round(totals["wait_seconds"], 3),
+                    p50_ms=round(percentile(latencies, 0.5) * 1000, 1) if latencies else None,
+                    p95_ms=round(percentile(latencies, 0.95) * 1000, 1) if latencies else None)
+            phases = {name: dict(totals, seconds=round(totals["seconds"], 3),
+                                 items_per_sec=round(totals["items"] / totals["seconds"], 2)
+                                 if totals["seconds"] else None)
+                      for name, totals in self._phases.items()}
+            transfers = {name: dict(totals, seconds=round(totals["seconds"], 3))
+                         for name, totals in self._transfers.items()}
+            result = {"seconds": round(time.monotonic() - self._started, 3), "services": services,
+                      "phases": phases, "transfers": transfers, "counters": dict(self._counters)}
+        self.emit("summary", **result)
+        return result
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def print_summary(summary):
+    """Console digest of Metrics.summary(): where the time of the run went"""
+    print(f"📊 Run took {summary['seconds']:.1f}s")
+    for service, totals in summary["services"].items():
+        print(f"   {service}: {totals['requests']} requests ({totals['errors']} failed, {totals['retries']} retried), "
+              f"{totals['request_seconds']:.1f}s in requests, p50 {totals['p50_ms']} ms, p95 {totals['p95_ms']} ms, "
+              f"{totals['wait_seconds']:.1f}s waiting on throttling/backoff")
+    for name, totals in summary["phases"].items():
+        print(f"   {name}: {totals['items']} items in {totals['seconds']:.1f}s ({totals['items_per_sec']} items/s)")
+    for name, totals in summary["transfers"].items():
+        print(f"   git {name}: {totals['count']} steps, {totals['bytes'] / 2**20:.1f} MiB in {totals['seconds']:.1f}s")
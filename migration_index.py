@@ -0,0 +1,100 @@
+import re
+import threading
+
+# Hidden marker put at the top of every migrated issue/PR body. It survives title edits
+# and tells apart ADO items that happen to share a title.
+MARKER_RE = re.compile(r"<!-- ado-migration: (workitem|pr)/(\d+) -->")
+# Issues migrated before the marker existed still carry the ADO work item link
+LEGACY_WORKITEM_RE = re.compile(r"/_workitems/edit/(\d+)")
+
+
+def marker(kind, ado_id):
+    """Hidden body marker identifying the ADO item a GitHub issue/PR was created from"""
+    return f"<!-- ado-migration: {kind}/{ado_id} -->"
+
+
+class MigrationIndex:
+    """Hash map from ADO IDs to GitHub numbers, built once from the target repo
+
+    Lookups are O(1). claim() lets concurrent workers reserve an ADO ID before creating
+    it so the same item is never created twice within a run.
+    """
+
+    def __init__(self):
+        self._numbers = {}
+        self._legacy_prs = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._numbers)
+
+    def add(self, kind, ado_id, number):
+        with self._lock:
+            self._numbers[(kind, int(ado_id))] = number
+
+    def add_from_body(self, number, body, legacy_kind=None):
+        """Index a GitHub issue/PR from the marker (or legacy ADO link) in its body"""
+        body = body or ""
+        match = MARKER_RE.search(body)
+        if match:
+            self.add(match.group(1), match.group(2), number)
+            return True
+        if legacy_kind == "workitem":
+            match = LEGACY_WORKITEM_RE.search(body)
+            if match:
+                self.add("workitem", match.group(1), number)
+                return True
+        return False
+
+    def add_legacy_pr(self, title, head, base, number):
+        """Index a PR migrated before markers existed by its title and branches"""
+        with self._lock:
+            self._legacy_prs[(title, head, base)] = number
+
+    def get(self, kind, ado_id):
+        return self._numbers.get((kind, int(ado_id)))
+
+    def items(self, kind):
+        """(ado_id, number) of every created item of this kind"""
+        with self._lock:
+            return [(ado_id, number) for (k, ado_id), number in self._numbers.items()
+                    if k == kind and number is not None]
+
+    def get_legacy_pr(self, title, head, base):
+        return self._legacy_prs.get((title, head, base))
+
+    def claim(self, kind, ado_id):
+        """Reserve an ADO ID for creation; False if it already exists or is being created"""
+        key = (kind, int(ado_id))
+        with self._lock:
+            if key in self._numbers:
+                return False
+            self._numbers[key] = None
+            return True
+
+    def release(self, kind, ado_id):
+        """Give up a claim after a failed create so a later run can retry it"""
+        key = (kind, int(ado_id))
+        with self._lock:
+            if self._numbers.get(key) is None:
+                self._numbers.pop(key, None)
+
+
+def build_issue_index(github, repo, index=None):
+    """Index every issue of the repo (all states) by the work item it was migrated from"""
+    if index is None:
+        index = MigrationIndex()
+    for issue in github.paginate(f"/repos/{repo}/issues", params={"state": "all", "per_page": 100}):
+        if "pull_request" not in issue:
+            index.add_from_body(issue["number"], issue.get("body"), legacy_kind="workitem")
+    return index
+
+
+def build_pr_index(github, repo, index=None):
+    """Index every PR of the repo (all states) by the ADO PR it was migrated from"""
+    if index is None:
+        index = MigrationIndex()
+    for pr in github.paginate(f"/repos/{repo}/pulls", params={"state": "all", "per_page": 100}):
+        if not index.add_from_body(pr["number"], pr.get("body")):
+            index.add_legacy_pr(pr["title"], pr["head"]["ref"], pr["base"]["ref"], pr["number"])
+    return index
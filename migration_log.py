@@ -0,0 +1,61 @@
+import threading
+
+DEFAULT_ERROR_LOG = "migration_errors.log"
+
+
+class MigrationLog:
+    """Console status lines and an append-only error file shared by every worker thread
+
+    path=None keeps errors on the console only, for callers running migrations in-process.
+    """
+
+    def __init__(self, path=DEFAULT_ERROR_LOG):
+        self.path = path
+        self.error_count = 0
+        self._lock = threading.Lock()
+        self._file = open(path, "a") if path else None
+
+    def error(self, message):
+        with self._lock:
+            self.error_count += 1
+            print("❌", message)
+            if self._file is not None:
+                self._file.write(message + "\n")
+
+    def status(self, message):
+        with self._lock:
+            print(message)
+
+    def scoped(self, name):
+        """View of this log for one of several migrations running side by side"""
+        return ScopedLog(self, name)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class ScopedLog:
+    """Prefixes messages with a name and counts only its own errors
+
+    Lets each repository of a project run check its own error count (which decides
+    whether its watermark moves) while every message still goes to the shared log.
+    """
+
+    def __init__(self, log, name):
+        self.log = log
+        self.name = name
+        self.error_count = 0
+        self._lock = threading.Lock()
+
+    def error(self, message):
+        with self._lock:
+            self.error_count += 1
+        self.log.error(f"{self.name}: {message}")
+
+    def status(self, message):
+        # Keep a leading blank line in front of the prefix
+        stripped = message.lstrip("\n")
+        self.log.status(message[:len(message) - len(stripped)] + f"[{self.name}] {stripped}")
@@ -0,0 +1,90 @@
+import queue
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+_END = object()
+
+
+def run_bounded(items, worker, workers, backlog=2):
+    """Run worker(item) for every item on a thread pool of the given size
+
+    Items are pulled from the iterable only while fewer than workers * backlog are
+    queued or running, so a slow consumer does not drain a streaming source into memory.
+    Exceptions escaping worker are re-raised here rather than lost in their futures.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        in_flight = set()
+        for item in items:
+            if len(in_flight) >= workers * backlog:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    future.result()
+            in_flight.add(executor.submit(worker, item))
+        for future in in_flight:
+            future.result()
+
+
+def ordered_map(items, worker, workers, backlog=2):
+    """Yield worker(item) for every item in input order, computing them on a thread pool
+
+    At most workers * backlog items are submitted ahead of the one being yielded. If the
+    consumer stops early, work that has not started yet is cancelled.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        try:
+            for item in items:
+                pending.append(executor.submit(worker, item))
+                if len(pending) >= workers * backlog:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def prefetch(items, depth):
+    """Yield the items of an iterable that is consumed on a background thread
+
+    The source runs ahead of the consumer by at most depth items, so slow fetches overlap
+    with the processing of earlier items while memory stays bounded. An exception raised
+    by the source is re-raised here after the items before it. Closing the generator
+    stops the source and waits for its thread.
+    """
+    ready = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def put(entry):
+        while not stop.is_set():
+            try:
+                ready.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for item in items:
+                if not put((item, None)):
+                    return
+        except Exception as e:
+            put((_END, e))
+            return
+        put((_END, None))
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+    try:
+        while True:
+            item, error = ready.get()
+            if item is _END:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stop.set()
+        producer.join()
@@ -0,0 +1,92 @@
+import threading
+import time
+
+# GitHub's documented secondary limits on content-creating requests. GHES has no hourly
+# cap by default, hence --writes-per-hour 0.
+SECONDARY_WRITES_PER_MINUTE = 80
+SECONDARY_WRITES_PER_HOUR = 500
+
+
+class Plan:
+    """What a migration run would do, counted by reading ADO and the state file only
+
+    Counters are added to from every worker thread. ado_reads holds the ADO calls the run
+    makes on top of those the planning itself made, such as the comment lists of work
+    items, whose lengths the plan reads from System.CommentCount instead.
+    """
+
+    def __init__(self, items_name):
+        self.items_name = items_name
+        self.items = 0
+        self.done = 0
+        self.creates = 0
+        self.resumed = 0
+        self.updates = 0
+        self.comments = 0
+        self.imports = 0
+        self.ado_reads = 0
+        self.upper_bound = False  # Delta runs count possible updates, not certain ones
+        self._lock = threading.Lock()
+
+    def add(self, **counts):
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    @property
+    def writes(self):
+        return self.creates + self.updates + self.comments + self.imports
+
+
+def rate_limit(github):
+    """(limit, remaining, reset epoch) of the token's core REST budget; the call costs nothing"""
+    core = github.get("/rate_limit").json()["resources"]["core"]
+    return core["limit"], core["remaining"], core["reset"]
+
+
+def project_duration(writes, write_interval, budget, ado_seconds, writes_per_hour=SECONDARY_WRITES_PER_HOUR,
+                     now=None):
+    """(seconds, limit) the run is expected to take at least, and the limit that decides it
+
+    Writes are paced one at a time whatever the concurrency, no faster than GitHub's
+    per-minute cap. Beyond the hourly cap they wait for the next hour, and beyond the
+    remaining primary budget for the budget to reset.
+    """
+    now = time.time() if now is None else now
+    limit, remaining, reset = budget
+    pace = max(write_interval, 60 / SECONDARY_WRITES_PER_MINUTE)
+    bounds = {"write pacing": writes * pace, "ADO reads": ado_seconds}
+    if writes_per_hour and writes > writes_per_hour:
+        bounds[f"{writes_per_hour} writes/hour limit"] = (3600 * ((writes - 1) // writes_per_hour)
+                                                         + ((writes - 1) % writes_per_hour + 1) * pace)
+    if writes > remaining:
+        bounds["primary rate limit"] = max(reset - now, 0) + 3600 * ((writes - remaining - 1) // max(limit, 1))
+    reason = max(bounds, key=bounds.get)
+    return bounds[reason], reason
+
+
+def format_duration(seconds):
+    minutes, seconds = divmod(round(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}h {minutes:02d}m"
+    return f"{minutes}m {seconds:02d}s" if minutes else f"{seconds}s"
+
+
+def print_plan(plan, github, metrics, workers, write_interval, writes_per_hour=SECONDARY_WRITES_PER_HOUR):
+    """Print what the planned run would write and how long it should take"""
+    limit, remaining, reset = budget = rate_limit(github)
+    ado = metrics.totals("ado")
+    latency = ado["request_seconds"] / ado["requests"] if ado["requests"] else 0.0
+    ado_reads = ado["requests"] + plan.ado_reads
+    seconds, reason = project_duration(plan.writes, write_interval, budget, ado_reads * latency / workers,
+                                       writes_per_hour)
+
+    pending = plan.items - plan.done
+    print(f"\n📋 Plan: {plan.items} {plan.items_name}, {plan.done} already migrated, {pending} to migrate")
+    print(f"   GitHub writes: {plan.writes}{' at most' if plan.upper_bound else ''} "
+          f"({plan.creates} creates, {plan.imports} imports, {plan.updates} updates, {plan.comments} comments)")
+    print(f"   ADO reads: {ado_reads}, {latency * 1000:.0f} ms each on average")
+    print(f"   GitHub budget: {remaining} of {limit} requests left, resets in "
+          f"{format_duration(max(reset - time.time(), 0))}")
+    print(f"   Estimated duration: {format_duration(seconds)} with {workers} workers, bound by the {reason}")
@@ -0,0 +1,425 @@
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+
+from ado_client import ADO_URL, AdoClient
+from cli import (add_client_arguments, add_identity_arguments, add_run_arguments, check_run_arguments, credentials,
+                 finish_metrics, identity_map)
+from delta import changed_since, content_hash, next_watermark
+from github_client import GitHubClient
+from identity import IdentityMap
+from metrics import Metrics
+from migration_index import build_pr_index, marker
+from migration_log import MigrationLog
+from pipeline import prefetch, run_bounded
+from plan import Plan, print_plan
+from state_store import StateStore, load_index
+
+
+def creation_day(pr):
+    """YYYY-MM-DD an ADO PR was created on"""
+    created_at_str = pr["creationDate"].split(".")[0] + "Z"
+    return datetime.strptime(created_at_str, "%Y-%m-%dT%H:%M:%S%z").strftime("%Y-%m-%d")
+
+
+class AdoPullRequestSource:
+    """Pull requests and their comment threads of one ADO repository"""
+
+    def __init__(self, ado, org, project, repo):
+        self.ado = ado
+        self.org = org
+        self.project = project
+        self.repo = repo
+        self.base_url = f"{ADO_URL}/{org}/{project}/_apis/git/repositories/{repo}"
+
+    def pull_requests(self, status="all"):
+        """Lazy stream of the repository's PRs with the given status, page by page"""
+        # Without searchCriteria.status ADO only lists active PRs, and a single call only
+        # returns the first page
+        return self.ado.paginate(f"{self.base_url}/pullrequests?searchCriteria.status={status}&api-version=7.0")
+
+    def threads(self, pr_id):
+        return self.ado.paginate_continuation(f"{self.base_url}/pullRequests/{pr_id}/threads?api-version=7.0")
+
+
+class GitHubPullSink:
+    """Pull requests and PR comments of one GitHub repository"""
+
+    def __init__(self, github, repo):
+        self.github = github
+        self.repo = repo
+
+    def existing(self):
+        """MigrationIndex of the PRs already migrated to the repository"""
+        return build_pr_index(self.github, self.repo)
+
+    def create(self, title, body, head, base):
+        """Open a PR; returns its number"""
+        resp = self.github.post(f"/repos/{self.repo}/pulls",
+                                json={"title": title, "body": body, "head": head, "base": base})
+        return resp.json()["number"]
+
+    def update(self, number, title, body):
+        self.github.patch(f"/repos/{self.repo}/pulls/{number}", json={"title": title, "body": body})
+
+    def comment(self, number, body):
+        self.github.post(f"/repos/{self.repo}/issues/{number}/comments", json={"body": body})
+
+
+class PullRequestMigration:
+    """Migrates the PRs of a source into PRs of a sink
+
+    Progress is recorded in state so an interrupted run resumes where it stopped, and a
+    delta run only revisits what changed since the last successful run. The caller owns
+    state, log and metrics and closes them.
+    """
+
+    def __init__(self, source, sink, state, log, metrics=None, workers=1, pr_status="all",
+                 delta=False, since=None, rescan=False, identities=None):
+        self.source = source
+        self.sink = sink
+        self.state = state
+        self.log = log
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.workers = workers
+        self.pr_status = pr_status
+        self.delta = delta
+        self.since = since
+        self.rescan = rescan
+        self.identities = identities if identities is not None else IdentityMap()
+        self.index = None
+        self._phase = None
+
+    @property
+    def watermark_name(self):
+        return f"prs:{self.source.org}/{self.source.project}/{self.source.repo}"
+
+    def run(self):
+        """Migrate everything pending; False if the run could not start"""
+        run_started = datetime.now(timezone.utc)
+        if self.delta:
+            # A delta run only posts what changed since the previous successful run started
+            self.since = self.since or self.state.get_watermark(self.watermark_name)
+            if self.since:
+                self.log.status(f"🔄 Syncing PRs changed since {self.since}")
+            else:
+                self.log.status("🔄 No successful run recorded yet, syncing every PR")
+
+        # Keyed on the ADO PR ID recorded in each migrated PR; PRs migrated before the marker
+        # existed are matched on title and branches. After the first run the index comes from
+        # the state file and GitHub is not listed again.
+        self.log.status("🔍 Fetching existing GitHub PRs to avoid duplicates...")
+        try:
+            with self.metrics.phase("index_github_prs") as phase:
+                self.index = load_index(self.state, "pr", self.sink.existing, self.rescan, scope=self.watermark_name)
+                phase.add(len(self.index))
+        except Exception as e:
+            self.log.error(f"Failed to fetch GitHub PRs: {str(e)}")
+            return False
+
+        # PR pages are fetched on a background thread, a bounded distance ahead of the pool.
+        # Each PR's comments are posted by the worker that created it, right after the create
+        # call returns the PR number, while other workers pipeline the next PRs.
+        errors_before = self.log.error_count
+        prs = prefetch(self.source.pull_requests(self.pr_status), self.workers * 2)
+        try:
+            with self.metrics.phase("migrate_prs") as self._phase:
+                run_bounded(prs, self.migrate_pr, self.workers)
+        except Exception as e:
+            self.log.error(f"Failed to fetch PRs: {str(e)}")
+        finally:
+            prs.close()
+
+        # Only an error-free run moves the watermark, so the next delta run retries anything
+        # this one missed
+        if self.log.error_count == errors_before:
+            self.state.set_watermark(self.watermark_name, next_watermark(run_started))
+        return True
+
+    def plan(self, plan):
+        """Count what run() would write into plan, reading ADO and the state file only
+
+        GitHub is only listed when run() would list it; the index is then kept in state
+        so the run that follows does not list it again.
+        """
+        if self.delta:
+            self.since = self.since or self.state.get_watermark(self.watermark_name)
+        self.index = load_index(self.state, "pr", self.sink.existing, self.rescan, scope=self.watermark_name)
+        prs = prefetch(self.source.pull_requests(self.pr_status), self.workers * 2)
+        try:
+            run_bounded(prs, lambda pr: self.plan_pr(pr, plan), self.workers)
+        finally:
+            prs.close()
+
+    def plan_pr(self, pr, plan):
+        """Count the writes migrate_pr would make for one PR"""
+        pr_id = pr["pullRequestId"]
+        plan.add(items=1)
+        pr_number = self.state.get_number("pr", pr_id)
+        closed_date = pr.get("closedDate")
+        if (not self.delta and self.state.done_among("pr", [pr_id])) or (
+                pr_number is not None and self.since and closed_date and not changed_since(closed_date, self.since)):
+            plan.add(done=1)
+            return
+        if pr_number is None:
+            if self.index.get("pr", pr_id) is not None or self.index.get_legacy_pr(
+                    pr["title"], pr["sourceRefName"].replace("refs/heads/", ""),
+                    pr["targetRefName"].replace("refs/heads/", "")):
+                plan.add(done=1)
+                return
+            plan.add(creates=1)
+        elif self.delta:
+            body = self.pr_body(pr_id, self.identities.rewrite_mentions(pr["description"] or ""),
+                                self.identities.name(pr["createdBy"]), creation_day(pr))
+            if self.state.get_hash("pr", pr_id) != content_hash({"title": pr["title"], "body": body}):
+                plan.add(updates=1)
+        else:
+            plan.add(resumed=1)
+        posted = self.state.posted_comments("pr", pr_id)
+        plan.add(comments=sum(1 for thread in self.source.threads(pr_id) for comment in thread.get("comments", [])
+                              if f"{thread['id']}/{comment['id']}" not in posted
+                              and changed_since(comment["publishedDate"], self.since)))
+
+    def migrate_pr(self, pr):
+        """Create the GitHub PR for an ADO PR, then post its thread comments in order"""
+        title = pr["title"]
+        raw_description = self.identities.rewrite_mentions(pr["description"] or "")
+        source_branch = pr["sourceRefName"].replace("refs/heads/", "")
+        target_branch = pr["targetRefName"].replace("refs/heads/", "")
+        created_by = self.identities.name(pr["createdBy"])
+        created_on = creation_day(pr)
+
+        pr_id = pr["pullRequestId"]
+        # A delta run revisits completed PRs to bring them up to date
+        if not self.delta and self.state.done_among("pr", [pr_id]):
+            self.log.status(f"⏩ Skipping migrated PR: {title}")
+            return
+        pr_number = self.state.get_number("pr", pr_id)
+        closed_date = pr.get("closedDate")
+        if pr_number is not None and self.since and closed_date and not changed_since(closed_date, self.since):
+            # Closed before the last sync, so neither the PR nor its threads can have changed
+            return
+        if pr_number is not None and self.delta:
+            try:
+                if self.update_pr(pr_id, title, self.pr_body(pr_id, raw_description, created_by, created_on),
+                                  pr_number):
+                    self.metrics.count("prs_updated")
+                    self.log.status(f"🔄 Updated GitHub PR #{pr_number}: {title}")
+            except Exception as e:
+                self.log.error(f"Failed to update PR '{title}': {str(e)}")
+                return
+        elif pr_number is not None:
+            # Created by an interrupted run; only the missing comments are posted
+            self.log.status(f"🔁 Resuming PR #{pr_number}: {title}")
+        else:
+            legacy_number = self.index.get_legacy_pr(title, source_branch, target_branch)
+            if legacy_number:
+                self.state.record_existing("pr", pr_id, legacy_number)
+            # Claim the ID before creating so concurrent workers never create it twice
+            if legacy_number or not self.index.claim("pr", pr_id):
+                self.log.status(f"⏩ Skipping existing PR: {title}")
+                return
+            pr_number = self.create_pr(pr_id, title, raw_description, source_branch, target_branch,
+                                       created_by, created_on)
+            if pr_number is None:
+                return
+
+        posted = self.state.posted_comments("pr", pr_id)
+        try:
+            for thread in self.source.threads(pr_id):
+                if not self.post_thread_comments(thread, pr_id, pr_number, title, posted):
+                    return
+        except Exception as e:
+            self.log.error(f"Failed to fetch comments for PR {title}: {str(e)}")
+            return
+        self.state.mark_done("pr", pr_id)
+        self._phase.add()
+
+    def pr_body(self, pr_id, raw_description, created_by, created_on):
+        """Markdown body of the GitHub PR for an ADO PR"""
+        attribution = f"_Originally created by **{created_by}** on {created_on} in Azure DevOps_\n\n"
+        return marker("pr", pr_id) + "\n" + attribution + raw_description
+
+    def create_pr(self, pr_id, title, raw_description, source_branch, target_branch, created_by, created_on):
+        """Create the GitHub PR for an ADO PR and record it; returns the PR number or None"""
+        body = self.pr_body(pr_id, raw_description, created_by, created_on)
+
+        self.log.status(f"\n📦 Creating PR: {title}")
+        try:
+            pr_number = self.sink.create(title, body, source_branch, target_branch)
+        except Exception as e:
+            self.index.release("pr", pr_id)
+            self.log.error(f"Failed to create PR '{title}': {str(e)}")
+            return None
+
+        self.metrics.count("prs_created")
+        self.index.add("pr", pr_id, pr_number)
+        self.state.record_item("pr", pr_id, pr_number, content_hash({"title": title, "body": body}))
+        return pr_number
+
+    def update_pr(self, pr_id, title, body, pr_number):
+        """Bring the title and body of a migrated PR up to date; False if nothing changed"""
+        digest = content_hash({"title": title, "body": body})
+        if self.state.get_hash("pr", pr_id) == digest:
+            return False
+        self.sink.update(pr_number, title, body)
+        self.state.set_hash("pr", pr_id, digest)
+        return True
+
+    def post_thread_comments(self, thread, pr_id, pr_number, title, posted):
+        """Post the not yet posted comments of one ADO thread in order; False on failure"""
+        for comment in thread.get("comments", []):
+            comment_key = f"{thread['id']}/{comment['id']}"
+            if comment_key in posted or not changed_since(comment["publishedDate"], self.since):
+                continue
+            author = self.identities.name(comment["author"])
+            date = datetime.strptime(comment["publishedDate"], "%Y-%m-%dT%H:%M:%S.%fZ").strftime("%Y-%m-%d")
+            content = self.identities.rewrite_mentions(comment["content"])
+            try:
+                self.sink.comment(pr_number, f"_Comment by **{author}** on {date}_:\n\n{content}")
+            except Exception as e:
+                # Stop here so a rerun posts the rest after this one, keeping the order
+                self.log.error(f"Failed to post comment from {author} on PR '{title}': {str(e)}")
+                return False
+            self.state.record_comment("pr", pr_id, comment_key)
+            self.metrics.count("comments_posted")
+        return True
+
+
+def parse_repo_manifest(path):
+    """Read "ADO_REPO GITHUB_REPO" lines into {ADO repo name (lowercase): (ADO repo, owner/repo)}
+
+    Blank lines and # comments are skipped.
+    """
+    repos = {}
+    with open(path) as manifest:
+        for line_no, line in enumerate(manifest, 1):
+            fields = line.split("#", 1)[0].split()
+            if not fields:
+                continue
+            if len(fields) != 2 or fields[1].count("/") != 1:
+                raise ValueError(f"{path}:{line_no}: expected ADO_REPO GITHUB_OWNER/REPO")
+            repos[fields[0].lower()] = (fields[0], fields[1])
+    return repos
+
+
+def project_pairs(repositories, manifest, log):
+    """(ADO repo, GitHub repo) of every repository of the project listed in the manifest
+
+    ADO repository names are case-insensitive. Manifest lines naming no repository of the
+    project are reported as errors; repositories missing from the manifest are skipped.
+    """
+    names = {repo["name"].lower(): repo["name"] for repo in repositories}
+    pairs = []
+    for key, (ado_repo, github_repo) in manifest.items():
+        if key in names:
+            pairs.append((names[key], github_repo))
+        else:
+            log.error(f"Repository '{ado_repo}' from the manifest is not in the ADO project")
+    unlisted = len(names) - len(pairs)
+    if unlisted:
+        log.status(f"⏩ Skipping {unlisted} repositories of the project that are not in the manifest")
+    return pairs
+
+
+def migrate_repositories(migrations, parallel, log, metrics=None):
+    """Run {name: PullRequestMigration} parallel at a time; returns the names that did not start
+
+    The migrations share their clients, so connections, identity lookups and GitHub's
+    rate-limit budget are shared too; each still uses its own workers for its PRs.
+    """
+    metrics = metrics if metrics is not None else Metrics()
+    failed = []
+    with metrics.phase("migrate_repositories") as phase, ThreadPoolExecutor(max_workers=parallel) as executor:
+        futures = {executor.submit(migration.run): name for name, migration in migrations.items()}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                started = future.result()
+            except Exception as e:
+                log.error(f"{name}: {str(e)}")
+                started = False
+            if started:
+                phase.add()
+            else:
+                failed.append(name)
+    return sorted(failed)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Migrate PRs from Azure DevOps to GitHub.")
+    add_client_arguments(parser, github_repo_required=False)
+    parser.add_argument("--ado-repo", help="Azure DevOps repo ID or name")
+    parser.add_argument("--pr-status", default="all", choices=["active", "completed", "abandoned", "all"],
+                        help="Which ADO pull requests to migrate (default: all)")
+    add_identity_arguments(parser)
+    add_run_arguments(parser, "PRs")
+    project = parser.add_argument_group("project mode", "Migrate the PRs of many repositories in one process")
+    project.add_argument("--repo-manifest",
+                         help="File of 'ADO_REPO GITHUB_OWNER/REPO' lines; the listed repositories of "
+                              "--ado-project are migrated instead of --ado-repo")
+    project.add_argument("--parallel-repos", type=int, default=4,
+                         help="Number of repositories migrated at once, each with --workers workers")
+    return parser
+
+
+def main(argv, make_transport):
+    """Command line entry point; make_transport(workers) builds the HTTP transport to use"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    check_run_arguments(parser, args)
+    if args.repo_manifest:
+        if args.ado_repo or args.github_repo:
+            parser.error("--repo-manifest replaces --ado-repo and --github-repo")
+        if args.parallel_repos < 1:
+            parser.error("--parallel-repos must be at least 1")
+    elif not (args.ado_repo and args.github_repo):
+        parser.error("give --ado-repo and --github-repo, or --repo-manifest for project mode")
+    ado_pat, github_token = credentials(args)
+
+    parallel = args.parallel_repos if args.repo_manifest else 1
+    metrics = Metrics(args.metrics_file)
+    # One transport, client pair, identity map and state file for every repository
+    transport = make_transport(args.workers * parallel)
+    ado = AdoClient(ado_pat, transport, metrics=metrics)
+    github = GitHubClient(github_token, transport, write_interval=args.write_interval, metrics=metrics)
+    log = MigrationLog()
+    state = StateStore(args.state_file)
+    identities = identity_map(args, state, ado, github)
+
+    def migration(ado_repo, github_repo, repo_log):
+        return PullRequestMigration(AdoPullRequestSource(ado, args.ado_org, args.ado_project, ado_repo),
+                                    GitHubPullSink(github, github_repo), state, repo_log, metrics,
+                                    workers=args.workers, pr_status=args.pr_status, delta=args.delta,
+                                    since=args.since, rescan=args.rescan, identities=identities)
+
+    try:
+        if args.repo_manifest:
+            pairs = project_pairs(ado.repositories(args.ado_org, args.ado_project),
+                                  parse_repo_manifest(args.repo_manifest), log)
+            migrations = {ado_repo: migration(ado_repo, github_repo, log.scoped(ado_repo))
+                          for ado_repo, github_repo in pairs}
+        else:
+            migrations = {args.ado_repo: migration(args.ado_repo, args.github_repo, log)}
+        if args.plan:
+            plan = Plan("PRs")
+            with ThreadPoolExecutor(max_workers=parallel) as executor:
+                list(executor.map(lambda repo_migration: repo_migration.plan(plan), migrations.values()))
+            print_plan(plan, github, metrics, args.workers * parallel, args.write_interval, args.writes_per_hour)
+            return 0
+        if args.repo_manifest:
+            log.status(f"📦 Migrating the PRs of {len(migrations)} repositories, {parallel} at a time")
+            failed = migrate_repositories(migrations, parallel, log, metrics)
+            for name in failed:
+                print(f"❌ {name}: could not be migrated")
+            started = not failed
+        else:
+            started = migrations[args.ado_repo].run()
+    finally:
+        state.close()
+        log.close()
+        finish_metrics(metrics, args)
+    if not started:
+        return 1
+    print("\n✅ Migration complete. Check 'migration_errors.log' for any issues.")
+    return 0
@@ -0,0 +1,112 @@
+import argparse
+import os
+import urllib.parse
+
+from git_refs import GitError, git_output, mismatched_refs, missing_objects, remote_refs, run_with_refspecs
+
+# Branches and tags; refs/pull and other service-owned namespaces stay on their side
+SYNC_PREFIXES = {"heads": "refs/heads/", "tags": "refs/tags/"}
+DEFAULT_SYNC_DIR = "ref_sync_cache"
+
+
+def synced_refs(refs, prefixes):
+    return {ref: sha for ref, sha in refs.items() if ref.startswith(tuple(prefixes))}
+
+
+def sync_plan(source, target):
+    """({ref: sha} to set on the target, refs to delete from it) to make it match the source"""
+    updates = {ref: sha for ref, sha in sorted(source.items()) if target.get(ref) != sha}
+    deletions = sorted(ref for ref in target if ref not in source)
+    return updates, deletions
+
+
+
+
+def authenticated_url(url, user, secret):
+    """url with user:secret added, unless it has credentials already or there is no secret"""
+    parts = urllib.parse.urlsplit(url)
+    if not secret or parts.scheme not in ("http", "https") or "@" in parts.netloc:
+        return url
+    credentials = f"{urllib.parse.quote(user, safe='')}:{urllib.parse.quote(secret, safe='')}"
+    return urllib.parse.urlunsplit(parts._replace(netloc=f"{credentials}@{parts.netloc}"))
+
+
+def prepare_repo(path, source_url, target_url):
+    """Bare cache repository at path with "source" and "target" remotes
+
+    The URLs may carry credentials, so they live in the repository config and every
+    command (and its printed command line) refers to the remotes by name.
+    """
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        git_output(["git", "init", "--quiet", "--bare", path])
+    for name, url in (("source", source_url), ("target", target_url)):
+        git_output(["git", "config", f"remote.{name}.url", url], cwd=path)
+
+
+
+
+def sync_repo(source_url, target_url, path, prefixes=tuple(SYNC_PREFIXES.values()), dry_run=False, log=None):
+    """Make the branches and tags of the target match the source; returns (updates, deletions)
+
+    Both sides are compared with ls-remote, only objects missing from the cache are
+    fetched, and the whole delta is applied with one atomic push, so the target never
+    ends up half-synced. No working tree is checked out.
+    """
+    prepare_repo(path, source_url, target_url)
+    source = synced_refs(remote_refs("source", cwd=path), prefixes)
+    target = synced_refs(remote_refs("target", cwd=path), prefixes)
+    updates, deletions = sync_plan(source, target)
+    if dry_run or not (updates or deletions):
+        return updates, deletions
+
+    missing = missing_objects(path, updates.values())
+    fetch = [f"+{ref}:{ref}" for ref, sha in updates.items() if sha in missing]
+    if fetch:
+        run_with_refspecs(path, ["fetch", "--no-tags", "source"], "source", "fetch", fetch, log=log)
+    # Pushed by object ID, so refs whose objects were cached already need no local ref
+    refspecs = [f"+{sha}:{ref}" for ref, sha in updates.items()] + [f":{ref}" for ref in deletions]
+    run_with_refspecs(path, ["push", "--atomic", "--porcelain", "target"], "target", "push", refspecs, log=log)
+
+    mismatched = mismatched_refs(source, synced_refs(remote_refs("target", cwd=path), prefixes))
+    if mismatched:
+        raise GitError(f"{len(mismatched)} refs differ between the source and the target after the push, "
+                       f"e.g. {', '.join(mismatched[:5])}")
+    return updates, deletions
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Mirror the branches and tags of a GitHub repository to Azure DevOps.")
+    parser.add_argument("--github-url", required=True, help="GitHub repository clone URL (the source)")
+    parser.add_argument("--ado-url", required=True, help="Azure DevOps repository clone URL (the target)")
+    parser.add_argument("--refs", nargs="+", choices=sorted(SYNC_PREFIXES), default=sorted(SYNC_PREFIXES),
+                        help="Ref namespaces to sync (default: heads tags)")
+    parser.add_argument("--work-dir", default=DEFAULT_SYNC_DIR,
+                        help="Bare cache repository reused between runs so only new objects are fetched")
+    parser.add_argument("--dry-run", action="store_true", help="Print the ref changes without pushing")
+    return parser
+
+
+def main(argv):
+    """Command line entry point; credentials come from GITHUB_TOKEN and ADO_PAT when not in the URLs"""
+    args = build_parser().parse_args(argv)
+    source_url = authenticated_url(args.github_url, "x-access-token", os.environ.get("GITHUB_TOKEN"))
+    target_url = authenticated_url(args.ado_url, "pat", os.environ.get("ADO_PAT"))
+    prefixes = [SYNC_PREFIXES[name] for name in args.refs]
+    try:
+        updates, deletions = sync_repo(source_url, target_url, args.work_dir, prefixes, args.dry_run)
+    except GitError as e:
+        print(f"❌ Sync failed: {str(e)}")
+        return 1
+    if not (updates or deletions):
+        print("✅ Azure DevOps already matches GitHub.")
+        return 0
+    for ref in updates:
+        print(f"   {'would update' if args.dry_run else 'updated'} {ref}")
+    for ref in deletions:
+        print(f"   {'would delete' if args.dry_run else 'deleted'} {ref}")
+    if args.dry_run:
+        print(f"🔍 {len(updates)} refs to update, {len(deletions)} to delete.")
+    else:
+        print(f"✅ {len(updates)} refs updated, {len(deletions)} deleted in one atomic push.")
+    return 0
@@ -0,0 +1,255 @@
+import math
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from git_refs import (GitError, first_parent_commits, git_output, has_commit, lfs_installed, local_refs,
+                      mismatched_refs, pack_size, push_refspecs, ref_delta, remote_refs, run_git, uses_lfs)
+from metrics import Metrics
+
+DEFAULT_WORK_DIR = "mirrors"
+# GitHub rejects pushes whose pack exceeds 2 GiB; stay well below it
+DEFAULT_MAX_PUSH_SIZE = 1536 * 2**20
+DEFAULT_LFS_TRANSFERS = 8
+
+
+class RepoJob:
+    """One repository to mirror from Azure DevOps to GitHub"""
+
+    def __init__(self, azure_url, github_url, size=None, name=None):
+        self.azure_url = azure_url
+        self.github_url = github_url
+        self.size = size  # Bytes as reported by ADO, None when unknown
+        self.name = name or azure_url.rstrip("/").split("/")[-1]
+
+    def __repr__(self):
+        return f"RepoJob({self.name!r})"
+
+
+def parse_manifest(path):
+    """Read "AZURE_URL GITHUB_URL [SIZE_BYTES]" lines; blank lines and # comments are skipped"""
+    jobs = []
+    with open(path) as manifest:
+        for line_no, line in enumerate(manifest, 1):
+            fields = line.split("#", 1)[0].split()
+            if not fields:
+                continue
+            if len(fields) not in (2, 3) or (len(fields) == 3 and not fields[2].isdigit()):
+                raise ValueError(f"{path}:{line_no}: expected AZURE_URL GITHUB_URL [SIZE_BYTES]")
+            jobs.append(RepoJob(fields[0], fields[1], int(fields[2]) if len(fields) == 3 else None))
+    return jobs
+
+
+def list_ado_repos(ado, org, project, github_org):
+    """RepoJobs for every enabled repository of an ADO project, with their sizes"""
+    return [RepoJob(repo["remoteUrl"], f"https://github.com/{github_org}/{repo['name']}.git",
+                    size=repo.get("size"), name=repo["name"])
+            for repo in ado.repositories(org, project)]
+
+
+def schedule(jobs):
+    """Largest repositories first so the longest pushes do not start last; unknown sizes go last"""
+    return sorted(jobs, key=lambda job: (job.size is None, -(job.size or 0)))
+
+
+def assign_directories(jobs, work_dir):
+    """Give every job its own mirror directory below work_dir, even when names collide"""
+    used = set()
+    for job in jobs:
+        base = re.sub(r"[^A-Za-z0-9._-]", "_", job.name)
+        candidate, n = base, 1
+        while candidate.lower() in used:
+            n += 1
+            candidate = f"{base}-{n}"
+        used.add(candidate.lower())
+        job.path = os.path.join(work_dir, candidate + ".git")
+    return jobs
+
+
+def github_owner_repo(github_url):
+    m = re.search(r"github\.com[:/](.+?)/(.+?)(?:\.git)?/?$", github_url)
+    return f"{m.group(1)}/{m.group(2)}" if m else None
+
+
+def refresh_mirror(job, log=None):
+    """Clone job.path as a bare mirror, or bring an existing mirror up to date
+
+    Returns True when the mirror was freshly cloned.
+    """
+    if not os.path.exists(job.path):
+        os.makedirs(os.path.dirname(job.path) or ".", exist_ok=True)
+        run_git(["git", "clone", "--mirror", job.azure_url, job.path], log=log)
+        return True
+    origin = git_output(["git", "config", "--get", "remote.origin.url"], cwd=job.path).strip()
+    if origin != job.azure_url:
+        raise GitError(f"{job.path} mirrors {origin}, not {job.azure_url}; remove it or use another --work-dir")
+    # Only the objects and refs that changed since the last run are transferred
+    run_git(["git", "remote", "update", "--prune"], cwd=job.path, log=log)
+    return False
+
+
+def directory_size(path):
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+
+def push_lfs_objects(job, transfers, log=None):
+    """Copy every Git LFS object of the mirror to GitHub, several transfers at a time
+
+    Returns the bytes of LFS objects fetched from ADO, None when the repository has no LFS.
+    """
+    if not uses_lfs(job.path):
+        return None
+    if not lfs_installed():
+        raise GitError(f"{job.name} uses Git LFS but git-lfs is not installed")
+    objects = os.path.join(job.path, "lfs", "objects")
+    before = directory_size(objects)
+    lfs = ["git", "-c", f"lfs.concurrenttransfers={transfers}", "lfs"]
+    run_git(lfs + ["fetch", "--all", "origin"], cwd=job.path, log=log)
+    run_git(lfs + ["push", "--all", job.github_url], cwd=job.path, log=log)
+    return max(directory_size(objects) - before, 0)
+
+
+def push_history(job, ref, commits, step, log=None):
+    """Push ref along its first-parent commits, step commits per push
+
+    A rejected push (usually the pack size limit) is retried with half the step.
+    """
+    pushed = 0
+    while pushed < len(commits):
+        target = min(pushed + step, len(commits)) - 1
+        try:
+            run_git(["git", "push", "--porcelain", job.github_url, f"+{commits[target]}:{ref}"],
+                    cwd=job.path, log=log)
+        except GitError:
+            if step == 1:
+                raise
+            step = max(1, step // 2)
+            continue
+        pushed = target + 1
+
+
+def push_branches_in_steps(job, local, remote, chunks, log=None):
+    """Push the changed branches' history in about chunks bounded pushes
+
+    The branch with the most new commits goes first in evenly sized steps; the others
+    mostly share its history and start as single pushes, split only if rejected.
+    """
+    pending = []
+    for ref, sha in local.items():
+        if not ref.startswith("refs/heads/") or remote.get(ref) == sha:
+            continue
+        base = remote.get(ref)
+        commits = first_parent_commits(job.path, ref, base if base and has_commit(job.path, base) else None)
+        pending.append((len(commits), ref, commits))
+    for i, (_, ref, commits) in enumerate(sorted(pending, reverse=True)):
+        step = math.ceil(len(commits) / chunks) if i == 0 else len(commits)
+        push_history(job, ref, commits, max(step, 1), log=log)
+
+
+def push_changed_refs(job, max_push_size=DEFAULT_MAX_PUSH_SIZE, log=None):
+    """Push only the refs that differ between the mirror and GitHub, then check they match
+
+    Repositories larger than max_push_size are pushed branch history first, in bounded
+    steps, so no single push exceeds GitHub's pack size limit. Returns the number of
+    refspecs of the final push.
+    """
+    local = local_refs(job.path)
+    remote = remote_refs(job.github_url, cwd=job.path)
+    size = pack_size(job.path)
+    if ref_delta(local, remote) and size > max_push_size:
+        chunks = math.ceil(size / max_push_size)
+        print(f"📦 {job.name} is {size / 2**20:.0f} MiB, pushing its history in about {chunks} steps")
+        push_branches_in_steps(job, local, remote, chunks, log=log)
+        remote = remote_refs(job.github_url, cwd=job.path)
+
+    # Remaining tags, refs and deletions; their objects are already on GitHub by now
+    refspecs = ref_delta(local, remote)
+    push_refspecs(job.path, job.github_url, refspecs, log=log)
+
+    mismatched = mismatched_refs(local, remote_refs(job.github_url, cwd=job.path))
+    if mismatched:
+        raise GitError(f"{len(mismatched)} refs differ between the mirror and GitHub after the push, "
+                       f"e.g. {', '.join(mismatched[:5])}")
+    return len(refspecs)
+
+
+def mirror_repo(job, log=None, max_push_size=DEFAULT_MAX_PUSH_SIZE, lfs_transfers=DEFAULT_LFS_TRANSFERS,
+                metrics=None):
+    """Mirror one ADO repository into job.path (reusing a cached mirror) and push it to GitHub
+
+    The fetch, LFS and push steps are recorded as metrics transfers; the bytes of the
+    fetch are the growth of the mirror's object store, which also approximates the push.
+    Raises GitError when the push fails or GitHub does not end up with every ref.
+    """
+    metrics = metrics if metrics is not None else Metrics()
+    before = pack_size(job.path) if os.path.exists(job.path) else 0
+    started = time.monotonic()
+    cloned = refresh_mirror(job, log=log)
+    fetched = max(pack_size(job.path) - before, 0)
+    metrics.transfer("fetch", job.name, fetched, time.monotonic() - started)
+
+    # LFS objects go first so no pushed ref ever points at content GitHub does not have
+    started = time.monotonic()
+    lfs_bytes = push_lfs_objects(job, lfs_transfers, log=log)
+    if lfs_bytes is not None:
+        metrics.transfer("lfs", job.name, lfs_bytes, time.monotonic() - started)
+    started = time.monotonic()
+    changed = push_changed_refs(job, max_push_size, log=log)
+    metrics.transfer("push", job.name, fetched if changed else 0, time.monotonic() - started)
+    if log is None:
+        print(f"{changed} refs pushed" if changed else "GitHub is already up to date")
+
+    if not cloned:
+        return
+    # Set the default branch to 'main' on GitHub using GitHub CLI; only on the first
+    # mirror so a default branch changed on GitHub later is left alone
+    owner_repo = github_owner_repo(job.github_url)
+    if owner_repo:
+        try:
+            run_git(["gh", "repo", "edit", owner_repo, "--default-branch", "main"], log=log)
+        except (GitError, OSError) as e:
+            print(f"Warning: {job.name}: Command failed but continuing. Error: {e}")
+    else:
+        print(f"Could not parse GitHub repo owner/name from URL {job.github_url}.")
+
+
+def mirror_all(jobs, parallel, work_dir=DEFAULT_WORK_DIR, metrics=None, mirror=mirror_repo, **push_options):
+    """Mirror every job on parallel threads, largest first; returns {job: error or None}
+
+    Each repository gets its own directory and its git output goes to <work_dir>/<name>.log
+    so concurrent clones do not interleave on the console. mirror(job, log, metrics,
+    **push_options) transfers one repository; snapshot_repo can stand in for mirror_repo.
+    """
+    metrics = metrics if metrics is not None else Metrics()
+    jobs = assign_directories(schedule(jobs), work_dir)
+    os.makedirs(work_dir, exist_ok=True)
+    print_lock = threading.Lock()
+    results = {}
+
+    def migrate(job):
+        started = time.monotonic()
+        with print_lock:
+            size = f" ({job.size / 2**20:.1f} MiB)" if job.size else ""
+            print(f"🚚 Mirroring {job.name}{size}")
+        with open(job.path[:-len(".git")] + ".log", "w") as log:
+            mirror(job, log=log, metrics=metrics, **push_options)
+        return time.monotonic() - started
+
+    with metrics.phase("mirror_repositories") as phase, ThreadPoolExecutor(max_workers=parallel) as executor:
+        futures = {executor.submit(migrate, job): job for job in jobs}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                elapsed = future.result()
+            except Exception as e:
+                results[job] = e
+                with print_lock:
+                    print(f"❌ {job.name}: {e}")
+            else:
+                results[job] = None
+                phase.add()
+                with print_lock:
+                    print(f"✅ {job.name} mirrored in {elapsed:.0f}s")
+    return results
@@ -0,0 +1,48 @@
+import os
+import urllib.request
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+
+from transport import Headers, Response, TransportError
+
+DEFAULT_TIMEOUT = (10, 60)  # Connect and read timeouts in seconds
+
+
+def _never_sent(error):
+    """True if a requests exception was raised before the request reached the server"""
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, (NewConnectionError, ConnectTimeoutError))
+
+
+class RequestsTransport:
+    """Transport backed by one requests.Session with a keep-alive pool per host
+
+    The pool holds up to pool_size connections per host, which should be at least the
+    number of threads sending requests so no worker waits on a handshake.
+    requests only speaks HTTP/1.1; the pool is what removes the per-call handshake.
+    """
+
+    def __init__(self, pool_size=10, timeout=DEFAULT_TIMEOUT):
+        self.timeout = timeout
+        self.session = requests.Session()
+        # requests re-reads proxy and CA bundle settings from os.environ on every call,
+        # which costs more CPU than the request itself in large environments. Without
+        # proxy variables they are resolved once here; with them, no_proxy still needs
+        # the per-request lookup.
+        if not urllib.request.getproxies():
+            self.session.trust_env = False
+            self.session.verify = os.environ.get("REQUESTS_CA_BUNDLE") or os.environ.get("CURL_CA_BUNDLE") or True
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def send(self, method, url, headers=None, body=None):
+        try:
+            resp = self.session.request(method, url, headers=headers, data=body, timeout=self.timeout)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            raise TransportError(f"{method} {url}: {e}", sent=not _never_sent(e)) from e
+        return Response(resp.status_code, Headers(resp.headers.items()), resp.content, resp.url)
@@ -0,0 +1,87 @@
+import fnmatch
+import os
+import time
+
+from git_refs import GitError, git_output, missing_objects, pack_size, remote_refs, run_with_refspecs
+from metrics import Metrics
+from pipeline import ordered_map
+
+SNAPSHOT_WORKERS = 4
+# Author, committer and their dates of the branch tip, one per line
+TIP_FORMAT = "%an%n%ae%n%aI%n%cn%n%ce%n%cI"
+
+
+def snapshot_path(job):
+    """Shallow cache next to where the full mirror of the job would live, never mixed with it"""
+    return job.path[:-len(".git")] + ".snapshot.git"
+
+
+def select_branches(refs, patterns):
+    """{branch name: sha} of the refs/heads entries matching any of the fnmatch patterns"""
+    branches = {ref[len("refs/heads/"):]: sha for ref, sha in refs.items() if ref.startswith("refs/heads/")}
+    return {name: sha for name, sha in sorted(branches.items())
+            if any(fnmatch.fnmatchcase(name, pattern) for pattern in patterns)}
+
+
+def snapshot_commit(repo_path, branch, tip):
+    """Parentless commit of the tree of tip, made without checking anything out
+
+    It keeps the tip's author, committer and dates, so the same tip always gives the same
+    commit and a rerun finds GitHub up to date.
+    """
+    an, ae, ad, cn, ce, cd = git_output(["git", "log", "-1", f"--format={TIP_FORMAT}", tip],
+                                        cwd=repo_path).splitlines()
+    env = {"GIT_AUTHOR_NAME": an, "GIT_AUTHOR_EMAIL": ae, "GIT_AUTHOR_DATE": ad,
+           "GIT_COMMITTER_NAME": cn, "GIT_COMMITTER_EMAIL": ce, "GIT_COMMITTER_DATE": cd}
+    message = f"Snapshot of {branch} at {tip}"
+    return git_output(["git", "commit-tree", f"{tip}^{{tree}}", "-m", message], cwd=repo_path, env=env).strip()
+
+
+def snapshot_repo(job, log=None, branches=("*",), workers=SNAPSHOT_WORKERS, metrics=None):
+    """Push the current content of the selected branches of job to GitHub without their history
+
+    Only the branch tips are fetched (depth 1, objects already cached are skipped), a
+    parentless commit is made from each tip's tree in parallel, and all branches go to
+    GitHub in one atomic push. Raises GitError when GitHub does not end up with them.
+    """
+    metrics = metrics if metrics is not None else Metrics()
+    path = snapshot_path(job)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        git_output(["git", "init", "--quiet", "--bare", path])
+    # Stored in the config so (possibly credential-bearing) URLs stay off command lines
+    git_output(["git", "config", "remote.origin.url", job.azure_url], cwd=path)
+    git_output(["git", "config", "remote.github.url", job.github_url], cwd=path)
+
+    selected = select_branches(remote_refs("origin", cwd=path), branches)
+    if not selected:
+        raise GitError(f"no branch of {job.name} matches {', '.join(branches)}")
+
+    before = pack_size(path)
+    started = time.monotonic()
+    missing = missing_objects(path, selected.values())
+    fetch = [f"+refs/heads/{name}:refs/heads/{name}" for name, sha in selected.items() if sha in missing]
+    if fetch:
+        run_with_refspecs(path, ["fetch", "--depth", "1", "--no-tags", "origin"], "origin", "fetch", fetch, log=log)
+    fetched = max(pack_size(path) - before, 0)
+    metrics.transfer("snapshot_fetch", job.name, fetched, time.monotonic() - started)
+
+    names = list(selected)
+    commits = dict(zip(names, ordered_map(names, lambda name: snapshot_commit(path, name, selected[name]),
+                                          workers)))
+    wanted = {f"refs/heads/{name}": sha for name, sha in commits.items()}
+    remote = remote_refs("github", cwd=path)
+    refspecs = [f"+{sha}:{ref}" for ref, sha in wanted.items() if remote.get(ref) != sha]
+    started = time.monotonic()
+    if refspecs:
+        run_with_refspecs(path, ["push", "--atomic", "--porcelain", "github"], "github", "push", refspecs, log=log)
+    metrics.transfer("push", job.name, fetched if refspecs else 0, time.monotonic() - started)
+
+    remote = remote_refs("github", cwd=path)
+    different = sorted(ref for ref, sha in wanted.items() if remote.get(ref) != sha)
+    if different:
+        raise GitError(f"{len(different)} snapshot branches are missing on GitHub after the push, "
+                       f"e.g. {', '.join(different[:5])}")
+    if log is None:
+        print(f"{len(refspecs)} branch snapshots pushed" if refspecs else "GitHub is already up to date")
+    return len(refspecs)
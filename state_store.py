@@ -0,0 +1,217 @@
+import json
+import sqlite3
+import threading
+
+from migration_index import MigrationIndex
+
+DEFAULT_STATE_FILE = "migration_state.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    kind TEXT NOT NULL,
+    ado_id INTEGER NOT NULL,
+    number INTEGER NOT NULL,
+    done INTEGER NOT NULL DEFAULT 0,
+    content_hash TEXT,
+    PRIMARY KEY (kind, ado_id)
+);
+CREATE TABLE IF NOT EXISTS comments (
+    kind TEXT NOT NULL,
+    ado_id INTEGER NOT NULL,
+    comment_key TEXT NOT NULL,
+    PRIMARY KEY (kind, ado_id, comment_key)
+);
+CREATE TABLE IF NOT EXISTS attachments (
+    url TEXT PRIMARY KEY,
+    sha256 TEXT NOT NULL,
+    name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    sha256 TEXT PRIMARY KEY,
+    github_url TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS identities (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS imports (
+    kind TEXT NOT NULL,
+    ado_id INTEGER NOT NULL,
+    import_id INTEGER NOT NULL,
+    created_at TEXT NOT NULL,
+    content_hash TEXT,
+    comment_keys TEXT NOT NULL,
+    PRIMARY KEY (kind, ado_id)
+);
+CREATE TABLE IF NOT EXISTS indexed (
+    scope TEXT PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS watermarks (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class StateStore:
+    """Local SQLite record of what a migration has already created on GitHub
+
+    Stores ADO ID -> GitHub number for every created issue/PR, which of its comments
+    were posted, whether it is complete and where copied attachments went, so a rerun
+    after a crash resumes exactly
+    where it stopped without re-listing the target repo. Every write is committed
+    immediately; one instance is shared by all worker threads.
+    """
+
+    def __init__(self, path=DEFAULT_STATE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        # WAL keeps the per-write commits cheap; NORMAL still survives a process crash
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(items)")}
+        if "content_hash" not in columns:  # State files written before delta sync existed
+            self._conn.execute("ALTER TABLE items ADD COLUMN content_hash TEXT")
+
+    def _execute(self, sql, params=()):
+        with self._lock:
+            with self._conn:
+                return self._conn.execute(sql, params).fetchall()
+
+    def has_items(self, kind):
+        return bool(self._execute("SELECT 1 FROM items WHERE kind = ? LIMIT 1", (kind,)))
+
+    def items(self, kind):
+        """(ado_id, number) of every recorded item of this kind"""
+        return self._execute("SELECT ado_id, number FROM items WHERE kind = ?", (kind,))
+
+    def done_ids(self, kind):
+        return {row[0] for row in self._execute("SELECT ado_id FROM items WHERE kind = ? AND done = 1", (kind,))}
+
+    def done_among(self, kind, ado_ids):
+        """The IDs of ado_ids recorded as complete, without loading every completed ID"""
+        ado_ids = [int(ado_id) for ado_id in ado_ids]
+        if not ado_ids:
+            return set()
+        placeholders = ", ".join("?" * len(ado_ids))
+        return {row[0] for row in self._execute(
+            f"SELECT ado_id FROM items WHERE kind = ? AND done = 1 AND ado_id IN ({placeholders})",
+            [kind] + ado_ids)}
+
+    def get_number(self, kind, ado_id):
+        rows = self._execute("SELECT number FROM items WHERE kind = ? AND ado_id = ?", (kind, int(ado_id)))
+        return rows[0][0] if rows else None
+
+    def record_item(self, kind, ado_id, number, content_hash=None):
+        """Remember the GitHub number of an item created by this migration"""
+        self._execute("INSERT INTO items (kind, ado_id, number, content_hash) VALUES (?, ?, ?, ?) "
+                      "ON CONFLICT (kind, ado_id) DO UPDATE SET number = excluded.number, "
+                      "content_hash = excluded.content_hash",
+                      (kind, int(ado_id), number, content_hash))
+
+    def record_existing(self, kind, ado_id, number):
+        """Remember an item found on GitHub as complete, unless this migration already tracks it"""
+        self._execute("INSERT OR IGNORE INTO items (kind, ado_id, number, done) VALUES (?, ?, ?, 1)",
+                      (kind, int(ado_id), number))
+
+    def mark_done(self, kind, ado_id):
+        self._execute("UPDATE items SET done = 1 WHERE kind = ? AND ado_id = ?", (kind, int(ado_id)))
+
+    def get_hash(self, kind, ado_id):
+        """Hash of the title/body last written to GitHub for an item, if known"""
+        rows = self._execute("SELECT content_hash FROM items WHERE kind = ? AND ado_id = ?", (kind, int(ado_id)))
+        return rows[0][0] if rows else None
+
+    def set_hash(self, kind, ado_id, content_hash):
+        self._execute("UPDATE items SET content_hash = ? WHERE kind = ? AND ado_id = ?",
+                      (content_hash, kind, int(ado_id)))
+
+    def posted_comments(self, kind, ado_id):
+        """Keys of the comments of an item that were already posted"""
+        return {row[0] for row in self._execute(
+            "SELECT comment_key FROM comments WHERE kind = ? AND ado_id = ?", (kind, int(ado_id)))}
+
+    def record_comment(self, kind, ado_id, comment_key):
+        self._execute("INSERT OR IGNORE INTO comments (kind, ado_id, comment_key) VALUES (?, ?, ?)",
+                      (kind, int(ado_id), str(comment_key)))
+
+    def get_attachment(self, url):
+        """(content SHA-256, file name) of an ADO attachment URL downloaded before, or None"""
+        rows = self._execute("SELECT sha256, name FROM attachments WHERE url = ?", (url,))
+        return rows[0] if rows else None
+
+    def record_attachment(self, url, sha256, name):
+        self._execute("INSERT OR REPLACE INTO attachments (url, sha256, name) VALUES (?, ?, ?)", (url, sha256, name))
+
+    def get_blob_url(self, sha256):
+        """GitHub URL the content with this SHA-256 was uploaded to, or None"""
+        rows = self._execute("SELECT github_url FROM blobs WHERE sha256 = ?", (sha256,))
+        return rows[0][0] if rows else None
+
+    def record_blob(self, sha256, github_url):
+        self._execute("INSERT OR REPLACE INTO blobs (sha256, github_url) VALUES (?, ?)", (sha256, github_url))
+
+    def get_identity(self, key):
+        """JSON of a resolved ADO identity or GitHub login, or None if never resolved"""
+        rows = self._execute("SELECT value FROM identities WHERE key = ?", (key,))
+        return rows[0][0] if rows else None
+
+    def record_identity(self, key, value):
+        self._execute("INSERT OR REPLACE INTO identities (key, value) VALUES (?, ?)", (key, value))
+
+    def record_import(self, kind, ado_id, import_id, created_at, content_hash, comment_keys):
+        """Remember an issue import submitted to GitHub until it completes"""
+        self._execute("INSERT OR REPLACE INTO imports (kind, ado_id, import_id, created_at, content_hash, comment_keys) "
+                      "VALUES (?, ?, ?, ?, ?, ?)",
+                      (kind, int(ado_id), import_id, created_at, content_hash, json.dumps(comment_keys)))
+
+    def pending_imports(self, kind):
+        """(ado_id, import_id, created_at, content_hash, comment_keys) of every unfinished import"""
+        return [row[:4] + (json.loads(row[4]),) for row in self._execute(
+            "SELECT ado_id, import_id, created_at, content_hash, comment_keys FROM imports WHERE kind = ?", (kind,))]
+
+    def drop_import(self, kind, ado_id):
+        self._execute("DELETE FROM imports WHERE kind = ? AND ado_id = ?", (kind, int(ado_id)))
+
+    def is_indexed(self, scope):
+        """Whether the GitHub repository of scope was listed into the state file before"""
+        return bool(self._execute("SELECT 1 FROM indexed WHERE scope = ?", (scope,)))
+
+    def mark_indexed(self, scope):
+        self._execute("INSERT OR IGNORE INTO indexed (scope) VALUES (?)", (scope,))
+
+    def get_watermark(self, name):
+        """Start time of the last successful run recorded under name, or None"""
+        rows = self._execute("SELECT value FROM watermarks WHERE name = ?", (name,))
+        return rows[0][0] if rows else None
+
+    def set_watermark(self, name, value):
+        self._execute("INSERT INTO watermarks (name, value) VALUES (?, ?) "
+                      "ON CONFLICT (name) DO UPDATE SET value = excluded.value", (name, value))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def load_index(state, kind, build_remote, rescan=False, scope=None):
+    """MigrationIndex of kind from the state file, or from GitHub on a first run or rescan
+
+    Items found on GitHub are recorded as complete so later runs need no remote listing.
+    When several repositories share one state file, scope names the one being indexed:
+    each is then listed from GitHub once, rather than only the first one.
+    """
+    indexed = state.is_indexed(scope) if scope else state.has_items(kind)
+    if indexed and not rescan:
+        index = MigrationIndex()
+        for ado_id, number in state.items(kind):
+            index.add(kind, ado_id, number)
+        return index
+    index = build_remote()
+    for ado_id, number in index.items(kind):
+        state.record_existing(kind, ado_id, number)
+    if scope:
+        state.mark_indexed(scope)
+    return index
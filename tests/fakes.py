@@ -0,0 +1,23 @@
+import json
+
+from transport import Headers, Response
+
+
+class FakeTransport:
+    """Replays scripted responses or errors and records what was sent"""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = []
+
+    def send(self, method, url, headers=None, body=None):
+        self.calls.append((method, url, headers, body))
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def make_response(status, body=None, headers=None, url="https://api.github.com/x"):
+    content = json.dumps(body if body is not None else {}).encode()
+    return Response(status, Headers((headers or {}).items()), content, url)
@@ -0,0 +1,67 @@
+import pytest
+
+import ado_client
+from ado_client import AdoClient
+from fakes import FakeTransport, make_response
+from transport import HTTPError, TransportError
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(ado_client.time, "sleep", sleeps.append)
+    return sleeps
+
+
+def test_basic_auth_header_from_pat():
+    transport = FakeTransport(make_response(200, {"value": []}))
+    AdoClient("pat", transport).get("https://dev.azure.com/o/p/_apis/x")
+    assert transport.calls[0][2]["Authorization"] == "Basic OnBhdA=="
+
+
+def test_throttled_read_waits_for_retry_after(no_sleep):
+    transport = FakeTransport(make_response(429, headers={"Retry-After": "7"}), make_response(200, {"count": 0}))
+    resp = AdoClient("pat", transport).post("https://dev.azure.com/o/p/_apis/wit/wiql", json={"query": "q"})
+    assert resp.json() == {"count": 0}
+    assert no_sleep == [7.0]
+
+
+def test_network_errors_are_retried_then_raised():
+    errors = [TransportError("reset", sent=True) for _ in range(3)]
+    transport = FakeTransport(*errors)
+    with pytest.raises(TransportError):
+        AdoClient("pat", transport, max_retries=2).get("https://dev.azure.com/o/p/_apis/x")
+    assert len(transport.calls) == 3
+
+
+def test_client_errors_are_not_retried():
+    transport = FakeTransport(make_response(404))
+    with pytest.raises(HTTPError):
+        AdoClient("pat", transport).get("https://dev.azure.com/o/p/_apis/x")
+    assert len(transport.calls) == 1
+
+
+def test_paginate_walks_top_skip_pages_lazily_and_dedups():
+    transport = FakeTransport(
+        make_response(200, {"value": [{"pullRequestId": 3}, {"pullRequestId": 2}]}),
+        make_response(200, {"value": [{"pullRequestId": 2}, {"pullRequestId": 1}]}),
+        make_response(200, {"value": []}),
+    )
+    items = AdoClient("pat", transport).paginate("https://dev.azure.com/o/p/_apis/prs?api-version=7.0", page_size=2)
+    assert next(items) == {"pullRequestId": 3}
+    assert len(transport.calls) == 1  # The second page is only requested once needed
+    assert [i["pullRequestId"] for i in items] == [2, 1]
+    assert [c[1].split("?")[1] for c in transport.calls] == [
+        "api-version=7.0&%24top=2&%24skip=0",
+        "api-version=7.0&%24top=2&%24skip=2",
+        "api-version=7.0&%24top=2&%24skip=4",
+    ]
+
+
+def test_paginate_continuation_follows_token_header():
+    transport = FakeTransport(
+        make_response(200, {"value": [1, 2]}, {"x-ms-continuationtoken": "abc"}),
+        make_response(200, {"value": [3]}),
+    )
+    assert list(AdoClient("pat", transport).paginate_continuation("https://x/threads?api-version=7.0")) == [1, 2, 3]
+    assert transport.calls[1][1] == "https://x/threads?api-version=7.0&continuationToken=abc"
@@ -0,0 +1,94 @@
+import re
+
+import pytest
+
+from ado_workitems import WIQL_MAX_RESULTS, chunked, fetch_work_items, id_windows, query_ids
+
+
+def test_chunked_splits_into_batches_of_at_most_size():
+    ids = list(range(1, 451))
+    chunks = list(chunked(ids))
+    assert [len(c) for c in chunks] == [200, 200, 50]
+    assert [i for c in chunks for i in c] == ids
+
+
+def test_chunked_empty():
+    assert list(chunked([])) == []
+
+
+def test_chunked_streams_iterables():
+    assert list(chunked(iter(range(5)), 2)) == [[0, 1], [2, 3], [4]]
+
+
+def test_fetch_work_items_streams_every_chunk_in_order():
+    calls = []
+
+    def fetch_batch(chunk):
+        calls.append(list(chunk))
+        return [{"id": i} for i in chunk]
+
+    items = fetch_work_items(fetch_batch, list(range(1, 6)), log_error=print, size=2)
+    assert calls == []  # Nothing is fetched until the stream is consumed
+    assert [wi["id"] for wi in items] == [1, 2, 3, 4, 5]
+    assert calls == [[1, 2], [3, 4], [5]]
+
+
+def test_fetch_work_items_logs_missing_and_failed_chunks():
+    errors = []
+
+    def fetch_batch(chunk):
+        if 5 in chunk:
+            raise RuntimeError("boom")
+        return [None if i == 2 else {"id": i} for i in chunk if i != 3]
+
+    items = list(fetch_work_items(fetch_batch, [1, 2, 3, 4, 5, 6], errors.append, size=4))
+    assert [wi["id"] for wi in items] == [1, 4]
+    assert errors == [
+        "Work item 2 failed: not returned by workitemsbatch",
+        "Work item 3 failed: not returned by workitemsbatch",
+        "Work items 5-6 could not be fetched: boom",
+    ]
+
+
+def fake_wiql(project_ids, queries):
+    """run_wiql stand-in honouring the ID bounds, ordering and $top of the query planner"""
+    def run_wiql(query, top=None):
+        queries.append((query, top))
+        ids = sorted(project_ids)
+        low = re.search(r"\[System.Id\] >= (\d+)", query)
+        high = re.search(r"\[System.Id\] <= (\d+)", query)
+        if low:
+            ids = [i for i in ids if i >= int(low.group(1))]
+        if high:
+            ids = [i for i in ids if i <= int(high.group(1))]
+        if "DESC" in query:
+            ids.reverse()
+        if len(ids) > WIQL_MAX_RESULTS and not top:
+            raise RuntimeError("VS402337: more than 20000 results")
+        return ids[:top] if top else ids
+    return run_wiql
+
+
+def test_id_windows_cover_the_range_without_gaps():
+    assert list(id_windows(5, 27, 10)) == [(5, 14), (15, 24), (25, 27)]
+    assert list(id_windows(7, 7, 10)) == [(7, 7)]
+
+
+def test_query_ids_splits_projects_over_the_wiql_cap():
+    project_ids = list(range(1000, 46000)) + [90000]
+    queries = []
+    ids = list(query_ids(fake_wiql(project_ids, queries), "[System.TeamProject] = @project"))
+    assert ids == project_ids
+    assert len(queries) == 2 + 9  # First and last ID, then windows of 10000 IDs up to 90000
+    assert all("[System.TeamProject] = @project" in q for q, _ in queries)
+
+
+def test_query_ids_empty_project():
+    queries = []
+    assert list(query_ids(fake_wiql([], queries), "1 = 1")) == []
+    assert len(queries) == 1
+
+
+def test_query_ids_rejects_windows_over_the_cap():
+    with pytest.raises(ValueError):
+        list(query_ids(fake_wiql([1], []), "1 = 1", window=WIQL_MAX_RESULTS))
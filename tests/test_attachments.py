@@ -0,0 +1,95 @@
+import json
+
+from attachments import AttachmentMigrator, BlobCache, GitHubBlobStore, attachment_name
+from fakes import FakeTransport, make_response
+from github_client import GitHubClient
+from state_store import StateStore
+from transport import Headers, HTTPError, Response
+
+ADO = "https://dev.azure.com/org/project/_apis/wit/attachments"
+SHOT_A = f"{ADO}/11111111-1111-1111-1111-111111111111?fileName=shot.png"
+SHOT_B = f"{ADO}/22222222-2222-2222-2222-222222222222?fileName=copy.png"
+GONE = f"{ADO}/33333333-3333-3333-3333-333333333333?fileName=gone.png"
+
+
+class FakeAdo:
+    def __init__(self, files):
+        self.files = files
+        self.downloads = []
+
+    def get(self, url):
+        self.downloads.append(url)
+        key = url.split("&api-version")[0]
+        if key not in self.files:
+            raise HTTPError(Response(404, Headers(), b"", url), "GET")
+        return Response(200, Headers(), self.files[key], url)
+
+
+class FakeStore:
+    def __init__(self):
+        self.uploads = []
+
+    def upload(self, digest, name, content):
+        self.uploads.append((digest, name))
+        return f"https://github.com/o/r/blob/ado-attachments/{digest}?raw=true"
+
+
+def migrator(tmp_path, files):
+    state = StateStore(str(tmp_path / "state.db"))
+    errors = []
+    return AttachmentMigrator(FakeAdo(files), FakeStore(), state, BlobCache(str(tmp_path / "cache")),
+                              errors.append), errors
+
+
+def test_attachment_name_reads_the_file_name_parameter():
+    assert attachment_name(SHOT_A) == "shot.png"
+    assert attachment_name(f"{ADO}/x?download=true&amp;fileName=a%20b.txt") == "a b.txt"
+    assert attachment_name(f"{ADO}/x") == ""
+
+
+def test_shared_content_is_uploaded_once_and_links_are_rewritten(tmp_path):
+    attachments, errors = migrator(tmp_path, {SHOT_A: b"png", SHOT_B: b"png"})
+    text = f'<img src="{SHOT_A}"> and <img src="{SHOT_B}"> and again <img src="{SHOT_A}">'
+    rewritten = attachments.rewrite(text)
+    assert "dev.azure.com" not in rewritten
+    assert len(attachments.store.uploads) == 1
+    # Both URLs download concurrently; whichever finishes first names the upload
+    assert attachments.store.uploads[0][1] in ("shot.png", "copy.png")
+    assert len(attachments.ado.downloads) == 2
+
+    # A later item linking the same URL needs neither a download nor an upload
+    assert attachments.rewrite(f"![x]({SHOT_A})") == f"![x]({attachments.state.get_blob_url(attachments.store.uploads[0][0])})"
+    assert len(attachments.ado.downloads) == 2 and len(attachments.store.uploads) == 1
+    assert not errors
+
+
+def test_deleted_attachments_keep_their_link_and_are_logged(tmp_path):
+    attachments, errors = migrator(tmp_path, {})
+    assert attachments.rewrite(f"see {GONE}") == f"see {GONE}"
+    assert len(errors) == 1
+
+
+def test_attachment_list_links_the_copies_of_attached_files(tmp_path):
+    attachments, _ = migrator(tmp_path, {SHOT_A: b"log"})
+    wi = {"relations": [{"rel": "AttachedFile", "url": SHOT_A, "attributes": {"name": "build.log"}},
+                        {"rel": "System.LinkTypes.Related", "url": "https://dev.azure.com/x"}]}
+    listing = attachments.attachment_list(wi)
+    assert listing.startswith("\n\n**Attachments:**\n- [build.log](https://github.com/o/r/blob/")
+    assert attachments.store.uploads[0][1] == "build.log"
+    assert attachments.attachment_list({"relations": None}) == ""
+
+
+def test_blob_store_creates_the_branch_and_accepts_existing_paths():
+    transport = FakeTransport(
+        make_response(200, {"html_url": "https://github.com/o/r", "default_branch": "main"}),
+        make_response(404, {"message": "Not Found"}),
+        make_response(200, {"object": {"sha": "abc"}}),
+        make_response(201, {}),
+        make_response(422, {"message": "sha wasn't supplied"}),
+    )
+    store = GitHubBlobStore(GitHubClient("t", transport, write_interval=0), "o/r")
+    link = store.upload("ab" + "0" * 62, "Screen Shot.PNG", b"png")
+    assert link == f"https://github.com/o/r/blob/ado-attachments/attachments/ab/ab{'0' * 62}.png?raw=true"
+    method, url, _, body = transport.calls[-1]
+    assert method == "PUT" and json.loads(body)["branch"] == "ado-attachments"
+    assert json.loads(transport.calls[3][3]) == {"ref": "refs/heads/ado-attachments", "sha": "abc"}
@@ -0,0 +1,43 @@
+import pytest
+
+from ado_client import AdoClient
+from ado_workitems import query_ids, wiql_runner
+from github_client import GitHubClient
+from mock_server import MockServer
+from run_benchmarks import regressions, run_benchmark
+from transport import HTTPError, UrllibTransport
+
+
+def test_mock_wiql_enforces_the_result_cap_and_windows_get_past_it():
+    with MockServer(work_items=45000) as server:
+        ado = AdoClient("pat", UrllibTransport())
+        wiql_url = f"{server.url}/o/p/_apis/wit/wiql?api-version=7.0"
+        with pytest.raises(HTTPError):
+            ado.post(wiql_url, json={"query": "SELECT [System.Id] FROM WorkItems"})
+        ids = list(query_ids(wiql_runner(ado, wiql_url), "[System.TeamProject] = @project"))
+    assert ids == list(range(1, 45001))
+
+
+def test_mock_github_pages_issues_with_link_headers():
+    with MockServer() as server:
+        github = GitHubClient("token", UrllibTransport(), write_interval=0)
+        for n in range(151):
+            github.post(f"{server.url}/repos/a/b/issues", json={"title": f"t{n}", "body": ""})
+        listed = list(github.paginate(f"{server.url}/repos/a/b/issues", params={"state": "all", "per_page": 100}))
+    assert len(listed) == 151
+    assert listed[0]["number"] == 1
+
+
+@pytest.mark.parametrize("script", ["workitems", "prs"])
+def test_benchmark_run_migrates_every_item(script):
+    row = run_benchmark(script, 25, variant="urllib", workers=4, timeout=120)
+    assert row["ok"], row["stderr"]
+    assert (row["migrated"], row["comments"]) == (25, 50)
+
+
+def test_regressions_compare_items_per_second_with_the_baseline():
+    baseline = [{"script": "prs", "variant": "requests", "size": 1000, "items_per_sec": 100.0}]
+    results = [{"script": "prs", "variant": "requests", "size": 1000, "items_per_sec": 70.0},
+               {"script": "workitems", "variant": "requests", "size": 1000, "items_per_sec": 1.0}]
+    assert [row["script"] for row, _ in regressions(results, baseline, 0.2)] == ["prs"]
+    assert regressions(results, baseline, 0.5) == []
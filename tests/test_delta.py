@@ -0,0 +1,30 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from delta import changed_since, content_hash, format_time, next_watermark, parse_time
+
+
+def test_parse_time_accepts_ado_timestamps_and_plain_dates():
+    assert parse_time("2024-05-01T10:20:30.1234567Z") == datetime(2024, 5, 1, 10, 20, 30, 123456, tzinfo=timezone.utc)
+    assert parse_time("2024-05-01T12:00:00+02:00") == datetime(2024, 5, 1, 10, 0, tzinfo=timezone.utc)
+    assert parse_time("2024-05-01") == datetime(2024, 5, 1, tzinfo=timezone.utc)
+    with pytest.raises(ValueError):
+        parse_time("yesterday")
+
+
+def test_next_watermark_overlaps_the_run_start():
+    started = datetime(2024, 5, 1, 10, 0, tzinfo=timezone.utc)
+    assert next_watermark(started) == "2024-05-01T09:55:00Z"
+    assert format_time(started) == "2024-05-01T10:00:00Z"
+
+
+def test_changed_since():
+    assert changed_since("2024-05-01T10:00:00.5Z", None)
+    assert changed_since("2024-05-01T10:00:00.5Z", "2024-05-01T10:00:00Z")
+    assert not changed_since("2024-04-30T23:59:59Z", "2024-05-01")
+
+
+def test_content_hash_ignores_key_order():
+    assert content_hash({"title": "a", "body": "b"}) == content_hash({"body": "b", "title": "a"})
+    assert content_hash({"title": "a", "body": "b"}) != content_hash({"title": "a", "body": "c"})
@@ -0,0 +1,200 @@
+import pytest
+
+from migration_index import MigrationIndex, marker
+from migration_log import MigrationLog
+from plan import Plan
+from pr_migration import PullRequestMigration, migrate_repositories, parse_repo_manifest, project_pairs
+from state_store import StateStore
+from workitem_migration import WorkItemMigration
+
+
+class ListWorkItemSource:
+    org, project = "org", "project"
+
+    def __init__(self, work_items, comments):
+        self.work_items = work_items
+        self.comment_lists = comments
+
+    def query_ids(self, since=None):
+        return iter([wi["id"] for wi in self.work_items])
+
+    def fetch(self, ids, log_error, batch_size=200):
+        wanted = set(ids)
+        return (wi for wi in self.work_items if wi["id"] in wanted)
+
+    def comments(self, wi_id):
+        return self.comment_lists.get(wi_id, [])
+
+    def comment_counts(self, ids):
+        return {wi_id: len(self.comment_lists.get(wi_id, [])) for wi_id in ids}
+
+    def web_url(self, wi):
+        return f"https://ado/{wi['id']}"
+
+
+class ListPullRequestSource:
+    org, project, repo = "org", "project", "repo"
+
+    def __init__(self, prs, threads):
+        self.prs = prs
+        self.thread_lists = threads
+
+    def pull_requests(self, status="all"):
+        return iter(self.prs)
+
+    def threads(self, pr_id):
+        return iter(self.thread_lists.get(pr_id, []))
+
+
+class MemorySink:
+    """Records created items, updates and comments instead of calling GitHub"""
+
+    def __init__(self):
+        self.created = []
+        self.updated = []
+        self.comments = []
+
+    def existing(self):
+        return MigrationIndex()
+
+    def create(self, title, body, *args):
+        self.created.append((title, body))
+        return len(self.created)
+
+    def update(self, number, title, body):
+        self.updated.append((number, title))
+
+    def comment(self, number, body):
+        self.comments.append((number, body))
+
+
+def work_item(wi_id, title):
+    return {"id": wi_id, "fields": {"System.Title": title, "System.CreatedBy": {"displayName": "Ann"},
+                                    "System.CreatedDate": "2024-01-02T10:00:00Z"}}
+
+
+def test_work_items_are_created_once_with_their_comments(tmp_path):
+    source = ListWorkItemSource([work_item(1, "One"), work_item(2, "Two")],
+                                {1: [{"id": 7, "createdBy": {"displayName": "Bob"},
+                                      "createdDate": "2024-01-03T10:00:00Z", "text": "hi"}]})
+    sink = MemorySink()
+    state = StateStore(str(tmp_path / "state.db"))
+    log = MigrationLog(path=None)
+    assert WorkItemMigration(source, sink, state, log, workers=2).run()
+    assert sorted(title for title, _ in sink.created) == ["One", "Two"]
+    assert dict(sink.created)["One"].startswith(marker("workitem", 1))
+    assert len(sink.comments) == 1 and "hi" in sink.comments[0][1]
+
+    # A rerun resumes from the state file and creates nothing new
+    assert WorkItemMigration(source, sink, state, log).run()
+    assert len(sink.created) == 2 and len(sink.comments) == 1
+    assert log.error_count == 0
+    state.close()
+
+
+def test_delta_run_updates_changed_work_items_only(tmp_path):
+    items = [work_item(1, "One"), work_item(2, "Two")]
+    sink = MemorySink()
+    state = StateStore(str(tmp_path / "state.db"))
+    log = MigrationLog(path=None)
+    WorkItemMigration(ListWorkItemSource(items, {}), sink, state, log).run()
+    items[1]["fields"]["System.Title"] = "Two, renamed"
+    assert WorkItemMigration(ListWorkItemSource(items, {}), sink, state, log, delta=True).run()
+    assert sink.updated == [(2, "Two, renamed")]
+    state.close()
+
+
+def pull_request(pr_id, title):
+    return {"pullRequestId": pr_id, "title": title, "description": None, "sourceRefName": "refs/heads/feature",
+            "targetRefName": "refs/heads/main", "createdBy": {"displayName": "Ann"},
+            "creationDate": "2024-01-02T10:00:00.123Z"}
+
+
+def test_pull_requests_are_created_once_with_their_thread_comments(tmp_path):
+    pr = pull_request(5, "Feature")
+    thread = {"id": 1, "comments": [{"id": 1, "author": {"displayName": "Bob"}, "content": "looks good",
+                                     "publishedDate": "2024-01-03T10:00:00.000Z"}]}
+    source = ListPullRequestSource([pr], {5: [thread]})
+    sink = MemorySink()
+    state = StateStore(str(tmp_path / "state.db"))
+    log = MigrationLog(path=None)
+    assert PullRequestMigration(source, sink, state, log).run()
+    assert PullRequestMigration(source, sink, state, log).run()
+    assert [title for title, _ in sink.created] == ["Feature"]
+    assert sink.comments == [(1, "_Comment by **Bob** on 2024-01-03_:\n\nlooks good")]
+    assert state.done_ids("pr") == {5}
+    state.close()
+
+
+def test_repositories_sharing_a_state_file_are_each_indexed_on_github(tmp_path):
+    class ExistingSink(MemorySink):
+        def existing(self):
+            index = MigrationIndex()
+            index.add("pr", 6, 1)
+            return index
+
+    sources = {"a": ListPullRequestSource([pull_request(5, "Five")], {}),
+               "b": ListPullRequestSource([pull_request(6, "Six")], {})}
+    sinks = {"a": MemorySink(), "b": ExistingSink()}
+    state = StateStore(str(tmp_path / "state.db"))
+    log = MigrationLog(path=None)
+    migrations = {}
+    for name, source in sources.items():
+        source.repo = name
+        migrations[name] = PullRequestMigration(source, sinks[name], state, log.scoped(name))
+    assert migrate_repositories(migrations, 2, log) == []
+    # PR 6 was already on GitHub in b, even though a had filled the state file first
+    assert [title for title, _ in sinks["a"].created] == ["Five"]
+    assert sinks["b"].created == []
+    assert state.done_ids("pr") == {5, 6}
+    state.close()
+
+
+def test_scoped_log_counts_its_own_errors_only():
+    log = MigrationLog(path=None)
+    a, b = log.scoped("a"), log.scoped("b")
+    a.error("boom")
+    assert (a.error_count, b.error_count, log.error_count) == (1, 0, 1)
+
+
+def test_project_pairs_follow_the_manifest(tmp_path):
+    manifest = tmp_path / "repos.txt"
+    manifest.write_text("# ADO repo, GitHub repo\nWeb org/web\nmissing org/missing\n")
+    log = MigrationLog(path=None)
+    pairs = project_pairs([{"name": "web"}, {"name": "Api"}], parse_repo_manifest(str(manifest)), log)
+    assert pairs == [("web", "org/web")]
+    assert log.error_count == 1
+
+    manifest.write_text("web\n")
+    with pytest.raises(ValueError, match="repos.txt:1"):
+        parse_repo_manifest(str(manifest))
+
+
+def test_plans_count_the_writes_the_run_makes(tmp_path):
+    comment = {"id": 7, "createdBy": {"displayName": "Bob"}, "createdDate": "2024-01-03T10:00:00Z", "text": "hi"}
+    source = ListWorkItemSource([work_item(1, "One"), work_item(2, "Two")], {1: [comment], 2: [comment, comment]})
+    sink = MemorySink()
+    state = StateStore(str(tmp_path / "state.db"))
+    log = MigrationLog(path=None)
+    plan = Plan("work items")
+    WorkItemMigration(source, sink, state, log).plan(plan)
+    assert (plan.items, plan.creates, plan.comments, plan.writes, plan.ado_reads) == (2, 2, 3, 5, 2)
+    assert sink.created == []
+
+    WorkItemMigration(source, sink, state, log).run()
+    plan = Plan("work items")
+    WorkItemMigration(source, sink, state, log).plan(plan)
+    assert (plan.done, plan.writes) == (2, 0)
+
+    thread = {"id": 1, "comments": [{"id": 1, "author": {"displayName": "Bob"}, "content": "looks good",
+                                     "publishedDate": "2024-01-03T10:00:00.000Z"}]}
+    prs = ListPullRequestSource([pull_request(5, "Feature"), pull_request(6, "Fix")], {5: [thread]})
+    plan = Plan("PRs")
+    PullRequestMigration(prs, sink, state, log, workers=2).plan(plan)
+    assert (plan.items, plan.creates, plan.comments, plan.writes) == (2, 2, 1, 3)
+    state.record_item("pr", 5, 1)
+    state.record_comment("pr", 5, "1/1")
+    plan = Plan("PRs")
+    PullRequestMigration(prs, sink, state, log).plan(plan)
+    assert (plan.resumed, plan.creates, plan.comments) == (1, 1, 0)
+    state.close()
@@ -0,0 +1,88 @@
+import os
+import shutil
+import subprocess
+
+import pytest
+
+import repo_mirror
+from git_refs import GitError, mismatched_refs, parse_refs, ref_delta
+from repo_mirror import RepoJob, mirror_repo, push_history
+
+A, B, C = "a" * 40, "b" * 40, "c" * 40
+
+
+def test_parse_refs_skips_head_peeled_and_pull_refs():
+    output = "\n".join([
+        f"{A}\tHEAD",
+        f"{A}\trefs/heads/main",
+        f"{B}\trefs/tags/v1",
+        f"{C}\trefs/tags/v1^{{}}",
+        f"{C}\trefs/pull/7/merge",
+    ])
+    assert parse_refs(output) == {"refs/heads/main": A, "refs/tags/v1": B}
+
+
+def test_ref_delta_only_touches_changed_refs():
+    local = {"refs/heads/main": A, "refs/heads/new": B, "refs/tags/v1": C}
+    remote = {"refs/heads/main": A, "refs/tags/v1": B, "refs/heads/gone": C}
+    assert ref_delta(local, remote) == [
+        "+refs/heads/new:refs/heads/new",
+        "+refs/tags/v1:refs/tags/v1",
+        ":refs/heads/gone",
+    ]
+    assert ref_delta(local, local) == []
+
+
+def test_mismatched_refs():
+    assert mismatched_refs({"refs/heads/a": A, "refs/heads/b": B}, {"refs/heads/a": A, "refs/heads/c": C}) == [
+        "refs/heads/b", "refs/heads/c"]
+
+
+def test_push_history_halves_the_step_when_a_push_is_rejected(monkeypatch):
+    commits = [f"{i:040d}" for i in range(10)]
+    pushed = []
+
+    def fake_run_git(args, cwd=None, log=None):
+        target = commits.index(args[-1].split(":")[0][1:])
+        done = commits.index(pushed[-1]) + 1 if pushed else 0
+        if target - done >= 3:  # Pretend anything over three commits exceeds the pack limit
+            raise GitError("pack exceeds maximum allowed size")
+        pushed.append(commits[target])
+
+    monkeypatch.setattr(repo_mirror, "run_git", fake_run_git)
+    job = RepoJob("a", "https://github.com/o/r.git")
+    job.path = "a.git"
+    push_history(job, "refs/heads/main", commits, step=8)
+    assert pushed[-1] == commits[-1]
+    assert pushed == [commits[1], commits[3], commits[5], commits[7], commits[9]]
+
+
+def git(*args, cwd=None):
+    env = dict(os.environ, GIT_AUTHOR_NAME="t", GIT_AUTHOR_EMAIL="t@t", GIT_COMMITTER_NAME="t",
+               GIT_COMMITTER_EMAIL="t@t")
+    return subprocess.run(["git", *args], cwd=cwd, env=env, check=True, capture_output=True, text=True).stdout
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+def test_mirror_repo_reuses_the_cached_mirror(tmp_path):
+    source, target = tmp_path / "source", tmp_path / "target.git"
+    git("init", "-q", str(source))
+    git("commit", "-q", "--allow-empty", "-m", "one", cwd=source)
+    git("branch", "feature", cwd=source)
+    git("update-ref", "refs/pull/1/merge", "HEAD", cwd=source)
+    git("init", "-q", "--bare", str(target))
+
+    job = RepoJob(source.as_uri(), str(target))
+    job.path = str(tmp_path / "cache" / "source.git")
+    with open(tmp_path / "log", "w") as log:
+        mirror_repo(job, log=log)
+        git("commit", "-q", "--allow-empty", "-m", "two", cwd=source)
+        git("branch", "-D", "feature", cwd=source)
+        mirror_repo(job, log=log)
+
+    source_refs = parse_refs(git("for-each-ref", "--format=%(objectname) %(refname)", cwd=source))
+    assert parse_refs(git("ls-remote", str(target))) == source_refs
+    assert "refs/heads/feature" not in source_refs
+    log_text = (tmp_path / "log").read_text()
+    assert log_text.count("git clone") == 1
+    assert "git remote update --prune" in log_text
@@ -0,0 +1,65 @@
+import json
+
+import pytest
+
+from fakes import FakeTransport, make_response
+from github_client import GitHubClient
+from transport import HTTPError, TransportError
+
+
+def fast_client(transport):
+    client = GitHubClient("token", transport, write_interval=0)
+    client.throttle.backoff = lambda attempt: 0.0
+    return client
+
+
+def test_relative_paths_params_and_json_body():
+    transport = FakeTransport(make_response(201, {"number": 1}))
+    fast_client(transport).post("/repos/a/b/issues", json={"title": "t"}, params={"x": 1})
+    method, url, headers, body = transport.calls[0]
+    assert (method, url) == ("POST", "https://api.github.com/repos/a/b/issues?x=1")
+    assert headers["Content-Type"] == "application/json"
+    assert headers["Authorization"] == "Bearer token"
+    assert json.loads(body) == {"title": "t"}
+
+
+def test_post_is_retried_after_rate_limit():
+    transport = FakeTransport(make_response(429, headers={"Retry-After": "0"}), make_response(201, {"number": 7}))
+    client = fast_client(transport)
+    client.throttle.retry_delay = lambda *a: 0.0 if a[1] == 429 else None
+    assert client.post("/repos/a/b/issues", json={}).json()["number"] == 7
+    assert len(transport.calls) == 2
+
+
+def test_post_is_not_retried_after_server_error():
+    transport = FakeTransport(make_response(502))
+    with pytest.raises(HTTPError) as excinfo:
+        fast_client(transport).post("/repos/a/b/issues", json={})
+    assert excinfo.value.response.status_code == 502
+    assert len(transport.calls) == 1
+
+
+def test_get_is_retried_after_server_error():
+    transport = FakeTransport(make_response(502), make_response(200, []))
+    fast_client(transport).get("/repos/a/b/issues")
+    assert len(transport.calls) == 2
+
+
+def test_sent_write_is_not_resent_after_network_error():
+    transport = FakeTransport(TransportError("read timed out", sent=True))
+    with pytest.raises(TransportError):
+        fast_client(transport).post("/repos/a/b/issues", json={})
+    assert len(transport.calls) == 1
+
+
+def test_unsent_write_is_resent_after_network_error():
+    transport = FakeTransport(TransportError("refused", sent=False), make_response(201, {"number": 1}))
+    fast_client(transport).post("/repos/a/b/issues", json={})
+    assert len(transport.calls) == 2
+
+
+def test_paginate_follows_link_headers():
+    next_link = '<https://api.github.com/repos/a/b/issues?page=2>; rel="next"'
+    transport = FakeTransport(make_response(200, [1, 2], {"Link": next_link}), make_response(200, [3]))
+    assert list(fast_client(transport).paginate("/repos/a/b/issues", params={"state": "all"})) == [1, 2, 3]
+    assert transport.calls[1][1] == "https://api.github.com/repos/a/b/issues?page=2"
@@ -0,0 +1,102 @@
+import time
+from email.utils import formatdate
+
+import pytest
+
+import github_throttle
+from github_throttle import GitHubThrottle, parse_retry_after
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Freeze monotonic time and record sleeps instead of waiting"""
+    state = {"now": 1000.0, "sleeps": []}
+
+    def sleep(seconds):
+        state["sleeps"].append(seconds)
+        state["now"] += seconds
+
+    monkeypatch.setattr(github_throttle.time, "monotonic", lambda: state["now"])
+    monkeypatch.setattr(github_throttle.time, "sleep", sleep)
+    monkeypatch.setattr(github_throttle.random, "uniform", lambda a, b: 0.0)
+    return state
+
+
+def test_parse_retry_after_seconds_and_http_date():
+    assert parse_retry_after("30") == 30.0
+    assert 50 <= parse_retry_after(formatdate(time.time() + 60, usegmt=True)) <= 60
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_writes_are_spaced_by_write_interval(clock):
+    throttle = GitHubThrottle(write_interval=1.0)
+    for _ in range(3):
+        throttle.wait_turn("POST")
+    throttle.wait_turn("GET")
+    assert clock["sleeps"] == [1.0, 1.0]
+
+
+def test_429_with_retry_after_pauses_everyone(clock):
+    throttle = GitHubThrottle()
+    assert throttle.retry_delay("POST", 429, {"Retry-After": "5"}, "", 0) == 5.0
+    throttle.wait_turn("GET")
+    assert clock["sleeps"] == [5.0]
+
+
+def test_unparseable_retry_after_falls_back_to_backoff(clock):
+    throttle = GitHubThrottle(backoff_base=2.0)
+    assert throttle.retry_delay("POST", 429, {"Retry-After": "later"}, "", 1) == 2.0
+
+
+def test_403_secondary_limit_without_header_waits_a_minute(clock):
+    throttle = GitHubThrottle()
+    body = '{"message": "You have exceeded a secondary rate limit"}'
+    assert throttle.retry_delay("POST", 403, {}, body, 0) == 60.0
+
+
+def test_plain_403_is_not_retried(clock):
+    throttle = GitHubThrottle()
+    assert throttle.retry_delay("GET", 403, {}, '{"message": "Resource not accessible"}', 0) is None
+
+
+def test_5xx_retries_reads_but_never_writes(clock):
+    throttle = GitHubThrottle(backoff_base=2.0)
+    assert throttle.retry_delay("GET", 502, {}, "", 0) == 1.0
+    assert throttle.retry_delay("POST", 502, {}, "", 0) is None
+
+
+def test_connection_errors_only_resend_writes_that_never_left(clock):
+    throttle = GitHubThrottle()
+    assert throttle.connection_retry_delay("POST", False, 0) is not None
+    assert throttle.connection_retry_delay("POST", True, 0) is None
+    assert throttle.connection_retry_delay("GET", True, 0) is not None
+
+
+def test_gives_up_after_max_retries(clock):
+    throttle = GitHubThrottle(max_retries=2)
+    assert throttle.retry_delay("GET", 502, {}, "", 2) is None
+    assert throttle.connection_retry_delay("GET", False, 2) is None
+
+
+def test_one_throttle_event_tightens_pace_once(clock):
+    throttle = GitHubThrottle(write_interval=1.0)
+    for _ in range(8):  # Eight workers hitting the same secondary limit
+        throttle.retry_delay("POST", 403, {"Retry-After": "10"}, "", 0)
+    assert throttle.write_interval == 2.0
+
+    clock["now"] += 11
+    throttle.retry_delay("POST", 403, {"Retry-After": "10"}, "", 0)
+    assert throttle.write_interval == 4.0
+
+
+def test_success_relaxes_pace_and_exhausted_budget_pauses(clock, monkeypatch):
+    throttle = GitHubThrottle(write_interval=1.0)
+    throttle.write_interval = 2.0
+    throttle.record_success("POST", {})
+    assert throttle.write_interval == pytest.approx(1.9)
+
+    monkeypatch.setattr(github_throttle.time, "time", lambda: 5000.0)
+    throttle.record_success("GET", {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "5030"})
+    throttle.wait_turn("GET")
+    assert clock["sleeps"] == [31.0]
@@ -0,0 +1,77 @@
+import json
+
+import pytest
+
+from fakes import FakeTransport, make_response
+from github_client import GitHubClient
+from identity import IdentityMap, parse_identity_file
+from state_store import StateStore
+from transport import Headers, Response
+from workitem_migration import GitHubIssueSink
+
+ANN = {"displayName": "Ann Lee", "uniqueName": "Ann@Example.com"}
+BOB = {"displayName": "Bob Roe", "uniqueName": "bob@example.com"}
+BOB_ID = "6f1e2a3b-0000-4000-8000-000000000001"
+
+
+class FakeClient:
+    """Answers GitHub user searches and ADO identity lookups, counting the calls"""
+
+    def __init__(self, payload):
+        self.payload = payload
+        self.calls = []
+
+    def get(self, url, params=None):
+        self.calls.append((url, params))
+        return Response(200, Headers(), json.dumps(self.payload).encode(), url)
+
+
+def test_parse_identity_file(tmp_path):
+    path = tmp_path / "identities.txt"
+    path.write_text("# ADO user      GitHub login\nAnn@Example.com  @annlee\n\nbob@example.com bobr  # team lead\n")
+    assert parse_identity_file(str(path)) == {"ann@example.com": "annlee", "bob@example.com": "bobr"}
+    path.write_text("ann@example.com\n")
+    with pytest.raises(ValueError, match="identities.txt:1"):
+        parse_identity_file(str(path))
+
+
+def test_mapped_users_are_mentioned_and_assigned():
+    identities = IdentityMap({"ann@example.com": "annlee"})
+    assert identities.name(ANN) == "Ann Lee (@annlee)"
+    assert identities.assignees(ANN) == ["annlee"]
+    assert identities.name(BOB) == "Bob Roe"
+    assert identities.assignees(None) == []
+    assert IdentityMap().name(ANN) == "Ann Lee"
+
+
+def test_lookups_are_memoized_in_memory_and_in_the_state_file(tmp_path):
+    state = StateStore(str(tmp_path / "state.db"))
+    github = FakeClient({"total_count": 1, "items": [{"login": "bobr"}]})
+    identities = IdentityMap({}, state, github)
+    assert [identities.login(BOB) for _ in range(100)] == ["bobr"] * 100
+    assert len(github.calls) == 1
+
+    # A later run answers from the state file without searching again
+    rerun = IdentityMap({}, state, FakeClient({"total_count": 0, "items": []}))
+    assert rerun.login(BOB) == "bobr"
+    assert rerun.github.calls == []
+    state.close()
+
+
+def test_ado_mentions_become_github_mentions(tmp_path):
+    ado = FakeClient({"value": [{"providerDisplayName": "Bob Roe",
+                                 "properties": {"Account": {"$value": "bob@example.com"}}}]})
+    identities = IdentityMap({"bob@example.com": "bobr"}, ado=ado, org="org")
+    html = f'<div>Ask <a href="#" data-vss-mention="version:2.0,{BOB_ID}">@Bob Roe</a> first</div>'
+    assert identities.rewrite_mentions(html) == "<div>Ask @bobr first</div>"
+    assert identities.rewrite_mentions(f"LGTM @<{BOB_ID.upper()}>") == "LGTM @bobr"
+    assert len(ado.calls) == 1
+
+
+def test_issue_is_created_unassigned_when_github_rejects_the_assignee():
+    transport = FakeTransport(make_response(422, {"message": "Validation Failed"}),
+                              make_response(201, {"number": 7}))
+    sink = GitHubIssueSink(GitHubClient("t", transport, write_interval=0), "o/r")
+    assert sink.create("Title", "Body", ["Bug"], ["annlee"]) == 7
+    assert json.loads(transport.calls[0][3])["assignees"] == ["annlee"]
+    assert "assignees" not in json.loads(transport.calls[1][3])
@@ -0,0 +1,88 @@
+import json
+
+from issue_import import IssueImporter
+from migration_index import MigrationIndex
+from migration_log import MigrationLog
+from state_store import StateStore
+from transport import Headers, Response
+
+
+class FakeImportApi:
+    """GitHub import endpoints answering from a list of statuses the test controls"""
+
+    def __init__(self):
+        self.statuses = {}
+        self.posts = []
+        self.lists = 0
+
+    def post(self, url, json=None, headers=None):
+        import_id = len(self.posts) + 1
+        self.posts.append(json)
+        self.statuses[import_id] = {"id": import_id, "status": "pending", "created_at": f"2024-01-01T00:00:0{import_id}Z",
+                                    "url": f"https://api.github.com/repos/o/r/import/issues/{import_id}"}
+        return self.respond(self.statuses[import_id])
+
+    def get(self, url, params=None, headers=None):
+        self.lists += 1
+        return self.respond([status for status in self.statuses.values() if status["created_at"] >= params["since"]])
+
+    def finish(self, import_id, number=None, errors=None):
+        if number is None:
+            self.statuses[import_id].update(status="failed", errors=errors)
+        else:
+            self.statuses[import_id].update(status="imported",
+                                            issue_url=f"https://api.github.com/repos/o/r/issues/{number}")
+
+    @staticmethod
+    def respond(payload):
+        return Response(202, Headers(), json.dumps(payload).encode())
+
+
+def importer(tmp_path, api):
+    state = StateStore(str(tmp_path / "state.db"))
+    return IssueImporter(api, "o/r", state, MigrationLog(path=None), poll_interval=60), state
+
+
+def test_imports_are_checked_with_one_list_call_and_recorded_when_done(tmp_path):
+    api = FakeImportApi()
+    imports, state = importer(tmp_path, api)
+    index = MigrationIndex()
+    imports.start(index)
+    for ado_id in (1, 2, 3):
+        index.claim("workitem", ado_id)
+        imports.submit(ado_id, {"title": f"Item {ado_id}"}, [{"body": "c"}], [f"{ado_id}0"], f"hash{ado_id}")
+    assert api.posts[0] == {"issue": {"title": "Item 1"}, "comments": [{"body": "c"}]}
+    api.finish(1, number=11)
+    api.finish(2, errors=[{"field": "assignee", "code": "invalid"}])
+    assert imports.poll() == 1
+    assert api.lists == 1
+
+    assert state.get_number("workitem", 1) == 11 and state.done_ids("workitem") == {1}
+    assert state.posted_comments("workitem", 1) == {"10"}
+    assert state.get_hash("workitem", 1) == "hash1"
+    assert index.get("workitem", 1) == 11
+    assert index.claim("workitem", 2)  # The failed import was released for a retry
+    assert imports.log.error_count == 1
+    assert imports.is_pending(3) and not imports.is_pending(1)
+
+    api.finish(3, number=13)
+    imports.finish()
+    assert state.done_ids("workitem") == {1, 3}
+    assert state.pending_imports("workitem") == []
+    state.close()
+
+
+def test_imports_in_flight_are_resumed_by_the_next_run(tmp_path):
+    api = FakeImportApi()
+    imports, state = importer(tmp_path, api)
+    imports.start(MigrationIndex())
+    imports.submit(7, {"title": "Seven"}, [], [], "hash7")
+    imports._stop.set()  # The run dies before the import completes
+
+    resumed = IssueImporter(api, "o/r", state, MigrationLog(path=None), poll_interval=60)
+    resumed.start(MigrationIndex())
+    assert resumed.is_pending(7)
+    api.finish(1, number=70)
+    resumed.finish()
+    assert state.get_number("workitem", 7) == 70
+    state.close()
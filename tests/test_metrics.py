@@ -0,0 +1,71 @@
+import json
+
+import ado_client
+from ado_client import AdoClient
+from fakes import FakeTransport, make_response
+from github_client import GitHubClient
+from metrics import Metrics, percentile
+
+
+def read_events(path):
+    with open(path) as metrics_file:
+        return [json.loads(line) for line in metrics_file]
+
+
+def test_percentile():
+    assert percentile([], 0.5) is None
+    assert percentile([3, 1, 2], 0.5) == 2
+    assert percentile(list(range(100)), 0.95) == 95
+
+
+def test_events_are_written_as_json_lines_and_summarised(tmp_path):
+    path = tmp_path / "metrics.jsonl"
+    metrics = Metrics(str(path))
+    metrics.request("ado", "GET", "https://dev.azure.com/o/p?x=1", 200, 0.2, 0, 100)
+    metrics.request("ado", "GET", "https://dev.azure.com/o/p", 503, 0.4)
+    metrics.retry("ado", "GET", "https://dev.azure.com/o/p", 503, 1.5)
+    metrics.wait("ado", 1.5, "retry")
+    metrics.transfer("push", "repo", 2048, 3.0)
+    metrics.count("comments_posted", 2)
+    with metrics.phase("migrate") as phase:
+        phase.add(3)
+    summary = metrics.summary()
+    metrics.close()
+
+    ado = summary["services"]["ado"]
+    assert (ado["requests"], ado["errors"], ado["retries"], ado["bytes_received"]) == (2, 1, 1, 100)
+    assert ado["wait_seconds"] == 1.5
+    assert summary["phases"]["migrate"]["items"] == 3
+    assert summary["transfers"]["push"] == {"count": 1, "bytes": 2048, "seconds": 3.0}
+    assert summary["counters"] == {"comments_posted": 2}
+
+    events = read_events(path)
+    assert [e["event"] for e in events] == ["request", "request", "retry", "wait", "transfer", "phase", "summary"]
+    assert events[0]["url"] == "https://dev.azure.com/o/p"
+
+
+def test_metrics_without_a_path_only_aggregate():
+    metrics = Metrics()
+    metrics.request("github", "POST", "https://api.github.com/x", 201, 0.1, 10, 20)
+    assert metrics.summary()["services"]["github"]["bytes_sent"] == 10
+
+
+def test_ado_client_records_attempts_and_retries(monkeypatch):
+    monkeypatch.setattr(ado_client.time, "sleep", lambda seconds: None)
+    metrics = Metrics()
+    transport = FakeTransport(make_response(429, headers={"Retry-After": "2"}), make_response(200, {"value": []}))
+    AdoClient("pat", transport, metrics=metrics).get("https://dev.azure.com/o/p/_apis/x")
+    ado = metrics.summary()["services"]["ado"]
+    assert (ado["requests"], ado["errors"], ado["retries"], ado["wait_seconds"]) == (2, 1, 1, 2.0)
+
+
+def test_github_client_records_pacing_waits(monkeypatch):
+    monkeypatch.setattr(ado_client.time, "sleep", lambda seconds: None)
+    metrics = Metrics()
+    transport = FakeTransport(make_response(201, {"number": 1}), make_response(201, {"number": 2}))
+    client = GitHubClient("token", transport, write_interval=5.0, metrics=metrics)
+    client.post("/repos/a/b/issues", json={})
+    client.post("/repos/a/b/issues", json={})
+    github = metrics.summary()["services"]["github"]
+    assert github["requests"] == 2
+    assert github["wait_seconds"] > 4
@@ -0,0 +1,53 @@
+from github_client import GitHubClient
+from migration_index import MigrationIndex, build_issue_index, build_pr_index, marker
+
+from fakes import FakeTransport, make_response
+
+
+def test_claim_reserves_an_id_once_until_released():
+    index = MigrationIndex()
+    assert index.claim("workitem", 7)
+    assert not index.claim("workitem", 7)
+    index.release("workitem", 7)
+    assert index.claim("workitem", "7")
+
+
+def test_release_keeps_created_items():
+    index = MigrationIndex()
+    index.claim("pr", 3)
+    index.add("pr", 3, 42)
+    index.release("pr", 3)
+    assert index.get("pr", 3) == 42
+    assert not index.claim("pr", 3)
+
+
+def test_kinds_do_not_collide():
+    index = MigrationIndex()
+    index.add("workitem", 5, 1)
+    assert index.get("pr", 5) is None
+    assert index.claim("pr", 5)
+
+
+def test_build_issue_index_reads_markers_and_legacy_links_and_skips_prs():
+    github = GitHubClient("t", FakeTransport(make_response(200, [
+        {"number": 1, "body": marker("workitem", 10) + "\nSame title"},
+        {"number": 2, "body": "**Original ADO Link:** [x](https://dev.azure.com/o/p/_workitems/edit/11)"},
+        {"number": 3, "body": marker("workitem", 12), "pull_request": {}},
+        {"number": 4, "body": None},
+    ])), write_interval=0)
+    index = build_issue_index(github, "a/b")
+    assert index.get("workitem", 10) == 1
+    assert index.get("workitem", 11) == 2
+    assert index.get("workitem", 12) is None
+    assert len(index) == 2
+
+
+def test_build_pr_index_falls_back_to_title_and_branches():
+    github = GitHubClient("t", FakeTransport(make_response(200, [
+        {"number": 1, "title": "A", "body": marker("pr", 100), "head": {"ref": "f"}, "base": {"ref": "main"}},
+        {"number": 2, "title": "B", "body": "old", "head": {"ref": "g"}, "base": {"ref": "main"}},
+    ])), write_interval=0)
+    index = build_pr_index(github, "a/b")
+    assert index.get("pr", 100) == 1
+    assert index.get_legacy_pr("B", "g", "main") == 2
+    assert index.get_legacy_pr("A", "f", "main") is None
@@ -0,0 +1,113 @@
+import threading
+import time
+
+import pytest
+
+from pipeline import ordered_map, prefetch, run_bounded
+
+
+def test_run_bounded_processes_every_item():
+    seen = []
+    run_bounded(range(50), seen.append, workers=4)
+    assert sorted(seen) == list(range(50))
+
+
+def test_run_bounded_limits_items_pulled_ahead_of_workers():
+    release = threading.Event()
+    pulled = []
+
+    def source():
+        for i in range(20):
+            pulled.append(i)
+            yield i
+
+    def worker(item):
+        release.wait(5)
+
+    t = threading.Thread(target=run_bounded, args=(source(), worker, 2))
+    t.start()
+    try:
+        # Two workers with a backlog of two: the fifth item is pulled, then the loop blocks
+        for _ in range(100):
+            if len(pulled) >= 5:
+                break
+            time.sleep(0.01)
+        time.sleep(0.05)
+        assert len(pulled) == 5
+    finally:
+        release.set()
+        t.join(5)
+    assert len(pulled) == 20
+
+
+def test_run_bounded_reraises_worker_errors():
+    def worker(item):
+        if item == 3:
+            raise ValueError("bad item")
+
+    with pytest.raises(ValueError):
+        run_bounded(range(5), worker, workers=2)
+
+
+def test_ordered_map_keeps_input_order():
+    def worker(item):
+        time.sleep(0.001 * (10 - item % 10))
+        return item * 2
+
+    assert list(ordered_map(range(30), worker, workers=4)) == [i * 2 for i in range(30)]
+
+
+def test_ordered_map_stops_submitting_when_the_consumer_stops():
+    started = []
+
+    def worker(item):
+        started.append(item)
+        return item
+
+    results = ordered_map(range(1000), worker, workers=2)
+    assert next(results) == 0
+    results.close()
+    assert len(started) <= 5
+
+
+def test_prefetch_runs_a_bounded_distance_ahead():
+    pulled = []
+
+    def source():
+        for i in range(20):
+            pulled.append(i)
+            yield i
+
+    items = prefetch(source(), depth=3)
+    assert next(items) == 0
+    time.sleep(0.1)
+    # One item consumed, three queued and one held by the producer waiting for room
+    assert len(pulled) == 5
+    assert list(items) == list(range(1, 20))
+
+
+def test_prefetch_reraises_source_errors_after_earlier_items():
+    def source():
+        yield 1
+        raise ValueError("page failed")
+
+    items = prefetch(source(), depth=2)
+    assert next(items) == 1
+    with pytest.raises(ValueError, match="page failed"):
+        next(items)
+
+
+def test_prefetch_close_stops_the_source():
+    pulled = []
+
+    def source():
+        for i in range(1000):
+            pulled.append(i)
+            yield i
+
+    items = prefetch(source(), depth=2)
+    next(items)
+    items.close()
+    count = len(pulled)
+    time.sleep(0.2)
+    assert len(pulled) == count < 1000
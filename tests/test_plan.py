@@ -0,0 +1,27 @@
+from plan import format_duration, project_duration
+
+BUDGET = (5000, 5000, 0)
+
+
+def test_writes_are_paced_no_faster_than_the_per_minute_limit():
+    assert project_duration(100, 1.0, BUDGET, 5.0, now=0) == (100.0, "write pacing")
+    assert project_duration(100, 0.1, BUDGET, 5.0, now=0) == (75.0, "write pacing")
+    assert project_duration(10, 1.0, BUDGET, 60.0, now=0) == (60.0, "ADO reads")
+
+
+def test_hourly_write_limit_dominates_long_runs():
+    seconds, reason = project_duration(1200, 1.0, BUDGET, 0.0, writes_per_hour=500, now=0)
+    assert reason == "500 writes/hour limit"
+    assert seconds == 2 * 3600 + 200
+    assert project_duration(1200, 1.0, BUDGET, 0.0, writes_per_hour=0, now=0) == (1200.0, "write pacing")
+
+
+def test_spent_primary_budget_waits_for_the_reset():
+    seconds, reason = project_duration(300, 1.0, (5000, 100, 1000), 0.0, writes_per_hour=0, now=0)
+    assert (seconds, reason) == (1000, "primary rate limit")
+
+
+def test_format_duration():
+    assert format_duration(42) == "42s"
+    assert format_duration(125) == "2m 05s"
+    assert format_duration(3 * 3600 + 7 * 60) == "3h 07m"
@@ -0,0 +1,43 @@
+import os
+
+import pytest
+
+from repo_mirror import RepoJob, assign_directories, github_owner_repo, parse_manifest, schedule
+
+
+def test_parse_manifest(tmp_path):
+    manifest = tmp_path / "repos.txt"
+    manifest.write_text("# repos\n"
+                        "https://dev.azure.com/o/p/_git/api https://github.com/org/api.git 2048\n"
+                        "\n"
+                        "https://dev.azure.com/o/p/_git/web https://github.com/org/web.git  # no size\n")
+    jobs = parse_manifest(str(manifest))
+    assert [(job.name, job.github_url, job.size) for job in jobs] == [
+        ("api", "https://github.com/org/api.git", 2048),
+        ("web", "https://github.com/org/web.git", None),
+    ]
+
+
+def test_parse_manifest_rejects_malformed_lines(tmp_path):
+    manifest = tmp_path / "repos.txt"
+    manifest.write_text("https://dev.azure.com/o/p/_git/api\n")
+    with pytest.raises(ValueError, match="repos.txt:1"):
+        parse_manifest(str(manifest))
+
+
+def test_schedule_puts_largest_first_and_unknown_sizes_last():
+    jobs = [RepoJob("a", "x", 10), RepoJob("b", "x"), RepoJob("c", "x", 300), RepoJob("d", "x", 0)]
+    assert [job.name for job in schedule(jobs)] == ["c", "a", "d", "b"]
+
+
+def test_assign_directories_keeps_colliding_names_apart():
+    jobs = assign_directories([RepoJob("p1/_git/Api", "x"), RepoJob("p2/_git/api", "x"),
+                               RepoJob("p3/_git/my repo", "x")], "w")
+    assert [job.path for job in jobs] == [os.path.join("w", "Api.git"), os.path.join("w", "api-2.git"),
+                                          os.path.join("w", "my_repo.git")]
+
+
+def test_github_owner_repo():
+    assert github_owner_repo("https://github.com/org/api.git") == "org/api"
+    assert github_owner_repo("git@github.com:org/api") == "org/api"
+    assert github_owner_repo("/tmp/api.git") is None
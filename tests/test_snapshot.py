@@ -0,0 +1,43 @@
+import shutil
+
+import pytest
+
+from repo_mirror import RepoJob
+from snapshot import select_branches, snapshot_repo
+from test_git_refs import git
+
+A, B, C = "a" * 40, "b" * 40, "c" * 40
+
+
+def test_select_branches_matches_patterns_on_branch_names():
+    refs = {"refs/heads/main": A, "refs/heads/release/1.0": B, "refs/heads/feature/x": C, "refs/tags/v1": A}
+    assert select_branches(refs, ["*"]) == {"feature/x": C, "main": A, "release/1.0": B}
+    assert select_branches(refs, ["main", "release/*"]) == {"main": A, "release/1.0": B}
+    assert select_branches(refs, ["v1"]) == {}
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+def test_snapshot_repo_pushes_parentless_commits_of_the_tip_trees(tmp_path):
+    source, target = tmp_path / "ado", tmp_path / "github.git"
+    git("init", "-q", "-b", "main", str(source))
+    for n in range(3):
+        (source / "file.txt").write_text(f"version {n}\n")
+        git("add", "file.txt", cwd=source)
+        git("commit", "-q", "-m", f"commit {n}", cwd=source)
+    git("branch", "release/1.0", "HEAD~1", cwd=source)
+    git("branch", "feature", cwd=source)
+    git("init", "-q", "--bare", str(target))
+
+    job = RepoJob(source.as_uri(), str(target))
+    job.path = str(tmp_path / "cache" / "ado.git")
+    with open(tmp_path / "log", "w") as log:
+        assert snapshot_repo(job, log=log, branches=["main", "release/*"]) == 2
+        # The same tips give the same snapshot commits, so a rerun has nothing to push
+        assert snapshot_repo(job, log=log, branches=["main", "release/*"]) == 0
+
+    heads = git("ls-remote", "--heads", str(target)).split()
+    assert sorted(heads[1::2]) == ["refs/heads/main", "refs/heads/release/1.0"]
+    for branch, tip in (("main", "main"), ("release/1.0", "main~1")):
+        assert git("rev-list", "--count", branch, cwd=target).strip() == "1"
+        assert git("rev-parse", f"{branch}^{{tree}}", cwd=target) == git("rev-parse", f"{tip}^{{tree}}", cwd=source)
+    assert "push --atomic" in (tmp_path / "log").read_text()
@@ -0,0 +1,91 @@
+import sqlite3
+
+from migration_index import MigrationIndex
+from state_store import StateStore, load_index
+
+
+def test_state_survives_reopening(tmp_path):
+    path = str(tmp_path / "state.db")
+    state = StateStore(path)
+    state.record_item("workitem", 1, 10)
+    state.record_comment("workitem", 1, 100)
+    state.record_item("workitem", 2, 11)
+    state.mark_done("workitem", 2)
+    state.close()
+
+    state = StateStore(path)
+    assert state.get_number("workitem", 1) == 10
+    assert state.posted_comments("workitem", 1) == {"100"}
+    assert state.done_ids("workitem") == {2}
+    assert state.get_number("pr", 1) is None
+    state.close()
+
+
+def test_record_existing_does_not_complete_tracked_items(tmp_path):
+    state = StateStore(str(tmp_path / "state.db"))
+    state.record_item("pr", 5, 50)
+    state.record_existing("pr", 5, 50)
+    state.record_existing("pr", 6, 60)
+    assert state.done_ids("pr") == {6}
+    state.close()
+
+
+def test_done_among_only_returns_completed_ids_of_the_given_ones(tmp_path):
+    state = StateStore(str(tmp_path / "state.db"))
+    for ado_id in (1, 2, 3):
+        state.record_item("workitem", ado_id, ado_id * 10)
+    state.mark_done("workitem", 1)
+    state.mark_done("workitem", 3)
+    state.record_existing("pr", 2, 20)
+    assert state.done_among("workitem", [1, 2, 4]) == {1}
+    assert state.done_among("workitem", []) == set()
+    state.close()
+
+
+def test_load_index_lists_github_only_without_state(tmp_path):
+    state = StateStore(str(tmp_path / "state.db"))
+    calls = []
+
+    def build_remote():
+        calls.append(1)
+        index = MigrationIndex()
+        index.add("workitem", 3, 30)
+        return index
+
+    assert load_index(state, "workitem", build_remote).get("workitem", 3) == 30
+    assert load_index(state, "workitem", build_remote).get("workitem", 3) == 30
+    assert len(calls) == 1
+    assert state.done_ids("workitem") == {3}
+
+    load_index(state, "workitem", build_remote, rescan=True)
+    assert len(calls) == 2
+    state.close()
+
+
+def test_hashes_and_watermarks(tmp_path):
+    state = StateStore(str(tmp_path / "state.db"))
+    state.record_item("workitem", 1, 10, "h1")
+    assert state.get_hash("workitem", 1) == "h1"
+    state.set_hash("workitem", 1, "h2")
+    assert state.get_hash("workitem", 1) == "h2"
+
+    assert state.get_watermark("workitems:o/p") is None
+    state.set_watermark("workitems:o/p", "2024-05-01T09:55:00Z")
+    state.set_watermark("workitems:o/p", "2024-05-02T09:55:00Z")
+    assert state.get_watermark("workitems:o/p") == "2024-05-02T09:55:00Z"
+    state.close()
+
+
+def test_state_files_without_hash_column_are_upgraded(tmp_path):
+    path = str(tmp_path / "state.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE items (kind TEXT NOT NULL, ado_id INTEGER NOT NULL, number INTEGER NOT NULL, "
+                 "done INTEGER NOT NULL DEFAULT 0, PRIMARY KEY (kind, ado_id))")
+    conn.execute("INSERT INTO items VALUES ('pr', 1, 2, 1)")
+    conn.commit()
+    conn.close()
+
+    state = StateStore(path)
+    assert state.get_hash("pr", 1) is None
+    assert state.done_ids("pr") == {1}
+    state.close()
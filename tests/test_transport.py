@@ -0,0 +1,100 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+from urllib3.exceptions import MaxRetryError, NewConnectionError
+
+from requests_transport import RequestsTransport, _never_sent
+from transport import Headers, Response, TransportError, UrllibTransport
+
+
+@pytest.fixture
+def server():
+    """Local keep-alive HTTP server that counts the TCP connections it accepts"""
+    connections = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            connections.append(self.client_address)
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            if self.path == "/old":
+                self.send_response(301)
+                self.send_header("Location", "/new")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            body = f'{{"path": "{self.path}"}}'.encode()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("X-Test", "yes")
+            self.end_headers()
+            self.wfile.write(body)
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}", connections
+    httpd.shutdown()
+
+
+def test_headers_are_case_insensitive_and_links_parse():
+    resp = Response(200, Headers([("Link", '<https://x/2>; rel="next", <https://x/9>; rel="last"')]), b"")
+    assert resp.headers.get("link") == resp.headers["LINK"]
+    assert resp.links == {"next": {"url": "https://x/2"}, "last": {"url": "https://x/9"}}
+
+
+def test_urllib_transport_reuses_one_connection_per_thread(server):
+    base, connections = server
+    transport = UrllibTransport()
+    for i in range(5):
+        resp = transport.send("GET", f"{base}/items/{i}")
+        assert resp.json() == {"path": f"/items/{i}"}
+        assert resp.headers.get("x-test") == "yes"
+    assert len(connections) == 1
+
+
+def test_urllib_transport_follows_redirects(server):
+    base, _ = server
+    assert UrllibTransport().send("GET", f"{base}/old").json() == {"path": "/new"}
+
+
+def test_urllib_transport_connect_failure_is_unsent():
+    with pytest.raises(TransportError) as excinfo:
+        UrllibTransport(timeout=2).send("POST", "http://127.0.0.1:1/x", body=b"{}")
+    assert excinfo.value.sent is False
+
+
+def test_requests_transport_pools_connections(server):
+    base, connections = server
+    transport = RequestsTransport()
+    for i in range(5):
+        assert transport.send("GET", f"{base}/items/{i}").json() == {"path": f"/items/{i}"}
+    assert len(connections) == 1
+
+
+def test_requests_transport_reads_the_environment_once_without_proxies(monkeypatch):
+    for name in ("HTTP_PROXY", "HTTPS_PROXY", "ALL_PROXY", "http_proxy", "https_proxy", "all_proxy"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("REQUESTS_CA_BUNDLE", "/etc/ca.pem")
+    transport = RequestsTransport()
+    assert not transport.session.trust_env
+    assert transport.session.verify == "/etc/ca.pem"
+
+    monkeypatch.setenv("HTTPS_PROXY", "http://proxy:3128")
+    assert RequestsTransport().session.trust_env
+
+
+def test_requests_connect_errors_are_recognised_as_unsent():
+    refused = requests.ConnectionError(MaxRetryError(None, "/", NewConnectionError(None, "refused")))
+    assert _never_sent(refused)
+    assert _never_sent(requests.ConnectTimeout())
+    assert not _never_sent(requests.ReadTimeout())
+    assert not _never_sent(requests.ConnectionError("Connection aborted"))
@@ -0,0 +1,50 @@
+import shutil
+
+import pytest
+
+from fakes import FakeTransport, make_response
+from github_client import GitHubClient
+from migration_index import marker
+from repo_mirror import RepoJob
+from test_git_refs import git
+from verify import compare_refs, diff_counts, github_migrated_items
+
+
+def test_github_migrated_items_reads_markers_and_legacy_links():
+    issues = [
+        {"number": 1, "comments": 2, "body": "x\n" + marker("workitem", 10)},
+        {"number": 2, "comments": 0, "body": "See https://dev.azure.com/o/p/_workitems/edit/11"},
+        {"number": 3, "comments": 1, "body": marker("pr", 5), "pull_request": {}},
+        {"number": 4, "comments": 0, "body": None},
+    ]
+    client = GitHubClient("token", FakeTransport(make_response(200, issues)), write_interval=0)
+    assert github_migrated_items(client, "a/b") == {
+        ("workitem", 10): (1, 2), ("workitem", 11): (2, 0), ("pr", 5): (3, 1)}
+
+
+def test_diff_counts_reports_missing_extra_and_comment_mismatches():
+    migrated = {("pr", 1): (7, 3), ("pr", 2): (8, 1), ("pr", 9): (9, 0), ("workitem", 3): (10, 0)}
+    section = diff_counts("pr", {1: 3, 2: 2, 4: 0}, migrated)
+    assert not section["ok"]
+    assert (section["ado"], section["github"]) == (3, 3)
+    assert section["missing_on_github"] == [4]
+    assert section["extra_on_github"] == [9]
+    assert section["comment_mismatches"] == [
+        {"ado_id": 2, "github_number": 8, "ado_comments": 2, "github_comments": 1}]
+    assert diff_counts("workitem", {3: 0}, migrated)["ok"]
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+def test_compare_refs(tmp_path):
+    source, target = tmp_path / "source", tmp_path / "target.git"
+    git("init", "-q", str(source))
+    git("commit", "-q", "--allow-empty", "-m", "one", cwd=source)
+    git("clone", "-q", "--mirror", str(source), str(target))
+    job = RepoJob(str(source), str(target))
+    assert compare_refs(job)["ok"]
+
+    git("branch", "feature", cwd=source)
+    entry = compare_refs(job)
+    assert not entry["ok"]
+    assert entry["missing_on_github"] == ["refs/heads/feature"]
+    assert not compare_refs(RepoJob(str(source), str(tmp_path / "missing")))["ok"]
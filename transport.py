@@ -0,0 +1,156 @@
+import http.client
+import json
+import re
+import ssl
+import threading
+import time
+import urllib.parse
+
+DEFAULT_TIMEOUT = 60  # Seconds, applied to connecting and to every blocking read
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS"}
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+
+
+class Headers(dict):
+    """Response headers with case-insensitive lookups"""
+
+    def __init__(self, items=()):
+        super().__init__((key.lower(), value) for key, value in items)
+
+    def __getitem__(self, key):
+        return super().__getitem__(key.lower())
+
+    def __contains__(self, key):
+        return super().__contains__(key.lower())
+
+    def get(self, key, default=None):
+        return super().get(key.lower(), default)
+
+
+class Response:
+    """Transport-independent HTTP response"""
+
+    def __init__(self, status_code, headers, content, url=""):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.url = url
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", "replace")
+
+    def json(self):
+        return json.loads(self.content) if self.content else None
+
+    @property
+    def links(self):
+        """Link header as {rel: {"url": ...}}, the same shape requests exposes"""
+        return {rel: {"url": url}
+                for url, rel in re.findall(r'<([^>]+)>;\s*rel="([^"]+)"', self.headers.get("Link", ""))}
+
+
+class HTTPError(Exception):
+    """An HTTP response with a 4xx or 5xx status"""
+
+    def __init__(self, response, method):
+        super().__init__(f"HTTP {response.status_code} for {method} {response.url}: {response.text[:500]}")
+        self.response = response
+
+
+class TransportError(Exception):
+    """A request that failed without an HTTP response
+
+    sent is False only when the request cannot have reached the server (connect failures
+    or a connection that broke while the request was still being written).
+    """
+
+    def __init__(self, message, sent):
+        super().__init__(message)
+        self.sent = sent
+
+
+class UrllibTransport:
+    """Stdlib transport that keeps one persistent connection per host and thread
+
+    http.client connections are not thread-safe, so every worker thread gets its own
+    keep-alive connection to each host instead of a fresh TCP+TLS handshake per call.
+    """
+
+    IDLE_TIMEOUT = 30  # Seconds after which a pooled connection is assumed closed by the server
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT):
+        self.timeout = timeout
+        self._ssl_context = ssl.create_default_context()
+        self._local = threading.local()
+
+    def send(self, method, url, headers=None, body=None):
+        for _ in range(5):
+            response = self._send_once(method, url, headers or {}, body)
+            location = response.headers.get("Location")
+            if response.status_code not in REDIRECT_STATUSES or not location:
+                return response
+            url = urllib.parse.urljoin(url, location)
+            if response.status_code == 303 or (response.status_code in (301, 302) and method != "HEAD"):
+                method, body = "GET", None
+        return response
+
+    def _send_once(self, method, url, headers, body):
+        parts = urllib.parse.urlsplit(url)
+        path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        key = (parts.scheme, parts.netloc)
+
+        for attempt in range(2):
+            conn, reused = self._connection(key)
+            try:
+                conn.request(method, path, body=body, headers=headers)
+            except OSError as e:
+                self._drop(key)
+                if reused and attempt == 0:
+                    continue  # A stale keep-alive socket; the request never got through
+                raise TransportError(f"{method} {url}: {e}", sent=False) from e
+
+            try:
+                resp = conn.getresponse()
+                content = resp.read()
+            except (OSError, http.client.HTTPException) as e:
+                self._drop(key)
+                closed_early = isinstance(e, (http.client.RemoteDisconnected, ConnectionResetError))
+                if reused and attempt == 0 and closed_early and method in IDEMPOTENT_METHODS:
+                    continue
+                raise TransportError(f"{method} {url}: {e}", sent=True) from e
+
+            if resp.will_close:
+                self._drop(key)
+            else:
+                self._pool()[key] = (conn, time.monotonic())
+            return Response(resp.status, Headers(resp.getheaders()), content, url)
+
+    def _pool(self):
+        if not hasattr(self._local, "connections"):
+            self._local.connections = {}
+        return self._local.connections
+
+    def _connection(self, key):
+        pool = self._pool()
+        entry = pool.get(key)
+        if entry and time.monotonic() - entry[1] < self.IDLE_TIMEOUT:
+            return entry[0], True
+        if entry:
+            entry[0].close()
+        scheme, netloc = key
+        if scheme == "https":
+            conn = http.client.HTTPSConnection(netloc, timeout=self.timeout, context=self._ssl_context)
+        else:
+            conn = http.client.HTTPConnection(netloc, timeout=self.timeout)
+        pool[key] = (conn, time.monotonic())
+        return conn, False
+
+    def _drop(self, key):
+        entry = self._pool().pop(key, None)
+        if entry:
+            entry[0].close()
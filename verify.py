@@ -0,0 +1,230 @@
+import argparse
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from ado_client import ADO_URL, AdoClient
+from ado_workitems import fetch_work_items, query_ids, wiql_runner
+from cli import credentials
+from git_refs import GitError, mismatched_refs, remote_refs
+from github_client import GitHubClient
+from migration_index import LEGACY_WORKITEM_RE, MARKER_RE
+from pipeline import ordered_map
+from repo_mirror import RepoJob, parse_manifest
+
+
+def compare_refs(job):
+    """Ref parity of one repository pair as a report entry (both sides read with ls-remote)"""
+    entry = {"name": job.name, "azure_url": job.azure_url, "github_url": job.github_url}
+    try:
+        ado, github = remote_refs(job.azure_url), remote_refs(job.github_url)
+    except GitError as e:
+        entry.update(ok=False, error=str(e))
+        return entry
+    mismatched = mismatched_refs(ado, github)
+    entry.update(
+        ok=not mismatched,
+        ado_refs=len(ado),
+        github_refs=len(github),
+        missing_on_github=[ref for ref in mismatched if ref not in github],
+        extra_on_github=[ref for ref in mismatched if ref not in ado],
+        different=[ref for ref in mismatched if ref in ado and ref in github],
+    )
+    return entry
+
+
+def compare_all_refs(jobs, workers):
+    return list(ordered_map(jobs, compare_refs, workers))
+
+
+def github_migrated_items(github, repo):
+    """{(kind, ado_id): (number, comment count)} of every migrated issue and PR of the repo
+
+    One pass over /issues covers both, since GitHub lists PRs there with their comment count.
+    """
+    items = {}
+    for issue in github.paginate(f"/repos/{repo}/issues", params={"state": "all", "per_page": 100}):
+        body = issue.get("body") or ""
+        match = MARKER_RE.search(body)
+        if match:
+            key = (match.group(1), int(match.group(2)))
+        elif "pull_request" not in issue and LEGACY_WORKITEM_RE.search(body):
+            key = ("workitem", int(LEGACY_WORKITEM_RE.search(body).group(1)))
+        else:
+            continue
+        items[key] = (issue["number"], issue.get("comments", 0))
+    return items
+
+
+def diff_counts(kind, expected, migrated):
+    """Report section comparing {ado_id: comment count} from ADO with the GitHub items"""
+    missing = sorted(ado_id for ado_id in expected if (kind, ado_id) not in migrated)
+    extra = sorted(ado_id for (k, ado_id) in migrated if k == kind and ado_id not in expected)
+    comment_mismatches = []
+    for ado_id, count in sorted(expected.items()):
+        if (kind, ado_id) in migrated:
+            number, github_count = migrated[(kind, ado_id)]
+            if github_count != count:
+                comment_mismatches.append({"ado_id": ado_id, "github_number": number,
+                                           "ado_comments": count, "github_comments": github_count})
+    return {
+        "ok": not (missing or extra or comment_mismatches),
+        "ado": len(expected),
+        "github": sum(1 for (k, _) in migrated if k == kind),
+        "missing_on_github": missing,
+        "extra_on_github": extra,
+        "comment_mismatches": comment_mismatches,
+    }
+
+
+def ado_pr_comment_counts(ado, org, project, repo, workers):
+    """{pr_id: number of thread comments} for every PR of an ADO repository"""
+    base = f"{ADO_URL}/{org}/{project}/_apis/git/repositories/{repo}"
+    pr_ids = [pr["pullRequestId"] for pr in
+              ado.paginate(f"{base}/pullrequests?searchCriteria.status=all&api-version=7.0")]
+
+    def count(pr_id):
+        threads = ado.paginate_continuation(f"{base}/pullRequests/{pr_id}/threads?api-version=7.0")
+        return sum(len(thread.get("comments", [])) for thread in threads)
+
+    return dict(zip(pr_ids, ordered_map(pr_ids, count, workers)))
+
+
+def ado_work_item_comment_counts(ado, org, project, log_error):
+    """{work_item_id: System.CommentCount} for every work item of an ADO project"""
+    base = f"{ADO_URL}/{org}/{project}/_apis/wit"
+    ids = query_ids(wiql_runner(ado, f"{base}/wiql?api-version=7.0"), "[System.TeamProject] = @project")
+
+    def fetch_batch(chunk):
+        resp = ado.post(f"{base}/workitemsbatch?api-version=7.0",
+                        json={"ids": chunk, "fields": ["System.Id", "System.CommentCount"], "errorPolicy": "omit"})
+        return resp.json()["value"]
+
+    return {wi["id"]: wi["fields"].get("System.CommentCount", 0)
+            for wi in fetch_work_items(fetch_batch, ids, log_error)}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Verify that an Azure DevOps to GitHub migration is complete.")
+    parser.add_argument("--ado-pat", help="Azure DevOps PAT (or set ADO_PAT env var)")
+    parser.add_argument("--ado-org", help="Azure DevOps organization name")
+    parser.add_argument("--ado-project", help="Azure DevOps project name")
+    parser.add_argument("--ado-repo", help="Compare the PRs and PR comments of this ADO repo with --github-repo")
+    parser.add_argument("--work-items", action="store_true",
+                        help="Compare the project's work items and their comments with the issues of --github-repo")
+    parser.add_argument("--github-repo", help="GitHub repo (e.g., user/repo) the PRs/work items were migrated to")
+    parser.add_argument("--github-token", help="GitHub token (or set GITHUB_TOKEN env var)")
+    parser.add_argument("--manifest", help="Compare the refs of every 'AZURE_URL GITHUB_URL' line of this file")
+    parser.add_argument("--azure-repo-url", help="Compare the refs of this ADO repository...")
+    parser.add_argument("--github-repo-url", help="...with this GitHub repository")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent ls-remote and ADO thread requests")
+    parser.add_argument("--report", default="verification_report.json", help="Where to write the JSON report")
+    return parser
+
+
+def run_checks(args, jobs, ado, github, log_error):
+    """Report sections of every requested check
+
+    Refs, PRs and work items are compared concurrently; the GitHub issue listing is read
+    once and shared by the PR and work item checks.
+    """
+    migrated = None
+
+    def check_pull_requests():
+        expected = ado_pr_comment_counts(ado, args.ado_org, args.ado_project, args.ado_repo, args.workers)
+        return diff_counts("pr", expected, migrated.result())
+
+    def check_work_items():
+        expected = ado_work_item_comment_counts(ado, args.ado_org, args.ado_project, log_error)
+        return diff_counts("workitem", expected, migrated.result())
+
+    report = {}
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        checks = {}
+        if jobs:
+            checks["repositories"] = executor.submit(compare_all_refs, jobs, args.workers)
+        if github is not None:
+            migrated = executor.submit(github_migrated_items, github, args.github_repo)
+        if args.ado_repo:
+            checks["pull_requests"] = executor.submit(check_pull_requests)
+        if args.work_items:
+            checks["work_items"] = executor.submit(check_work_items)
+        for name, future in checks.items():
+            try:
+                report[name] = future.result()
+            except Exception as e:
+                log_error(f"Could not verify {name.replace('_', ' ')}: {str(e)}")
+                report[name] = {"ok": False, "error": str(e)}
+    return report
+
+
+def print_report(report):
+    if "repositories" in report and isinstance(report["repositories"], list):
+        matching = sum(1 for entry in report["repositories"] if entry["ok"])
+        print(f"🌿 Refs: {matching}/{len(report['repositories'])} repositories match")
+        for entry in report["repositories"]:
+            if not entry["ok"]:
+                detail = entry.get("error") or (f"{len(entry['missing_on_github'])} missing, "
+                                                f"{len(entry['extra_on_github'])} extra, "
+                                                f"{len(entry['different'])} different")
+                print(f"   ❌ {entry['name']}: {detail}")
+    for name in ("pull_requests", "work_items"):
+        section = report.get(name)
+        if section and "error" not in section:
+            print(f"📋 {name.replace('_', ' ').capitalize()}: {section['ado']} in ADO, {section['github']} on GitHub, "
+                  f"{len(section['missing_on_github'])} missing, {len(section['extra_on_github'])} extra, "
+                  f"{len(section['comment_mismatches'])} with a different comment count")
+
+
+def main(argv, make_transport):
+    """Command line entry point; make_transport(workers) builds the HTTP transport to use"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    jobs = []
+    if args.manifest:
+        jobs = parse_manifest(args.manifest)
+    elif args.azure_repo_url and args.github_repo_url:
+        jobs = [RepoJob(args.azure_repo_url, args.github_repo_url)]
+    check_items = bool(args.ado_repo or args.work_items)
+    if not (jobs or check_items):
+        parser.error("nothing to verify: give --manifest, --azure-repo-url/--github-repo-url, --ado-repo or --work-items")
+    if check_items and not (args.ado_org and args.ado_project and args.github_repo):
+        parser.error("--ado-repo and --work-items need --ado-org, --ado-project and --github-repo")
+
+    ado = github = None
+    if check_items:
+        ado_pat, github_token = credentials(args)
+        transport = make_transport(args.workers)
+        ado = AdoClient(ado_pat, transport)
+        github = GitHubClient(github_token, transport)
+
+    log_lock = threading.Lock()
+    errors = []
+
+    def log_error(message):
+        with log_lock:
+            print("❌", message)
+            errors.append(message)
+
+    print("🔍 Verifying migration...")
+    report = run_checks(args, jobs, ado, github, log_error)
+    print_report(report)
+
+    sections = [report[name] for name in ("pull_requests", "work_items") if name in report]
+    repositories = report.get("repositories", [])
+    if isinstance(repositories, dict):  # The ref check itself failed
+        sections.append(repositories)
+        repositories = []
+    report["ok"] = not errors and all(entry["ok"] for entry in repositories) and all(s["ok"] for s in sections)
+    report["errors"] = errors
+    with open(args.report, "w") as report_file:
+        json.dump(report, report_file, indent=2)
+
+    if report["ok"]:
+        print(f"\n✅ Migration verified. Report written to '{args.report}'.")
+        return 0
+    print(f"\n❌ Differences found. See '{args.report}' for details.")
+    return 1
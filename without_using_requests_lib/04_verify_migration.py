@@ -0,0 +1,13 @@
+import os
+import sys
+
+# The shared modules live one directory up, next to the requests-based scripts; this
+# variant only swaps the requests transport for the stdlib one.
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transport import UrllibTransport
+from verify import main
+
+if __name__ == "__main__":
+    # Persistent per-thread connections shared by the ADO and GitHub clients
+    sys.exit(main(sys.argv[1:], lambda workers: UrllibTransport()))
@@ -0,0 +1,437 @@
+import argparse
+from datetime import datetime, timezone
+from itertools import islice
+
+from ado_client import ADO_URL, AdoClient
+from ado_workitems import BATCH_SIZE, chunked, fetch_work_items, query_ids, wiql_runner
+from attachments import (ATTACHMENT_WORKERS, DEFAULT_BRANCH, DEFAULT_CACHE_DIR, AttachmentMigrator, BlobCache,
+                         GitHubBlobStore)
+from cli import (add_client_arguments, add_identity_arguments, add_run_arguments, check_run_arguments, credentials,
+                 finish_metrics, identity_map)
+from delta import changed_since, content_hash, format_time, next_watermark, parse_time
+from github_client import GitHubClient
+from identity import IdentityMap
+from issue_import import MAX_PENDING, POLL_INTERVAL, IssueImporter
+from metrics import Metrics
+from migration_index import build_issue_index, marker
+from migration_log import MigrationLog
+from pipeline import prefetch, run_bounded
+from plan import Plan, print_plan
+from state_store import StateStore, load_index
+from transport import HTTPError
+
+
+class AdoWorkItemSource:
+    """Work items of one ADO project: IDs from windowed WIQL, details in batches, comments"""
+
+    def __init__(self, ado, org, project):
+        self.ado = ado
+        self.org = org
+        self.project = project
+        self.base_url = f"{ADO_URL}/{org}/{project}"
+
+    def query_ids(self, since=None):
+        """Lazy stream of work item IDs in creation order, only those changed since since if given"""
+        wiql_url = f"{self.base_url}/_apis/wit/wiql?api-version=7.0"
+        conditions = "[System.TeamProject] = @project"
+        if since:
+            # timePrecision makes WIQL compare the time of day as well, not just the date
+            conditions += f" AND [System.ChangedDate] >= '{format_time(parse_time(since))}'"
+            wiql_url += "&timePrecision=true"
+        return query_ids(wiql_runner(self.ado, wiql_url), conditions)
+
+    def fetch(self, ids, log_error, batch_size=BATCH_SIZE):
+        """Yield the work items of ids with all fields and relations, one batch call per batch_size"""
+        return fetch_work_items(self._post_batch, ids, log_error, batch_size)
+
+    def _post_batch(self, chunk):
+        resp = self.ado.post(f"{self.base_url}/_apis/wit/workitemsbatch?api-version=7.0",
+                             json={"ids": chunk, "$expand": "all", "errorPolicy": "omit"})
+        return resp.json()["value"]
+
+    def comment_counts(self, ids):
+        """{ID: number of comments} of up to BATCH_SIZE work items, in one batch call without their content"""
+        resp = self.ado.post(f"{self.base_url}/_apis/wit/workitemsbatch?api-version=7.0",
+                             json={"ids": ids, "fields": ["System.Id", "System.CommentCount"], "errorPolicy": "omit"})
+        return {wi["id"]: wi["fields"].get("System.CommentCount", 0) for wi in resp.json()["value"] if wi}
+
+    def comments(self, wi_id):
+        url = f"{self.base_url}/_apis/wit/workItems/{wi_id}/comments?api-version=7.0-preview"
+        return self.ado.get(url).json().get("comments", [])
+
+    def web_url(self, wi):
+        return wi.get("_links", {}).get("html", {}).get("href", f"{self.base_url}/_workitems/edit/{wi['id']}")
+
+
+class GitHubIssueSink:
+    """Issues and issue comments of one GitHub repository"""
+
+    def __init__(self, github, repo):
+        self.github = github
+        self.repo = repo
+
+    def existing(self):
+        """MigrationIndex of the issues already migrated to the repository"""
+        return build_issue_index(self.github, self.repo)
+
+    def create(self, title, body, labels, assignees=()):
+        """Create an issue; returns its number"""
+        payload = {"title": title, "body": body, "labels": labels}
+        if assignees:
+            payload["assignees"] = list(assignees)
+        try:
+            resp = self.github.post(f"/repos/{self.repo}/issues", json=payload)
+        except HTTPError as e:
+            # GitHub rejects the whole issue when an assignee cannot be assigned in this repo
+            if not assignees or e.response.status_code != 422:
+                raise
+            print(f"⚠️ Could not assign {', '.join(assignees)}, creating '{title}' unassigned")
+            del payload["assignees"]
+            resp = self.github.post(f"/repos/{self.repo}/issues", json=payload)
+        return resp.json()["number"]
+
+    def update(self, number, title, body):
+        # Labels are left alone so labels added on GitHub since the migration survive
+        self.github.patch(f"/repos/{self.repo}/issues/{number}", json={"title": title, "body": body})
+
+    def comment(self, number, body):
+        self.github.post(f"/repos/{self.repo}/issues/{number}/comments", json={"body": body})
+
+
+class WorkItemMigration:
+    """Migrates the work items of a source into issues of a sink
+
+    Progress is recorded in state so an interrupted run resumes where it stopped, and a
+    delta run only revisits what changed since the last successful run. The caller owns
+    state, log and metrics and closes them.
+    """
+
+    def __init__(self, source, sink, state, log, metrics=None, workers=1, limit=0,
+                 delta=False, since=None, rescan=False, batch_size=BATCH_SIZE, attachments=None,
+                 identities=None, importer=None):
+        self.source = source
+        self.sink = sink
+        self.state = state
+        self.log = log
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.workers = workers
+        self.limit = limit
+        self.delta = delta
+        self.since = since
+        self.rescan = rescan
+        self.batch_size = batch_size
+        # AttachmentMigrator copying ADO attachments to GitHub; None keeps the ADO links
+        self.attachments = attachments
+        self.identities = identities if identities is not None else IdentityMap()
+        # IssueImporter creating new issues with their comments in one request; None posts
+        # the issue and then every comment separately
+        self.importer = importer
+        self.index = None
+        self.skipped_count = 0
+        self._phase = None
+
+    @property
+    def watermark_name(self):
+        return f"workitems:{self.source.org}/{self.source.project}"
+
+    def run(self):
+        """Migrate everything pending; False if the run could not start"""
+        run_started = datetime.now(timezone.utc)
+        if self.delta:
+            # A delta run only looks at work items changed since the previous successful run started
+            self.since = self.since or self.state.get_watermark(self.watermark_name)
+            if self.since:
+                self.log.status(f"🔄 Syncing work items changed since {self.since}")
+            else:
+                self.log.status("🔄 No successful run recorded yet, syncing every work item")
+
+        # Projects over the 20k WIQL result cap are queried in ID windows; the IDs stream in
+        # creation order while the first work items are already being migrated.
+        self.log.status("📦 Fetching work items...")
+        id_stream = self.source.query_ids(self.since)
+        ids = islice(id_stream, self.limit) if self.limit else id_stream
+
+        self.log.status("🔍 Fetching GitHub issues to avoid duplicates...")
+        # Keyed on the ADO ID recorded in each migrated issue, not on the title. After the first
+        # run the index comes from the state file and GitHub is not listed again.
+        try:
+            with self.metrics.phase("index_github_issues") as phase:
+                self.index = load_index(self.state, "workitem", self.sink.existing, self.rescan)
+                phase.add(len(self.index))
+        except Exception as e:
+            self.log.error(f"Failed to fetch existing GitHub issues: {str(e)}")
+            return False
+        if self.importer is not None:
+            self.importer.start(self.index)
+
+        # IDs are queried and work items fetched on a background thread while the pool
+        # writes earlier ones to GitHub. Each stage only runs a bounded distance ahead of the
+        # next, so memory stays flat however large the project is. Issues are created in
+        # completion order, so with more than one worker the GitHub numbering no longer
+        # follows the ADO order.
+        errors_before = self.log.error_count
+        work_items = prefetch(self.source.fetch(self.pending_ids(ids), self.log.error, self.batch_size),
+                              self.workers * 2)
+        try:
+            with self.metrics.phase("migrate_work_items") as self._phase:
+                run_bounded(work_items, self.migrate_work_item, self.workers)
+        except Exception as e:
+            self.log.error(f"Failed to query work items: {str(e)}")
+        finally:
+            work_items.close()
+            if self.importer is not None:
+                self.importer.finish()
+        if self.skipped_count:
+            self.log.status(f"⏩ {self.skipped_count} work items already migrated according to {self.state.path}")
+
+        # Only a complete, error-free run moves the watermark, so the next delta run retries
+        # anything this one missed
+        if self.log.error_count == errors_before and next(id_stream, None) is None:
+            self.state.set_watermark(self.watermark_name, next_watermark(run_started))
+        return True
+
+    def plan(self, plan):
+        """Count what run() would write into plan, reading ADO and the state file only
+
+        Comments are counted from System.CommentCount, fetched in batches, rather than
+        listed per work item. A delta run counts every changed issue as an update and
+        each of its comments not posted yet, since neither can be compared with GitHub
+        without fetching the full content.
+        """
+        if self.delta:
+            self.since = self.since or self.state.get_watermark(self.watermark_name)
+            plan.upper_bound = True
+        id_stream = self.source.query_ids(self.since)
+        ids = islice(id_stream, self.limit) if self.limit else id_stream
+        self.index = load_index(self.state, "workitem", self.sink.existing, self.rescan)
+        in_flight = {row[0] for row in self.state.pending_imports("workitem")} if self.importer else set()
+        for chunk in chunked(ids, self.batch_size):
+            done_ids = set() if self.delta else self.state.done_among("workitem", chunk)
+            pending = [wi_id for wi_id in chunk if wi_id not in done_ids and wi_id not in in_flight]
+            plan.add(items=len(chunk), done=len(chunk) - len(pending))
+            if not pending:
+                continue
+            counts = self.source.comment_counts(pending)
+            # The run lists the comments of every work item it migrates
+            plan.add(ado_reads=len(pending))
+            for wi_id in pending:
+                comment_count = counts.get(wi_id, 0)
+                issue_number = self.state.get_number("workitem", wi_id)
+                if issue_number is None and self.index.get("workitem", wi_id) is not None:
+                    plan.add(done=1)
+                elif issue_number is None and self.importer is not None:
+                    plan.add(imports=1)
+                elif issue_number is None:
+                    plan.add(creates=1, comments=comment_count)
+                else:
+                    posted = len(self.state.posted_comments("workitem", wi_id))
+                    plan.add(updates=int(self.delta), resumed=int(not self.delta),
+                             comments=max(comment_count - posted, 0))
+
+    def pending_ids(self, ids):
+        """IDs still to migrate, in the order the WIQL windows return them
+
+        Completed items are dropped before their details are even fetched from ADO, looked
+        up in the state file one batch at a time; a delta run revisits them to bring the
+        issues up to date.
+        """
+        for chunk in chunked(ids, self.batch_size):
+            done_ids = set() if self.delta else self.state.done_among("workitem", chunk)
+            self.skipped_count += len(done_ids)
+            yield from (wi_id for wi_id in chunk if wi_id not in done_ids)
+
+    def issue_body(self, wi):
+        """Markdown body of the GitHub issue for a work item"""
+        desc = self.identities.rewrite_mentions(wi["fields"].get("System.Description", ""))
+        if self.attachments is not None:
+            desc = self.attachments.rewrite(desc) + self.attachments.attachment_list(wi)
+        created_by = self.identities.name(wi["fields"]["System.CreatedBy"])
+        created_date = wi["fields"]["System.CreatedDate"].split("T")[0]
+        work_item_url = self.source.web_url(wi)
+        return f"""{marker("workitem", wi["id"])}
+**Created by:** {created_by}  
+**Created on:** {created_date}  
+**Original ADO Link:** [{work_item_url}]({work_item_url})
+
+---
+
+{desc}
+"""
+
+    def create_issue(self, wi, title):
+        """Create the GitHub issue for a work item and record it; returns the issue number"""
+        wi_id = wi["id"]
+        body = self.issue_body(wi)
+        try:
+            issue_number = self.sink.create(title, body, [wi["fields"].get("System.WorkItemType", "work-item")],
+                                            self.identities.assignees(wi["fields"].get("System.AssignedTo")))
+        except Exception:
+            self.index.release("workitem", wi_id)
+            raise
+        self.metrics.count("issues_created")
+        self.index.add("workitem", wi_id, issue_number)
+        self.state.record_item("workitem", wi_id, issue_number, content_hash({"title": title, "body": body}))
+        return issue_number
+
+    def import_issue(self, wi, title):
+        """Submit the GitHub issue for a work item with all its comments as one import"""
+        wi_id = wi["id"]
+        body = self.issue_body(wi)
+        try:
+            comments = list(self.source.comments(wi_id))
+            issue = {"title": title, "body": body, "created_at": wi["fields"]["System.CreatedDate"],
+                     "labels": [wi["fields"].get("System.WorkItemType", "work-item")]}
+            assignees = self.identities.assignees(wi["fields"].get("System.AssignedTo"))
+            if assignees:
+                issue["assignee"] = assignees[0]
+            import_comments = [{"created_at": comment["createdDate"], "body": self.comment_body(comment)}
+                               for comment in comments]
+            self.importer.submit(wi_id, issue, import_comments, [str(comment["id"]) for comment in comments],
+                                 content_hash({"title": title, "body": body}))
+        except Exception:
+            self.index.release("workitem", wi_id)
+            raise
+        self.log.status(f"📤 Submitted import of '{title}' with {len(comments)} comments")
+
+    def comment_body(self, comment):
+        """Markdown of the GitHub comment for an ADO work item comment"""
+        author = self.identities.name(comment["createdBy"])
+        date = comment["createdDate"].split("T")[0]
+        text = self.identities.rewrite_mentions(comment["text"])
+        if self.attachments is not None:
+            text = self.attachments.rewrite(text)
+        return f"_Comment by **{author}** on {date}_:\n\n{text}"
+
+    def update_issue(self, wi, title, issue_number):
+        """Bring the title and body of a migrated issue up to date; False if nothing changed"""
+        wi_id = wi["id"]
+        body = self.issue_body(wi)
+        digest = content_hash({"title": title, "body": body})
+        if self.state.get_hash("workitem", wi_id) == digest:
+            return False
+        self.sink.update(issue_number, title, body)
+        self.state.set_hash("workitem", wi_id, digest)
+        return True
+
+    def migrate_work_item(self, wi):
+        """Create the GitHub issue for a work item, then post its comments in order"""
+        wi_id = wi["id"]
+        try:
+            title = wi["fields"]["System.Title"]
+            issue_number = self.state.get_number("workitem", wi_id)
+            if issue_number is not None and self.delta:
+                if self.update_issue(wi, title, issue_number):
+                    self.metrics.count("issues_updated")
+                    self.log.status(f"🔄 Updated GitHub issue #{issue_number}: {title}")
+            elif issue_number is not None:
+                # Created by an interrupted run; only the missing comments are posted
+                self.log.status(f"🔁 Resuming issue #{issue_number}: {title}")
+            elif self.importer is not None and self.importer.is_pending(wi_id):
+                self.log.status(f"⏳ Import of '{title}' is still in flight")
+                return
+            else:
+                # Claim the ID before creating so concurrent workers never create it twice
+                if not self.index.claim("workitem", wi_id):
+                    self.log.status(f"⏩ Skipping existing issue: {title}")
+                    return
+                if self.importer is not None:
+                    self.import_issue(wi, title)
+                    self._phase.add()
+                    return
+                issue_number = self.create_issue(wi, title)
+                self.log.status(f"✅ Created GitHub issue #{issue_number}: {title}")
+
+            posted = self.state.posted_comments("workitem", wi_id)
+            for comment in self.source.comments(wi_id):
+                if str(comment["id"]) in posted or not changed_since(comment["createdDate"], self.since):
+                    continue
+                try:
+                    self.sink.comment(issue_number, self.comment_body(comment))
+                except Exception as e:
+                    # Stop here so a rerun posts the rest after this one, keeping the order
+                    author = comment["createdBy"]["displayName"]
+                    self.log.error(f"Failed to post comment from {author} on issue #{issue_number}: {str(e)}")
+                    return
+                self.state.record_comment("workitem", wi_id, comment["id"])
+                self.metrics.count("comments_posted")
+            self.state.mark_done("workitem", wi_id)
+            self._phase.add()
+        except Exception as e:
+            self.log.error(f"Work item {wi_id} failed: {str(e)}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Migrate Azure DevOps work items to GitHub Issues.")
+    add_client_arguments(parser)
+    parser.add_argument("--limit", type=int, default=50, help="Limit number of work items to migrate (0 for no limit)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE,
+                        help=f"Work items fetched per ADO request (at most {BATCH_SIZE}); lower it for "
+                             "projects with very large descriptions to cap memory")
+    parser.add_argument("--attachments", action="store_true",
+                        help="Copy attachments and pasted images to a branch of --github-repo and link to the copies")
+    parser.add_argument("--attachment-branch", default=DEFAULT_BRANCH,
+                        help=f"Branch the attachments are committed to (default: {DEFAULT_BRANCH})")
+    parser.add_argument("--attachment-cache", default=DEFAULT_CACHE_DIR,
+                        help="Directory caching downloaded attachments by content hash")
+    parser.add_argument("--attachment-workers", type=int, default=ATTACHMENT_WORKERS,
+                        help="Concurrent attachment downloads per work item")
+    add_identity_arguments(parser)
+    parser.add_argument("--import-api", action="store_true",
+                        help="Create each issue together with all its comments in one issue import request")
+    parser.add_argument("--import-poll-interval", type=float, default=POLL_INTERVAL,
+                        help="Seconds between status checks of the issue imports in flight")
+    parser.add_argument("--max-pending-imports", type=int, default=MAX_PENDING,
+                        help="Issue imports in flight before new submissions wait")
+    add_run_arguments(parser, "work items")
+    return parser
+
+
+def main(argv, make_transport):
+    """Command line entry point; make_transport(workers) builds the HTTP transport to use"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    check_run_arguments(parser, args)
+    if not 1 <= args.batch_size <= BATCH_SIZE:
+        parser.error(f"--batch-size must be between 1 and {BATCH_SIZE}")
+    if args.attachment_workers < 1:
+        parser.error("--attachment-workers must be at least 1")
+    if args.max_pending_imports < 1:
+        parser.error("--max-pending-imports must be at least 1")
+    ado_pat, github_token = credentials(args)
+
+    metrics = Metrics(args.metrics_file)
+    transport = make_transport(args.workers)
+    ado = AdoClient(ado_pat, transport, metrics=metrics)
+    github = GitHubClient(github_token, transport, write_interval=args.write_interval, metrics=metrics)
+    log = MigrationLog()
+    state = StateStore(args.state_file)
+    attachments = None
+    if args.attachments:
+        attachments = AttachmentMigrator(ado, GitHubBlobStore(github, args.github_repo, args.attachment_branch),
+                                         state, BlobCache(args.attachment_cache), log.error, metrics,
+                                         args.attachment_workers)
+    identities = identity_map(args, state, ado, github)
+    importer = None
+    if args.import_api:
+        importer = IssueImporter(github, args.github_repo, state, log, metrics, args.import_poll_interval,
+                                 args.max_pending_imports)
+    migration = WorkItemMigration(AdoWorkItemSource(ado, args.ado_org, args.ado_project),
+                                  GitHubIssueSink(github, args.github_repo), state, log, metrics,
+                                  workers=args.workers, limit=args.limit, delta=args.delta, since=args.since,
+                                  rescan=args.rescan, batch_size=args.batch_size, attachments=attachments,
+                                  identities=identities, importer=importer)
+    try:
+        if args.plan:
+            plan = Plan("work items")
+            migration.plan(plan)
+            print_plan(plan, github, metrics, args.workers, args.write_interval, args.writes_per_hour)
+            return 0
+        started = migration.run()
+    finally:
+        state.close()
+        log.close()
+        finish_metrics(metrics, args)
+    if not started:
+        return 1
+    print("\n🎉 Migration complete.")
+    return 0